@@ -0,0 +1,573 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+"""
+Seeded synthetic payroll data for the benchmarks.
+
+Masters (salary components, pay matrix, designations, quarters, salary structure) go
+through the document API; the bulk records (employees, assignments, salary slips and
+their rows) are written with bulk inserts so large datasets can be generated in
+minutes. Every record is named with DATASET_PREFIX (or the "_Bench" prefix for masters)
+and removed again by delete_dataset.
+"""
+
+import random
+
+import frappe
+from frappe.utils import (
+	add_months,
+	add_years,
+	flt,
+	get_first_day,
+	get_last_day,
+	getdate,
+	now_datetime,
+	nowdate,
+)
+
+DATASET_PREFIX = "BENCH"
+MASTER_PREFIX = "_Bench"
+
+PAY_MATRIX = {"pm": f"{MASTER_PREFIX} Matrix", "cpc": "7th CPC"}
+PAY_LEVELS = 10
+PAY_YEARS = 40
+DESIGNATIONS_PER_LEVEL = 2
+EMPLOYEES_PER_QUARTER = 20
+
+# name, abbreviation, type, report type, internal, share of basic
+COMPONENTS = [
+	("Basic", "BNB", "Earning", "Basic", 0, 1.0),
+	("HRA", "BNHRA", "Earning", "HRA", 0, 0.24),
+	("FDA", "BNFDA", "Earning", "FDA", 0, 0.46),
+	("Conveyance", "BNCA", "Earning", "Conveyance Allowance", 0, 0.05),
+	("PF Employee", "BNPFE", "Deduction", "PF Employee", 0, 0.12),
+	("ESI Employee", "BNESIE", "Deduction", "ESI Employee", 0, 0.0075),
+	("Prof Tax", "BNPT", "Deduction", "Prof Tax", 0, 0.01),
+	("PF Employer", "BNPFR", "Earning", "PF Employer", 1, 0.0367),
+	("Pension", "BNPEN", "Earning", "Pension", 1, 0.0833),
+	("ESI Employer", "BNESIR", "Earning", "ESI Employer", 1, 0.0325),
+	("Quarter Rent", "BNQR", "Deduction", "House Rent", 0, None),
+	("Quarter Water", "BNQW", "Deduction", None, 0, None),
+]
+QUARTER_CHARGES = {"Quarter Rent": 1500, "Quarter Water": 120}
+
+
+def generate(employees=100, months=3, seed=42, company=None, unpaid_days_share=0.1):
+	"""
+	Create a synthetic payroll dataset.
+
+	Args:
+		employees (int): Number of employees
+		months (int): Number of months of submitted Salary Slips and Unpaid Days, ending
+			with the last complete month
+		seed (int): Seed of the random generator; the same seed gives the same dataset
+		company (str, optional): Company of the data, defaults to the default company
+		unpaid_days_share (float): Share of employees with unpaid days in a month
+
+	Returns:
+		dict: company, employees, period (from_date, to_date), months, fiscal_year
+	"""
+	rng = random.Random(seed)
+	employees = int(employees)
+	months = int(months)
+	company = company or frappe.defaults.get_global_default("company") or frappe.db.get_value("Company", {})
+	currency = frappe.get_cached_value("Company", company, "default_currency")
+
+	delete_dataset()
+
+	components = make_salary_components(company)
+	levels = make_pay_matrix(rng)
+	designations = make_designations(levels)
+	quarters = make_quarters(-(-employees // EMPLOYEES_PER_QUARTER))
+	salary_structure = make_salary_structure(company, currency)
+
+	first_month = get_first_day(add_months(nowdate(), -months))
+	employee_rows = make_employees(rng, employees, company, designations, quarters, first_month)
+	make_salary_structure_assignments(employee_rows, company, currency, salary_structure, first_month)
+
+	periods = [get_first_day(add_months(first_month, i)) for i in range(months)]
+	for month_index, start_date in enumerate(periods):
+		unpaid_days = make_unpaid_days(rng, employee_rows, company, start_date, unpaid_days_share)
+		make_salary_slips(
+			employee_rows,
+			components,
+			company,
+			currency,
+			salary_structure,
+			start_date,
+			month_index,
+			unpaid_days,
+		)
+
+	frappe.db.commit()
+
+	to_date = get_last_day(periods[-1]) if periods else get_last_day(first_month)
+	return {
+		"company": company,
+		"currency": currency,
+		"employees": [row["name"] for row in employee_rows],
+		"quarters": quarters,
+		"from_date": str(first_month),
+		"to_date": str(to_date),
+		"months": [str(d) for d in periods],
+		"fiscal_year": get_fiscal_year(to_date),
+	}
+
+
+def make_salary_components(company):
+	components = {}
+	for name, abbr, component_type, report_type, internal, share in COMPONENTS:
+		component = f"{MASTER_PREFIX} {name}"
+		if not frappe.db.exists("Salary Component", component):
+			frappe.get_doc(
+				{
+					"doctype": "Salary Component",
+					"salary_component": component,
+					"salary_component_abbr": abbr,
+					"type": component_type,
+					"custom_company": company,
+					"custom_report_type": report_type,
+					"custom_internal_component": internal,
+				}
+			).insert(ignore_permissions=True)
+		components[name] = frappe._dict(
+			name=component, abbr=abbr, type=component_type, internal=internal, share=share
+		)
+
+	return components
+
+
+def make_pay_matrix(rng):
+	"""Create the pay matrix and its levels and return the level documents, lowest first."""
+	pay_matrix = frappe.get_doc({"doctype": "Pay Matrix", **PAY_MATRIX}).insert(ignore_permissions=True)
+
+	levels = []
+	for level in range(1, PAY_LEVELS + 1):
+		entry = 18000 * 1.25 ** (level - 1) + rng.randint(0, 500)
+		doc = frappe.get_doc(
+			{
+				"doctype": "Pay Matrix Level",
+				"pay_matrix": pay_matrix.name,
+				"level": str(level),
+				"pay_band": f"PB-{(level + 2) // 3}",
+				"years": [
+					{"year": str(year), "amount": round(entry * 1.03 ** (year - 1), -2)}
+					for year in range(1, PAY_YEARS + 1)
+				],
+			}
+		).insert(ignore_permissions=True)
+		levels.append(doc)
+
+	return levels
+
+
+def make_designations(levels):
+	"""Create designations mapped to the pay matrix levels; returns (designation, level doc) pairs."""
+	designations = []
+	for level in levels:
+		for n in range(1, DESIGNATIONS_PER_LEVEL + 1):
+			designation = f"{MASTER_PREFIX} Designation {level.level}-{n}"
+			frappe.get_doc(
+				{
+					"doctype": "Designation",
+					"designation_name": designation,
+					"custom_matrix_levels": [{"pay_matrix": level.pay_matrix, "level": level.name}],
+				}
+			).insert(ignore_permissions=True)
+			designations.append((designation, level))
+
+	return designations
+
+
+def make_quarters(count):
+	quarters = []
+	for n in range(1, count + 1):
+		quarter = frappe.get_doc(
+			{
+				"doctype": "Quarter",
+				"name1": f"{MASTER_PREFIX} Quarter {n}",
+				"units_available": EMPLOYEES_PER_QUARTER,
+				"charges": [
+					{"charge": f"{MASTER_PREFIX} {component}", "amount": amount}
+					for component, amount in QUARTER_CHARGES.items()
+				],
+			}
+		).insert(ignore_permissions=True)
+		quarters.append(quarter.name)
+
+	return quarters
+
+
+def make_salary_structure(company, currency):
+	def rows(component_type):
+		return [
+			{
+				"salary_component": f"{MASTER_PREFIX} {name}",
+				"abbr": abbr,
+				"amount_based_on_formula": 1,
+				"formula": f"base * {share}",
+			}
+			for name, abbr, row_type, _, _, share in COMPONENTS
+			if row_type == component_type and share is not None
+		]
+
+	structure = frappe.get_doc(
+		{
+			"doctype": "Salary Structure",
+			"name": f"{MASTER_PREFIX} Structure",
+			"company": company,
+			"currency": currency,
+			"payroll_frequency": "Monthly",
+			"is_active": "Yes",
+			"earnings": rows("Earning"),
+			"deductions": rows("Deduction"),
+		}
+	).insert(ignore_permissions=True)
+	structure.submit()
+	return structure.name
+
+
+def make_employees(rng, count, company, designations, quarters, first_month):
+	now = now_datetime()
+	user = frappe.session.user
+	fields = [
+		"name",
+		"owner",
+		"creation",
+		"modified",
+		"modified_by",
+		"docstatus",
+		"first_name",
+		"employee_name",
+		"gender",
+		"date_of_birth",
+		"date_of_joining",
+		"status",
+		"company",
+		"designation",
+		"bank_name",
+		"bank_ac_no",
+		"ifsc_code",
+		"pan_number",
+		"provident_fund_account",
+		"salary_mode",
+		"custom_pay_matrix",
+		"custom_level",
+		"custom_years_experienced",
+		"custom_basic_salary",
+		"custom_quarter",
+		"custom_date_of_increment",
+	]
+
+	employees = []
+	values = []
+	for i in range(count):
+		designation, level = rng.choice(designations)
+		years = rng.randint(1, 30)
+		date_of_joining = add_years(first_month, -years)
+		basic = level.years[min(years, PAY_YEARS) - 1].amount
+		row = {
+			"name": f"{DATASET_PREFIX}-EMP-{i:06d}",
+			"employee_name": f"Bench Employee {i}",
+			"designation": designation,
+			"basic": basic,
+			"date_of_joining": date_of_joining,
+		}
+		employees.append(row)
+		values.append(
+			(
+				row["name"],
+				user,
+				now,
+				now,
+				user,
+				0,
+				row["employee_name"],
+				row["employee_name"],
+				rng.choice(["Male", "Female"]),
+				add_years(date_of_joining, -rng.randint(21, 35)),
+				date_of_joining,
+				"Active",
+				company,
+				designation,
+				"Bench Bank",
+				f"{rng.randrange(10**11, 10**12)}",
+				"BNCH0000001",
+				f"BNCHP{i:05d}Z",
+				f"PF/BENCH/{i:06d}",
+				"Bank",
+				level.pay_matrix,
+				level.name,
+				years,
+				basic,
+				quarters[i // EMPLOYEES_PER_QUARTER],
+				getdate(f"{first_month.year}-04-01"),
+			)
+		)
+
+	frappe.db.bulk_insert("Employee", fields, values)
+	return employees
+
+
+def make_salary_structure_assignments(employees, company, currency, salary_structure, first_month):
+	now = now_datetime()
+	user = frappe.session.user
+	fields = [
+		"name",
+		"owner",
+		"creation",
+		"modified",
+		"modified_by",
+		"docstatus",
+		"employee",
+		"employee_name",
+		"salary_structure",
+		"company",
+		"currency",
+		"from_date",
+		"base",
+		"custom_basic",
+		"custom_basic_amount",
+	]
+	values = [
+		(
+			f"{DATASET_PREFIX}-SSA-{i:06d}",
+			user,
+			now,
+			now,
+			user,
+			1,
+			emp["name"],
+			emp["employee_name"],
+			salary_structure,
+			company,
+			currency,
+			first_month,
+			emp["basic"],
+			1,
+			emp["basic"],
+		)
+		for i, emp in enumerate(employees)
+	]
+	frappe.db.bulk_insert("Salary Structure Assignment", fields, values)
+
+
+def make_unpaid_days(rng, employees, company, start_date, share):
+	"""Submit one Unpaid Days document for the month; returns employee -> days."""
+	unpaid_days = {emp["name"]: rng.choice([0.5, 1, 2, 3]) for emp in employees if rng.random() < share}
+	if unpaid_days:
+		doc = frappe.get_doc(
+			{
+				"doctype": "Unpaid Days",
+				"company": company,
+				"payroll_date": start_date.replace(day=15),
+				"details": [{"employee": employee, "days": days} for employee, days in unpaid_days.items()],
+			}
+		).insert(ignore_permissions=True)
+		doc.submit()
+
+	return unpaid_days
+
+
+def make_salary_slips(
+	employees, components, company, currency, salary_structure, start_date, month_index, unpaid_days
+):
+	"""Bulk insert submitted Salary Slips for a month, with their earnings, deductions and internal rows."""
+	now = now_datetime()
+	user = frappe.session.user
+	end_date = get_last_day(start_date)
+	working_days = (end_date - start_date).days + 1
+
+	slip_fields = [
+		"name",
+		"owner",
+		"creation",
+		"modified",
+		"modified_by",
+		"docstatus",
+		"employee",
+		"employee_name",
+		"designation",
+		"company",
+		"currency",
+		"exchange_rate",
+		"posting_date",
+		"start_date",
+		"end_date",
+		"payroll_frequency",
+		"salary_structure",
+		"bank_name",
+		"total_working_days",
+		"payment_days",
+		"custom_unpaid_days",
+		"gross_pay",
+		"base_gross_pay",
+		"total_deduction",
+		"base_total_deduction",
+		"net_pay",
+		"base_net_pay",
+		"rounded_total",
+		"base_rounded_total",
+		"custom_gross_internal_payable",
+	]
+	detail_fields = [
+		"name",
+		"owner",
+		"creation",
+		"modified",
+		"modified_by",
+		"docstatus",
+		"parent",
+		"parenttype",
+		"parentfield",
+		"idx",
+		"salary_component",
+		"abbr",
+		"amount",
+		"default_amount",
+	]
+
+	slips = []
+	details = []
+	internal_details = []
+	for i, emp in enumerate(employees):
+		name = f"{DATASET_PREFIX}-SS-{month_index:02d}-{i:06d}"
+		days = unpaid_days.get(emp["name"], 0)
+		factor = (working_days - days) / working_days
+		basic = emp["basic"]
+
+		amounts = {"earnings": [], "deductions": [], "custom_internal_salary_details": []}
+		for key, component in components.items():
+			if component.share is None:
+				amount = QUARTER_CHARGES[key]
+			else:
+				amount = round(basic * component.share * factor, 2)
+			if component.internal:
+				parentfield = "custom_internal_salary_details"
+			else:
+				parentfield = "earnings" if component.type == "Earning" else "deductions"
+			amounts[parentfield].append((component, amount))
+
+		gross = sum(amount for _, amount in amounts["earnings"])
+		deduction = sum(amount for _, amount in amounts["deductions"])
+		internal = sum(amount for _, amount in amounts["custom_internal_salary_details"])
+		net = flt(gross - deduction, 2)
+
+		slips.append(
+			(
+				name,
+				user,
+				now,
+				now,
+				user,
+				1,
+				emp["name"],
+				emp["employee_name"],
+				emp["designation"],
+				company,
+				currency,
+				1,
+				end_date,
+				start_date,
+				end_date,
+				"Monthly",
+				salary_structure,
+				"Bench Bank",
+				working_days,
+				working_days - days,
+				days,
+				gross,
+				gross,
+				deduction,
+				deduction,
+				net,
+				net,
+				round(net),
+				round(net),
+				internal,
+			)
+		)
+
+		for parentfield, rows in amounts.items():
+			target = internal_details if parentfield == "custom_internal_salary_details" else details
+			for idx, (component, amount) in enumerate(rows, start=1):
+				target.append(
+					(
+						f"{name}-{parentfield[:3]}-{idx}",
+						user,
+						now,
+						now,
+						user,
+						1,
+						name,
+						"Salary Slip",
+						parentfield,
+						idx,
+						component.name,
+						component.abbr,
+						amount,
+						amount,
+					)
+				)
+
+	frappe.db.bulk_insert("Salary Slip", slip_fields, slips)
+	frappe.db.bulk_insert("Salary Detail", detail_fields, details)
+	frappe.db.bulk_insert("Internal Salary Details", detail_fields, internal_details)
+
+
+def get_fiscal_year(date):
+	return frappe.db.get_value(
+		"Fiscal Year", {"year_start_date": ["<=", date], "year_end_date": [">=", date]}, "name"
+	)
+
+
+def delete_dataset():
+	"""Remove every record created by generate (and by the benchmarks run on it)."""
+	like = f"{DATASET_PREFIX}-%"
+	employees = frappe.get_all("Employee", filters={"name": ["like", like]}, pluck="name")
+
+	if employees:
+		for doctype in ("Additional Salary", "Salary Slip", "Salary Structure Assignment"):
+			frappe.db.delete(doctype, {"employee": ["in", employees]})
+
+		unpaid_days = frappe.get_all(
+			"Unpaid Days Detail",
+			filters={"employee": ["in", employees], "parenttype": "Unpaid Days"},
+			pluck="parent",
+			distinct=True,
+		)
+		if unpaid_days:
+			frappe.db.delete(
+				"Unpaid Days Detail", {"parent": ["in", unpaid_days], "parenttype": "Unpaid Days"}
+			)
+			frappe.db.delete("Unpaid Days", {"name": ["in", unpaid_days]})
+
+	frappe.db.delete("Salary Detail", {"parent": ["like", like], "parenttype": "Salary Slip"})
+	frappe.db.delete("Internal Salary Details", {"parent": ["like", like], "parenttype": "Salary Slip"})
+	frappe.db.delete("Salary Structure Assignment", {"name": ["like", like]})
+	frappe.db.delete("Employee", {"name": ["like", like]})
+
+	master_like = f"{MASTER_PREFIX} %"
+	frappe.db.delete("Quarter Charges", {"charge": ["like", master_like]})
+	frappe.db.delete("Quarter", {"name1": ["like", master_like]})
+	frappe.db.delete(
+		"Designation Matrix Level", {"parent": ["like", master_like], "parenttype": "Designation"}
+	)
+	frappe.db.delete("Designation", {"name": ["like", master_like]})
+
+	for structure in frappe.get_all(
+		"Salary Structure", filters={"name": ["like", master_like]}, pluck="name"
+	):
+		frappe.db.delete("Salary Detail", {"parent": structure, "parenttype": "Salary Structure"})
+		frappe.db.delete("Salary Structure", {"name": structure})
+
+	levels = frappe.get_all("Pay Matrix Level", filters={"pay_matrix": ["like", master_like]}, pluck="name")
+	if levels:
+		frappe.db.delete("Matrix Level Items", {"parent": ["in", levels], "parenttype": "Pay Matrix Level"})
+		frappe.db.delete("Pay Matrix Level", {"name": ["in", levels]})
+	frappe.db.delete("Pay Matrix Snapshot", {"pay_matrix": ["like", master_like]})
+	frappe.db.delete("Pay Matrix", {"name": ["like", master_like]})
+	frappe.db.delete("Salary Component", {"name": ["like", master_like]})
+
+	frappe.db.commit()
+	frappe.clear_cache()
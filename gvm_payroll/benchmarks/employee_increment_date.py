@@ -0,0 +1,129 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+"""
+Employee increment-date hooks against the Server Scripts they replaced.
+
+Run on a test site with:
+
+	bench --site <site> execute gvm_payroll.benchmarks.employee_increment_date.run --kwargs "{'count': 1000}"
+
+Nothing is kept: everything runs inside a transaction that is rolled back.
+"""
+
+import time
+from unittest.mock import patch
+
+import frappe
+from frappe.utils import add_days, getdate
+
+from gvm_payroll.gvm_payroll.overrides.employee import (
+	set_increment_date,
+	set_next_increment_date,
+	validate_increment_date,
+)
+
+SERVER_SCRIPTS = ["Validate Employee Increment Date", "Set Employee Increment Date"]
+HOOKS_MODULE = "gvm_payroll.gvm_payroll.overrides.employee"
+
+
+def run(count=1000, company=None):
+	"""
+	Time the Employee increment-date logic for `count` employees, both as Server Scripts
+	("before") and as doc_events hooks ("after").
+
+	Two measurements are taken:
+	- events: the validate and before_save logic alone, run on unsaved documents
+	- import: inserting the employees, as a bulk import does
+
+	Returns:
+		dict: seconds and employees per second of each measurement
+	"""
+	count = int(count)
+	company = company or frappe.db.get_value("Company", {}, "name")
+	scripts = [frappe.get_doc("Server Script", name) for name in SERVER_SCRIPTS]
+
+	def run_scripts(doc):
+		for script in scripts:
+			script.execute_doc(doc)
+		set_next_increment_date(doc)
+
+	def run_hooks(doc):
+		validate_increment_date(doc)
+		set_increment_date(doc)
+		set_next_increment_date(doc)
+
+	results = {
+		"count": count,
+		"events": {
+			"before": time_each(make_employees(count, company), run_scripts),
+			"after": time_each(make_employees(count, company), run_hooks),
+		},
+	}
+
+	try:
+		results["import"] = {
+			"before": time_import_with_server_scripts(count, company),
+			"after": time_each(make_employees(count, company), insert),
+		}
+	finally:
+		frappe.db.rollback()
+		clear_server_script_cache()
+
+	return results
+
+
+def time_import_with_server_scripts(count, company):
+	"""Insert employees with the Server Scripts enabled and the hooks switched off."""
+	frappe.db.savepoint("increment_date_benchmark")
+	frappe.db.set_value("Server Script", {"name": ["in", SERVER_SCRIPTS]}, "disabled", 0)
+	clear_server_script_cache()
+
+	try:
+		with (
+			patch(f"{HOOKS_MODULE}.validate_increment_date", noop),
+			patch(f"{HOOKS_MODULE}.set_increment_date", noop),
+		):
+			return time_each(make_employees(count, company), insert)
+	finally:
+		frappe.db.rollback(save_point="increment_date_benchmark")
+		clear_server_script_cache()
+
+
+def time_each(docs, fn):
+	start = time.perf_counter()
+	for doc in docs:
+		fn(doc)
+	seconds = time.perf_counter() - start
+
+	return {"seconds": round(seconds, 4), "per_second": round(len(docs) / seconds, 1) if seconds else None}
+
+
+def make_employees(count, company):
+	doj = getdate("2020-01-01")
+	return [
+		frappe.get_doc(
+			{
+				"doctype": "Employee",
+				"first_name": f"Benchmark {i}",
+				"gender": "Male",
+				"date_of_birth": "1990-01-01",
+				"date_of_joining": add_days(doj, i % 1460),
+				"company": company,
+				"status": "Active",
+			}
+		)
+		for i in range(count)
+	]
+
+
+def insert(doc):
+	doc.insert(ignore_permissions=True)
+
+
+def noop(doc, method=None):
+	pass
+
+
+def clear_server_script_cache():
+	frappe.cache().delete_value("server_script_map")
@@ -0,0 +1,293 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+"""
+Payroll benchmark suite.
+
+Generates a synthetic dataset at each scale and times the reports, the Salary Slip
+hooks, quarter charges and the Bulk Additional Salary endpoints on it. Run on a test
+site with:
+
+	bench --site <site> execute gvm_payroll.benchmarks.runner.run --kwargs "{'scales': [100, 1000]}"
+
+Results are written as JSON (see write_results) so runs can be compared.
+"""
+
+import json
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import add_days, get_first_day, get_last_day, getdate, now_datetime
+
+from gvm_payroll.benchmarks import dataset
+from gvm_payroll.gvm_payroll.api.payroll_entry import process_quarter_additional_salaries
+from gvm_payroll.gvm_payroll.doctype.bulk_additional_salary.bulk_additional_salary import (
+	create_additional_salaries,
+	process_submit_additional_salaries,
+)
+from gvm_payroll.gvm_payroll.overrides.salary_slip import calculate_unpaid_days, split_internal_components
+from gvm_payroll.profiling import profile_report
+
+REPORTS = [
+	"annual_statement",
+	"bank_cover_letter",
+	"bank_payment_sheet",
+	"bank_statement",
+	"consolidated_salary",
+	"deduction_summary",
+	"esi_report",
+	"group_insurance_scheme",
+	"pf_report",
+	"salary_summary",
+	"sns_epf_report",
+	"sns_salary_summary",
+]
+
+# Reports run once more under tracemalloc with `profile_memory`
+MEMORY_PROFILED_REPORTS = ["annual_statement", "salary_summary", "consolidated_salary"]
+
+DEFAULT_SCALES = [100, 1000]
+
+# Salary Slips loaded for the hook timings
+HOOK_SAMPLE_SIZE = 200
+
+
+def run(
+	scales=None, months=3, seed=42, repeat=3, company=None, output=None, keep_data=False, profile_memory=False
+):
+	"""
+	Run the benchmarks at each scale (number of employees).
+
+	Args:
+		scales (list | str): Numbers of employees, e.g. [100, 1000] or "100,1000"
+		months (int): Months of Salary Slips generated per employee
+		seed (int): Seed of the dataset generator
+		repeat (int): Runs of each read-only measurement
+		company (str, optional): Company of the dataset
+		output (str, optional): Path of the JSON results
+		keep_data (bool): Leave the last dataset in place
+		profile_memory (bool): Also record per-phase memory profiles of MEMORY_PROFILED_REPORTS
+
+	Returns:
+		dict: results, as written to `output`
+	"""
+	if isinstance(scales, str):
+		scales = [int(s) for s in scales.split(",") if s.strip()]
+
+	results = {
+		"site": frappe.local.site,
+		"started": str(now_datetime()),
+		"frappe_version": frappe.__version__,
+		"months": int(months),
+		"seed": int(seed),
+		"repeat": int(repeat),
+		"scales": [],
+	}
+
+	try:
+		for employees in scales or DEFAULT_SCALES:
+			results["scales"].append(
+				run_scale(int(employees), int(months), int(seed), int(repeat), company, profile_memory)
+			)
+	finally:
+		if not keep_data:
+			dataset.delete_dataset()
+
+	results["finished"] = str(now_datetime())
+	results["output"] = write_results(results, output)
+	return results
+
+
+def run_scale(employees, months, seed, repeat, company=None, profile_memory=False):
+	with timer() as generation:
+		data = dataset.generate(employees=employees, months=months, seed=seed, company=company)
+
+	results = {
+		"employees": employees,
+		"salary_slips": employees * months,
+		"generate": generation["seconds"],
+		"reports": time_reports(data, repeat),
+		"salary_slip_hooks": time_salary_slip_hooks(data, repeat),
+		"quarter_charges": time_quarter_charges(data),
+		"bulk_additional_salary": time_bulk_additional_salary(data),
+	}
+	if profile_memory:
+		results["memory"] = {
+			report: profile_report(report, get_report_filters(report, data))
+			for report in MEMORY_PROFILED_REPORTS
+		}
+
+	return results
+
+
+def time_reports(data, repeat):
+	results = {}
+	for report in REPORTS:
+		module = frappe.get_module(f"gvm_payroll.gvm_payroll.report.{report}.{report}")
+		filters = get_report_filters(report, data)
+
+		timings = []
+		rows = 0
+		for _ in range(repeat):
+			with timer() as t:
+				result = module.execute(frappe._dict(filters))
+			timings.append(t["seconds"])
+			rows = len(result[1]) if result and len(result) > 1 else 0
+
+		results[report] = summarize(timings, rows=rows)
+
+	return results
+
+
+def get_report_filters(report, data):
+	"""Filters of the last generated month (the fiscal year for annual_statement)."""
+	last_month = getdate(data["months"][-1])
+	filters = {
+		"company": data["company"],
+		"from_date": str(last_month),
+		"to_date": str(get_last_day(last_month)),
+		"docstatus": "Submitted",
+	}
+
+	if report == "annual_statement":
+		filters = {"company": data["company"], "fiscal_year": data["fiscal_year"], "docstatus": "Submitted"}
+	elif report in ("consolidated_salary", "salary_summary"):
+		filters["currency"] = data["currency"]
+
+	return filters
+
+
+def time_salary_slip_hooks(data, repeat):
+	"""Time the before_save/before_submit hooks on a sample of the generated Salary Slips."""
+	names = frappe.get_all(
+		"Salary Slip",
+		filters={"employee": ["in", data["employees"][:HOOK_SAMPLE_SIZE]], "start_date": data["months"][-1]},
+		pluck="name",
+	)
+
+	results = {}
+	for hook in (split_internal_components, calculate_unpaid_days):
+		timings = []
+		for _ in range(repeat):
+			docs = [frappe.get_doc("Salary Slip", name) for name in names]
+			with timer() as t:
+				for doc in docs:
+					hook(doc)
+			timings.append(t["seconds"])
+
+		results[hook.__name__] = summarize(timings, slips=len(names))
+
+	return results
+
+
+def time_quarter_charges(data):
+	"""Time the quarter charges job on a Payroll Entry of every dataset employee."""
+	last_month = getdate(data["months"][-1])
+	pe = frappe.get_doc(
+		{
+			"doctype": "Payroll Entry",
+			"company": data["company"],
+			"posting_date": get_last_day(last_month),
+			"payroll_frequency": "Monthly",
+			"start_date": last_month,
+			"end_date": get_last_day(last_month),
+			"currency": data["currency"],
+			"exchange_rate": 1,
+			"employees": [{"employee": employee} for employee in data["employees"]],
+		}
+	)
+	pe.flags.ignore_validate = True
+	pe.insert(ignore_mandatory=True, ignore_permissions=True)
+	frappe.db.commit()
+
+	try:
+		with timer() as t:
+			result = process_quarter_additional_salaries(pe.name)
+	finally:
+		delete_additional_salaries("Payroll Entry", pe.name)
+		frappe.delete_doc("Payroll Entry", pe.name, force=True, ignore_permissions=True)
+		frappe.db.commit()
+
+	return {"seconds": t["seconds"], "created": len(result["created"])}
+
+
+def time_bulk_additional_salary(data):
+	"""Time creating (row by row and batched) and submitting Additional Salaries of a Bulk Additional Salary."""
+	payroll_date = add_days(get_first_day(data["months"][-1]), 1)
+	component = f"{dataset.MASTER_PREFIX} Quarter Water"
+	doc = frappe.get_doc(
+		{
+			"doctype": "Bulk Additional Salary",
+			"company": data["company"],
+			"payroll_date": payroll_date,
+			"charges": [
+				{"employee": employee, "salary_component": component, "amount": 100}
+				for employee in data["employees"]
+			],
+		}
+	).insert(ignore_permissions=True)
+	frappe.db.commit()
+
+	results = {"rows": len(data["employees"])}
+	try:
+		for mode, batched in (("create", 0), ("create_batched", 1)):
+			with timer() as t:
+				create_additional_salaries(doc.name, batched=batched)
+			frappe.db.commit()
+			results[mode] = t["seconds"]
+
+			if not batched:
+				delete_additional_salaries("Bulk Additional Salary", doc.name)
+
+		with timer() as t:
+			summary = process_submit_additional_salaries(doc.name)
+		results["submit"] = t["seconds"]
+		results["submit_failed"] = len(summary["failed"])
+	finally:
+		delete_additional_salaries("Bulk Additional Salary", doc.name)
+		frappe.delete_doc("Bulk Additional Salary", doc.name, force=True, ignore_permissions=True)
+		frappe.db.commit()
+
+	return results
+
+
+def delete_additional_salaries(ref_doctype, ref_docname):
+	frappe.db.delete("Additional Salary", {"ref_doctype": ref_doctype, "ref_docname": ref_docname})
+	frappe.db.commit()
+
+
+def summarize(timings, **extra):
+	return {
+		"min": round(min(timings), 4),
+		"median": round(statistics.median(timings), 4),
+		"max": round(max(timings), 4),
+		**extra,
+	}
+
+
+def write_results(results, output=None):
+	"""Write the results as JSON, by default to the site's private files; returns the path."""
+	if not output:
+		output = frappe.get_site_path(
+			"private", "files", f"gvm_payroll_benchmark_{now_datetime():%Y%m%d%H%M%S}.json"
+		)
+
+	os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+	with open(output, "w") as f:
+		json.dump(results, f, indent=1, default=str)
+
+	return output
+
+
+@contextmanager
+def timer():
+	"""Measure the wall time of a block; the seconds are set on the yielded dict when it exits."""
+	result = {}
+	start = time.perf_counter()
+	try:
+		yield result
+	finally:
+		result["seconds"] = round(time.perf_counter() - start, 4)
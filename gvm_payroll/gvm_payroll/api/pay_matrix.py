@@ -0,0 +1,309 @@
+import csv
+import io
+import json
+from bisect import bisect_right
+
+import frappe
+from frappe.utils import cint, flt, now_datetime
+from frappe.utils.background_jobs import is_job_enqueued
+
+from gvm_payroll.gvm_payroll.doctype.pay_matrix_snapshot.pay_matrix_snapshot import get_matrix_as_of
+
+PAY_MATRIX_INDEX_KEY = "gvm_payroll:pay_matrix_index"
+DESIGNATION_LEVELS_KEY = "gvm_payroll:designation_matrix_levels"
+
+# Number of Employee rows written per batched UPDATE when re-pricing
+REPRICE_CHUNK_SIZE = 500
+
+
+@frappe.whitelist()
+def get_basic_salary(designation: str, pay_matrix: str, years_experienced=None, as_of=None):
+	"""
+	Resolve the pay level and basic salary of a designation in a pay matrix.
+
+	The basic salary is the amount of the exact year of experience or, if the level
+	has no such year, of the closest lower year. With `as_of`, amounts come from the
+	Pay Matrix Snapshot effective on that date (for recomputing past payroll) instead
+	of the live matrix, which is still used when no snapshot is that old.
+
+	Returns:
+		dict: {"level": Pay Matrix Level name or None, "basic_salary": amount or None}
+	"""
+	frappe.has_permission("Pay Matrix", "read", throw=True)
+	return resolve_basic_salary(designation, pay_matrix, years_experienced, as_of)
+
+
+def resolve_basic_salary(designation, pay_matrix, years_experienced=None, as_of=None):
+	"""Level and basic salary of a designation in a pay matrix, see get_basic_salary."""
+	level = get_designation_levels().get((designation, pay_matrix))
+	basic_salary = None
+	if level and years_experienced not in (None, ""):
+		index = get_matrix_as_of(pay_matrix, as_of) if as_of else None
+		basic_salary = lookup_basic(pay_matrix, level, years_experienced, index=index)
+
+	return {"level": level, "basic_salary": basic_salary}
+
+
+@frappe.whitelist()
+def resolve_basic(employees, as_of=None):
+	"""
+	Resolve the pay level and basic salary of many employees at once.
+
+	Args:
+		employees (list | str): Employee IDs (or a JSON list of them)
+		as_of (str, optional): Resolve against the pay matrices effective on this date
+
+	Returns:
+		dict: {employee: {"level", "basic_salary"}} from each employee's designation,
+		custom_pay_matrix and custom_years_experienced
+	"""
+	if isinstance(employees, str):
+		employees = json.loads(employees)
+
+	frappe.has_permission("Employee", "read", throw=True)
+
+	result = {}
+	for d in frappe.get_list(
+		"Employee",
+		filters={"name": ["in", employees]},
+		fields=["name", "designation", "custom_pay_matrix", "custom_years_experienced"],
+	):
+		result[d.name] = resolve_basic_salary(
+			d.designation, d.custom_pay_matrix, d.custom_years_experienced, as_of=as_of
+		)
+
+	return result
+
+
+@frappe.whitelist()
+def reprice_employees(pay_matrix: str, dry_run: int = 1):
+	"""
+	Recompute custom_level and custom_basic_salary of every employee on a Pay Matrix.
+
+	With `dry_run` the changes are only computed and returned. Otherwise the update
+	runs in a background job (process_reprice_employees) and its summary is sent with
+	the `pay_matrix_reprice_completed` realtime event.
+
+	Returns:
+		dict: dry run: {"changes": [...], "unchanged": int, "unresolved": [...]},
+		otherwise {"queued": True}
+	"""
+	frappe.has_permission("Employee", "write", throw=True)
+	if not frappe.db.exists("Pay Matrix", pay_matrix):
+		frappe.throw(f"Pay Matrix {pay_matrix} not found")
+
+	if cint(dry_run):
+		return get_reprice_changes(pay_matrix)
+
+	job_id = f"pay_matrix_reprice::{pay_matrix}"
+	if is_job_enqueued(job_id):
+		frappe.throw("Employees of this Pay Matrix are already being re-priced")
+
+	frappe.enqueue(
+		"gvm_payroll.gvm_payroll.api.pay_matrix.process_reprice_employees",
+		queue="long",
+		timeout=3600,
+		job_id=job_id,
+		deduplicate=True,
+		pay_matrix=pay_matrix,
+	)
+	return {"queued": True}
+
+
+def process_reprice_employees(pay_matrix: str):
+	"""
+	Write the re-priced level and basic salary of the employees on a Pay Matrix.
+
+	Only employees whose values changed are written, REPRICE_CHUNK_SIZE rows per
+	UPDATE. The diff is attached to the Pay Matrix as a CSV report.
+	"""
+	result = get_reprice_changes(pay_matrix)
+	changes = result["changes"]
+
+	frappe.db.bulk_update(
+		"Employee",
+		{
+			d["employee"]: {"custom_level": d["new_level"], "custom_basic_salary": d["new_basic_salary"]}
+			for d in changes
+		},
+		chunk_size=REPRICE_CHUNK_SIZE,
+	)
+
+	report = None
+	if changes:
+		report = attach_reprice_report(pay_matrix, changes)
+	frappe.db.commit()
+
+	summary = {
+		"pay_matrix": pay_matrix,
+		"updated": len(changes),
+		"unchanged": result["unchanged"],
+		"unresolved": len(result["unresolved"]),
+		"report": report,
+	}
+	frappe.publish_realtime("pay_matrix_reprice_completed", summary, doctype="Pay Matrix", docname=pay_matrix)
+	return summary
+
+
+def get_reprice_changes(pay_matrix):
+	"""
+	Compute the level and basic salary of every employee on a Pay Matrix in memory.
+
+	Employees are read with one query and resolved against freshly built pay matrix
+	and designation lookups, so a revision saved moments ago is always picked up.
+
+	Returns:
+		dict: {
+			"changes": rows whose level or basic salary differ,
+			"unchanged": number of employees already up to date,
+			"unresolved": employees whose designation has no level in the matrix,
+		}
+	"""
+	index = build_pay_matrix_index()
+	designation_levels = build_designation_levels()
+
+	changes = []
+	unresolved = []
+	unchanged = 0
+	for emp in frappe.get_all(
+		"Employee",
+		filters={"custom_pay_matrix": pay_matrix, "status": ["!=", "Left"]},
+		fields=[
+			"name",
+			"employee_name",
+			"designation",
+			"custom_years_experienced",
+			"custom_level",
+			"custom_basic_salary",
+		],
+		order_by="name asc",
+	):
+		level = designation_levels.get((emp.designation, pay_matrix))
+		if not level:
+			unresolved.append(
+				{"employee": emp.name, "employee_name": emp.employee_name, "designation": emp.designation}
+			)
+			continue
+
+		basic_salary = lookup_basic(pay_matrix, level, emp.custom_years_experienced, index=index)
+		if basic_salary is None:
+			basic_salary = flt(emp.custom_basic_salary)
+
+		if level == emp.custom_level and flt(basic_salary) == flt(emp.custom_basic_salary):
+			unchanged += 1
+			continue
+
+		changes.append(
+			{
+				"employee": emp.name,
+				"employee_name": emp.employee_name,
+				"designation": emp.designation,
+				"years_experienced": emp.custom_years_experienced,
+				"old_level": emp.custom_level,
+				"new_level": level,
+				"old_basic_salary": flt(emp.custom_basic_salary),
+				"new_basic_salary": basic_salary,
+			}
+		)
+
+	return {"changes": changes, "unchanged": unchanged, "unresolved": unresolved}
+
+
+def attach_reprice_report(pay_matrix, changes):
+	"""Attach the re-pricing diff to the Pay Matrix as a private CSV file and return its URL."""
+	columns = list(changes[0])
+	out = io.StringIO()
+	writer = csv.DictWriter(out, fieldnames=columns)
+	writer.writeheader()
+	writer.writerows(changes)
+
+	file = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": f"reprice-{frappe.scrub(pay_matrix)}-{now_datetime():%Y%m%d%H%M%S}.csv",
+			"attached_to_doctype": "Pay Matrix",
+			"attached_to_name": pay_matrix,
+			"is_private": 1,
+			"content": out.getvalue(),
+		}
+	).insert(ignore_permissions=True)
+	return file.file_url
+
+
+def lookup_basic(pay_matrix, level, years_experienced, index=None):
+	"""Amount of the exact or closest lower year of a pay level, or None."""
+	if index is None:
+		index = get_pay_matrix_index()
+	years, amounts = index.get((pay_matrix, level), ((), ()))
+	position = bisect_right(years, flt(years_experienced))
+	if not position:
+		return None
+	return amounts[position - 1]
+
+
+def get_pay_matrix_index():
+	"""
+	(pay_matrix, level) -> (sorted years, amounts) for every Pay Matrix Level.
+
+	Built from one query and kept in the cache until a Pay Matrix Level changes.
+	"""
+	return frappe.cache().get_value(PAY_MATRIX_INDEX_KEY, generator=build_pay_matrix_index)
+
+
+def build_pay_matrix_index():
+	level = frappe.qb.DocType("Pay Matrix Level")
+	item = frappe.qb.DocType("Matrix Level Items")
+
+	rows = (
+		frappe.qb.from_(item)
+		.join(level)
+		.on(item.parent == level.name)
+		.select(level.pay_matrix, level.name, item.year, item.amount)
+		.where((item.parenttype == "Pay Matrix Level") & (item.parentfield == "years"))
+		.run(as_dict=True)
+	)
+
+	steps = {}
+	for row in rows:
+		year = str(row.year or "").strip()
+		try:
+			year = float(year)
+		except ValueError:
+			continue
+		steps.setdefault((row.pay_matrix, row.name), {})[year] = flt(row.amount)
+
+	index = {}
+	for key, amounts_by_year in steps.items():
+		years = sorted(amounts_by_year)
+		index[key] = (years, [amounts_by_year[year] for year in years])
+
+	return index
+
+
+def get_designation_levels():
+	"""(designation, pay_matrix) -> Pay Matrix Level, from the Designation matrix levels."""
+	return frappe.cache().get_value(DESIGNATION_LEVELS_KEY, generator=build_designation_levels)
+
+
+def build_designation_levels():
+	levels = {}
+	for row in frappe.get_all(
+		"Designation Matrix Level",
+		filters={"parenttype": "Designation", "parentfield": "custom_matrix_levels"},
+		fields=["parent", "pay_matrix", "level"],
+		order_by="idx asc",
+	):
+		# First row for a pay matrix wins, as in the Employee form
+		levels.setdefault((row.parent, row.pay_matrix), row.level)
+
+	return levels
+
+
+def clear_pay_matrix_index(doc=None, method=None):
+	"""Drop the cached pay matrix index. Runs when a Pay Matrix Level changes."""
+	frappe.cache().delete_value(PAY_MATRIX_INDEX_KEY)
+
+
+def clear_designation_levels(doc=None, method=None):
+	"""Drop the cached designation levels. Runs on Designation on_update/on_trash hooks."""
+	frappe.cache().delete_value(DESIGNATION_LEVELS_KEY)
@@ -1,14 +1,252 @@
+import math
+import time
+
 import frappe
-from frappe.utils import getdate, nowdate, date_diff, add_days
+from frappe.utils import add_days, add_to_date, cint, date_diff, getdate, now_datetime, nowdate
+from frappe.utils.background_jobs import is_job_enqueued
+from hrms.payroll.doctype.payroll_entry.payroll_entry import get_existing_salary_slips
+
+from gvm_payroll.gvm_payroll.overrides.additional_salary import get_idempotency_key
+from gvm_payroll.gvm_payroll.overrides.salary_slip import clear_prefetched_unpaid_days, prefetch_unpaid_days
+from gvm_payroll.instrumentation import instrumented
+
+# Number of employees processed between commits (and checkpoint updates)
+QUARTER_CHARGES_COMMIT_SIZE = 50
+
+# Employees per salary slip shard, and the most shards a Payroll Entry is split into
+SALARY_SLIP_SHARD_SIZE = 500
+MAX_SALARY_SLIP_SHARDS = 8
+
+# Salary Slips inserted between commits within a shard
+SALARY_SLIP_COMMIT_SIZE = 50
+
+# Minutes after which a Queued Payroll Entry's shards without a job or result are failed
+SHARD_STALL_MINUTES = 30
+
+# How long shard results are kept after the last shard finishes
+SHARD_REPORT_EXPIRY = 7 * 24 * 3600
 
 
 @frappe.whitelist()
 def create_quarter_additional_salaries(payroll_entry: str):
+	"""
+	Queue creation of Additional Salary records for employees in the given Payroll Entry
+	using their assigned quarter charges.
+
+	The records are created by `process_quarter_additional_salaries` in a background job.
+	Progress is published to the Payroll Entry form and the created/skipped summary is
+	sent with the `quarter_charges_completed` realtime event.
+	"""
+	pe = get_quarter_charges_payroll_entry(payroll_entry)
+
+	job_id = get_quarter_charges_job_id(pe.name)
+	if is_job_enqueued(job_id):
+		frappe.throw("Quarter charges are already being attached for this Payroll Entry.")
+
+	frappe.enqueue(
+		"gvm_payroll.gvm_payroll.api.payroll_entry.process_quarter_additional_salaries",
+		queue="long",
+		timeout=3600,
+		job_id=job_id,
+		deduplicate=True,
+		payroll_entry=pe.name,
+	)
+
+	return {
+		"queued": True,
+		"checkpoint": cint(pe.get("custom_quarter_charges_checkpoint")),
+		"total": len(pe.employees),
+	}
+
+
+@instrumented("job:quarter_charges")
+def process_quarter_additional_salaries(payroll_entry: str):
 	"""
 	Create Additional Salary records for employees in the given Payroll Entry
 	using their assigned quarter charges. The payroll_date is set to the midpoint
 	between start_date and end_date (inclusive).
+
+	Work is committed every QUARTER_CHARGES_COMMIT_SIZE employees and the index of the
+	next employee row is stored in `custom_quarter_charges_checkpoint`, so a re-run
+	after a timeout or failure resumes where the previous run stopped.
 	"""
+	pe = get_quarter_charges_payroll_entry(payroll_entry)
+	payroll_date = get_quarter_payroll_date(pe)
+
+	employees = [row.employee for row in pe.employees if row.employee]
+	total = len(employees)
+
+	checkpoint = cint(pe.get("custom_quarter_charges_checkpoint"))
+	if checkpoint >= total:
+		checkpoint = 0
+
+	summary_key = get_quarter_charges_job_id(pe.name)
+	summary = (checkpoint and frappe.cache().get_value(summary_key)) or {"created": [], "skipped": []}
+	quarter_charges = {}
+	existing_keys = get_existing_idempotency_keys(pe.name)
+
+	try:
+		for chunk_start in range(checkpoint, total, QUARTER_CHARGES_COMMIT_SIZE):
+			chunk = employees[chunk_start : chunk_start + QUARTER_CHARGES_COMMIT_SIZE]
+			employee_quarters = dict(
+				frappe.get_all(
+					"Employee",
+					filters={"name": ["in", chunk]},
+					fields=["name", "custom_quarter"],
+					as_list=True,
+				)
+			)
+
+			for employee in chunk:
+				create_employee_quarter_charges(
+					pe,
+					employee,
+					employee_quarters.get(employee),
+					payroll_date,
+					quarter_charges,
+					existing_keys,
+					summary,
+				)
+
+			checkpoint = chunk_start + len(chunk)
+			pe.db_set("custom_quarter_charges_checkpoint", checkpoint, update_modified=False)
+			frappe.cache().set_value(summary_key, summary, expires_in_sec=86400)
+			frappe.db.commit()
+
+			frappe.publish_realtime(
+				"quarter_charges_progress",
+				{"payroll_entry": pe.name, "progress": checkpoint, "total": total},
+				doctype="Payroll Entry",
+				docname=pe.name,
+			)
+	except Exception:
+		frappe.db.rollback()
+		frappe.log_error(title=f"Quarter Charges failed for {pe.name}")
+		frappe.publish_realtime(
+			"quarter_charges_failed",
+			{"payroll_entry": pe.name, "progress": checkpoint, "total": total},
+			doctype="Payroll Entry",
+			docname=pe.name,
+		)
+		raise
+
+	pe.db_set("custom_quarter_charges_checkpoint", 0, update_modified=False)
+	frappe.cache().delete_value(summary_key)
+	frappe.db.commit()
+
+	result = {"created": summary["created"], "skipped": summary["skipped"], "payroll_date": payroll_date}
+	frappe.publish_realtime(
+		"quarter_charges_completed",
+		dict(result, payroll_entry=pe.name),
+		doctype="Payroll Entry",
+		docname=pe.name,
+	)
+	return result
+
+
+def create_employee_quarter_charges(
+	pe, employee, quarter, payroll_date, quarter_charges, existing_keys, summary
+):
+	"""
+	Create and submit Additional Salary records for one employee's quarter charges.
+
+	Charges whose idempotency key was already generated are skipped without a query.
+	A record inserted concurrently by another worker is rejected by the unique index
+	on custom_idempotency_key, or by HRMS's duplicate check once it is committed, and
+	skipped the same way.
+	"""
+	if not quarter:
+		summary["skipped"].append({"employee": employee, "reason": "No quarter set"})
+		return
+
+	if quarter not in quarter_charges:
+		quarter_charges[quarter] = frappe.get_doc("Quarter", quarter).charges
+
+	if not quarter_charges[quarter]:
+		summary["skipped"].append({"employee": employee, "reason": "No charges in quarter"})
+		return
+
+	for charge in quarter_charges[quarter]:
+		if not charge.charge or charge.amount is None:
+			continue
+
+		key = get_idempotency_key("Payroll Entry", pe.name, employee, charge.charge)
+		if key in existing_keys:
+			summary["skipped"].append(
+				{"employee": employee, "component": charge.charge, "reason": "Already exists"}
+			)
+			continue
+
+		additional = frappe.get_doc(
+			{
+				"doctype": "Additional Salary",
+				"employee": employee,
+				"salary_component": charge.charge,
+				"amount": charge.amount,
+				"company": pe.company,
+				"payroll_date": payroll_date,
+				"overwrite_salary_structure_amount": 1,
+				"ref_doctype": "Payroll Entry",
+				"ref_docname": pe.name,
+			}
+		)
+
+		frappe.db.savepoint("quarter_charge")
+		try:
+			additional.insert(ignore_permissions=True)
+		except frappe.ValidationError as e:
+			frappe.db.rollback(save_point="quarter_charge")
+			# HRMS's own duplicate check can reject the record before the unique index does
+			if not isinstance(e, frappe.UniqueValidationError) and not has_overwriting_additional_salary(
+				additional
+			):
+				raise
+			frappe.clear_messages()
+			existing_keys.add(key)
+			summary["skipped"].append(
+				{"employee": employee, "component": charge.charge, "reason": "Already exists"}
+			)
+			continue
+
+		additional.submit()
+		existing_keys.add(key)
+		summary["created"].append(additional.name)
+
+
+def has_overwriting_additional_salary(additional):
+	"""Return True if a submitted Additional Salary overwrites the same component on the same date."""
+	return bool(
+		frappe.db.exists(
+			"Additional Salary",
+			{
+				"employee": additional.employee,
+				"salary_component": additional.salary_component,
+				"payroll_date": additional.payroll_date,
+				"overwrite_salary_structure_amount": 1,
+				"docstatus": 1,
+			},
+		)
+	)
+
+
+def get_existing_idempotency_keys(payroll_entry):
+	"""Idempotency keys of the non-cancelled Additional Salaries generated by a Payroll Entry."""
+	return set(
+		frappe.get_all(
+			"Additional Salary",
+			filters={
+				"ref_doctype": "Payroll Entry",
+				"ref_docname": payroll_entry,
+				"docstatus": ["!=", 2],
+				"custom_idempotency_key": ["is", "set"],
+			},
+			pluck="custom_idempotency_key",
+		)
+	)
+
+
+def get_quarter_charges_payroll_entry(payroll_entry):
+	"""Load the Payroll Entry and validate it can have quarter charges attached."""
 	if not payroll_entry:
 		frappe.throw("Payroll Entry is required")
 
@@ -23,68 +261,328 @@ def create_quarter_additional_salaries(payroll_entry: str):
 	if not pe.start_date or not pe.end_date:
 		frappe.throw("Start Date and End Date are required on Payroll Entry.")
 
+	if getdate(pe.end_date) < getdate(pe.start_date):
+		frappe.throw("End Date cannot be before Start Date.")
+
+	return pe
+
+
+def get_quarter_payroll_date(pe):
+	"""Midpoint between the Payroll Entry start and end dates."""
 	start = getdate(pe.start_date)
 	end = getdate(pe.end_date)
-	if end < start:
-		frappe.throw("End Date cannot be before Start Date.")
 
 	diff = date_diff(end, start)
 	midpoint = add_days(start, diff // 2)
-	payroll_date = midpoint or getdate(nowdate())
+	return midpoint or getdate(nowdate())
 
-	created = []
-	skipped = []
 
-	for row in pe.employees:
-		if not row.employee:
-			continue
+def get_quarter_charges_job_id(payroll_entry):
+	return f"quarter_charges::{payroll_entry}"
 
-		emp = frappe.get_doc("Employee", row.employee)
-		quarter = emp.get("custom_quarter")
-		if not quarter:
-			skipped.append({"employee": emp.name, "reason": "No quarter set"})
-			continue
 
-		q_doc = frappe.get_doc("Quarter", quarter)
-		if not q_doc.charges:
-			skipped.append({"employee": emp.name, "reason": "No charges in quarter"})
-			continue
+@frappe.whitelist()
+def create_salary_slips_sharded(payroll_entry: str, shards=None):
+	"""
+	Queue creation of the Salary Slips of a submitted Payroll Entry as parallel shards.
+
+	While the entry is Queued, only the shards whose job stopped before recording a
+	result (e.g. a worker killed by a timeout or out of memory) are queued again; slips
+	they had already committed are skipped.
+	"""
+	pe = frappe.get_doc("Payroll Entry", payroll_entry)
+	pe.check_permission("write")
 
-		for charge in q_doc.charges:
-			if not charge.charge or charge.amount is None:
-				continue
+	if pe.status == "Queued" and cint(frappe.cache().get_value(get_salary_slip_shard_key(pe.name, "total"))):
+		return resume_salary_slip_shards(pe)
 
-			exists = frappe.db.exists(
-				"Additional Salary",
+	return queue_salary_slip_shards(pe, shards)
+
+
+def queue_salary_slip_shards(pe, shards=None):
+	"""
+	Split the employees of a submitted Payroll Entry into `shards` contiguous shards (by
+	default one per SALARY_SLIP_SHARD_SIZE employees, at most MAX_SALARY_SLIP_SHARDS) and
+	queue each as its own job (process_salary_slip_shard). The Payroll Entry is marked
+	as done when the last shard finishes; the per-shard report is sent with the
+	`salary_slip_shards_completed` realtime event and kept for get_salary_slip_shard_report.
+	"""
+	if pe.docstatus != 1:
+		frappe.throw("Submit the Payroll Entry before creating Salary Slips.")
+
+	if pe.salary_slips_created:
+		frappe.throw("Salary Slips are already created for this Payroll Entry.")
+
+	employees = get_payroll_entry_employees(pe)
+	if not employees:
+		frappe.throw("No employees found in Payroll Entry. Click 'Get Employees' first.")
+
+	if any(is_job_enqueued(get_salary_slip_shard_job_id(pe.name, i)) for i in range(MAX_SALARY_SLIP_SHARDS)):
+		frappe.throw("Salary Slips are already being created for this Payroll Entry.")
+
+	shards = cint(shards) or math.ceil(len(employees) / SALARY_SLIP_SHARD_SIZE)
+	shards = max(1, min(shards, MAX_SALARY_SLIP_SHARDS, len(employees)))
+
+	reset_salary_slip_shards(pe.name, shards)
+	pe.db_set({"status": "Queued", "error_message": ""})
+
+	args = get_salary_slip_args(pe)
+	for shard in range(shards):
+		enqueue_salary_slip_shard(pe.name, shard, get_shard_employees(employees, shards, shard), args)
+
+	return {"queued": True, "shards": shards, "total": len(employees)}
+
+
+def resume_salary_slip_shards(pe):
+	"""Queue again the shards of a Queued Payroll Entry that stopped without a result."""
+	shards = cint(frappe.cache().get_value(get_salary_slip_shard_key(pe.name, "total")))
+	stalled = get_stalled_salary_slip_shards(pe.name, shards)
+	if not stalled:
+		frappe.throw("Salary Slips are already being created for this Payroll Entry.")
+
+	employees = get_payroll_entry_employees(pe)
+	args = get_salary_slip_args(pe)
+	for shard in stalled:
+		enqueue_salary_slip_shard(pe.name, shard, get_shard_employees(employees, shards, shard), args)
+
+	return {"queued": True, "shards": len(stalled), "total": len(employees)}
+
+
+def enqueue_salary_slip_shard(payroll_entry, shard, employees, args):
+	frappe.enqueue(
+		"gvm_payroll.gvm_payroll.api.payroll_entry.process_salary_slip_shard",
+		queue="long",
+		timeout=3600,
+		job_id=get_salary_slip_shard_job_id(payroll_entry, shard),
+		deduplicate=True,
+		enqueue_after_commit=True,
+		payroll_entry=payroll_entry,
+		shard=shard,
+		employees=employees,
+		args=args,
+	)
+
+
+def get_payroll_entry_employees(pe):
+	return [row.employee for row in pe.employees if row.employee]
+
+
+def get_shard_employees(employees, shards, shard):
+	"""Employees of one of `shards` contiguous shards, the same split on every call."""
+	shard_size = math.ceil(len(employees) / shards)
+	return employees[shard * shard_size : (shard + 1) * shard_size]
+
+
+def get_stalled_salary_slip_shards(payroll_entry, shards):
+	"""
+	Shards with neither a queued or running job nor a recorded result. A shard records
+	its result before its job ends, so the job is checked first.
+	"""
+	cache = frappe.cache()
+	key = get_salary_slip_shard_key(payroll_entry)
+	return [
+		shard
+		for shard in range(shards)
+		if not is_job_enqueued(get_salary_slip_shard_job_id(payroll_entry, shard))
+		and cache.hget(key, str(shard)) is None
+	]
+
+
+def fail_stalled_salary_slip_shards():
+	"""
+	Record a Failed result for the stalled shards of Payroll Entries queued more than
+	SHARD_STALL_MINUTES ago, so the entry is completed as Failed instead of staying
+	Queued and its Salary Slips can be created again. Runs hourly.
+	"""
+	payroll_entries = frappe.get_all(
+		"Payroll Entry",
+		filters={
+			"docstatus": 1,
+			"status": "Queued",
+			"modified": ["<", add_to_date(now_datetime(), minutes=-SHARD_STALL_MINUTES)],
+		},
+		pluck="name",
+	)
+
+	for payroll_entry in payroll_entries:
+		shards = cint(frappe.cache().get_value(get_salary_slip_shard_key(payroll_entry, "total")))
+		stalled = get_stalled_salary_slip_shards(payroll_entry, shards)
+		if not stalled:
+			continue
+
+		employees = get_payroll_entry_employees(frappe.get_doc("Payroll Entry", payroll_entry))
+		for shard in stalled:
+			record_salary_slip_shard(
+				payroll_entry,
 				{
-					"ref_doctype": "Payroll Entry",
-					"ref_docname": pe.name,
-					"employee": emp.name,
-					"salary_component": charge.charge,
-					"docstatus": ["!=", 2],
+					"shard": shard,
+					"employees": len(get_shard_employees(employees, shards, shard)),
+					"created": 0,
+					"skipped": 0,
+					"failed": [],
+					"status": "Failed",
+					"error": "The shard job stopped before finishing",
+					"seconds": 0,
 				},
 			)
-			if exists:
-				skipped.append({"employee": emp.name, "component": charge.charge, "reason": "Already exists"})
-				continue
 
-			additional = frappe.get_doc(
-				{
-					"doctype": "Additional Salary",
-					"employee": emp.name,
-					"salary_component": charge.charge,
-					"amount": charge.amount,
-					"company": pe.company,
-					"payroll_date": payroll_date,
-					"overwrite_salary_structure_amount": 1,
-					"ref_doctype": "Payroll Entry",
-					"ref_docname": pe.name,
-				}
-			)
-			additional.insert(ignore_permissions=True)
-			additional.submit()
-			created.append(additional.name)
 
+@instrumented("job:salary_slip_shard")
+def process_salary_slip_shard(payroll_entry: str, shard: int, employees: list, args: dict):
+	"""
+	Create the Salary Slips of one shard of a Payroll Entry.
+
+	Unpaid days of the shard's employees are prefetched once, slips are inserted with a
+	savepoint each and committed every SALARY_SLIP_COMMIT_SIZE, so one failing employee
+	(or shard) does not undo the others. The shard's result and timing are recorded;
+	the last shard to finish completes the Payroll Entry.
+	"""
+	started = time.perf_counter()
+	result = {"shard": shard, "employees": len(employees), "created": 0, "skipped": 0, "failed": []}
+
+	try:
+		args = frappe._dict(args)
+		existing = set(get_existing_salary_slips(employees, args))
+		pending = [employee for employee in employees if employee not in existing]
+		result["skipped"] = len(existing)
+
+		prefetch_unpaid_days(args.start_date, args.end_date, pending)
+		for chunk_start in range(0, len(pending), SALARY_SLIP_COMMIT_SIZE):
+			for employee in pending[chunk_start : chunk_start + SALARY_SLIP_COMMIT_SIZE]:
+				frappe.db.savepoint("salary_slip_shard")
+				try:
+					frappe.get_doc(dict(args, doctype="Salary Slip", employee=employee)).insert()
+					result["created"] += 1
+				except Exception as e:
+					frappe.db.rollback(save_point="salary_slip_shard")
+					frappe.clear_messages()
+					result["failed"].append({"employee": employee, "error": str(e)})
+			frappe.db.commit()
+
+		result["status"] = "Completed"
+	except Exception as e:
+		frappe.db.rollback()
+		frappe.log_error(
+			title=f"Salary Slip shard {shard} failed for {payroll_entry}",
+			reference_doctype="Payroll Entry",
+			reference_name=payroll_entry,
+		)
+		result["status"] = "Failed"
+		result["error"] = str(e)
+	finally:
+		clear_prefetched_unpaid_days()
+
+	result["seconds"] = round(time.perf_counter() - started, 2)
+	record_salary_slip_shard(payroll_entry, result)
+
+
+def get_salary_slip_args(pe):
+	"""Salary Slip values shared by all employees, as in Payroll Entry.create_salary_slips."""
+	return {
+		"salary_slip_based_on_timesheet": pe.salary_slip_based_on_timesheet,
+		"payroll_frequency": pe.payroll_frequency,
+		"start_date": str(pe.start_date),
+		"end_date": str(pe.end_date),
+		"company": pe.company,
+		"posting_date": str(pe.posting_date),
+		"deduct_tax_for_unclaimed_employee_benefits": pe.deduct_tax_for_unclaimed_employee_benefits,
+		"deduct_tax_for_unsubmitted_tax_exemption_proof": pe.deduct_tax_for_unsubmitted_tax_exemption_proof,
+		"payroll_entry": pe.name,
+		"exchange_rate": pe.exchange_rate,
+		"currency": pe.currency,
+	}
+
+
+def reset_salary_slip_shards(payroll_entry, shards):
+	cache = frappe.cache()
+	cache.delete_value(get_salary_slip_shard_key(payroll_entry))
+	cache.set_value(
+		get_salary_slip_shard_key(payroll_entry, "total"), shards, expires_in_sec=SHARD_REPORT_EXPIRY
+	)
+
+	pipe = cache.pipeline()
+	pipe.delete(cache.make_key(get_salary_slip_shard_key(payroll_entry, "finished")))
+	pipe.execute()
+
+
+def record_salary_slip_shard(payroll_entry, result):
+	"""
+	Store a shard's result and complete the Payroll Entry if it was the last shard.
+
+	Finished shards are counted with an atomic Redis INCR, so exactly one shard sees
+	the final count and completes the entry.
+	"""
+	cache = frappe.cache()
+	key = get_salary_slip_shard_key(payroll_entry)
+	cache.hset(key, str(result["shard"]), result)
+
+	pipe = cache.pipeline()
+	pipe.incr(cache.make_key(get_salary_slip_shard_key(payroll_entry, "finished")))
+	finished = pipe.execute()[0]
+
+	frappe.publish_realtime(
+		"salary_slip_shard_completed",
+		{"payroll_entry": payroll_entry, "finished": finished, **result},
+		doctype="Payroll Entry",
+		docname=payroll_entry,
+	)
+
+	total = cint(cache.get_value(get_salary_slip_shard_key(payroll_entry, "total")))
+	if finished >= total:
+		complete_salary_slip_shards(payroll_entry)
+
+
+def complete_salary_slip_shards(payroll_entry):
+	report = get_salary_slip_shard_report(payroll_entry)
+	failed = [row for shard in report["shards"] for row in shard.get("failed", [])]
+	failed_shards = [shard for shard in report["shards"] if shard.get("status") != "Completed"]
+
+	pe = frappe.get_doc("Payroll Entry", payroll_entry)
+	if failed or failed_shards:
+		errors = [f"Shard {shard['shard']}: {shard.get('error')}" for shard in failed_shards]
+		errors += [f"{row['employee']}: {row['error']}" for row in failed]
+		pe.db_set({"status": "Failed", "error_message": "<br>".join(errors)})
+	else:
+		pe.db_set({"status": "Submitted", "salary_slips_created": 1, "error_message": ""})
 	frappe.db.commit()
-	return {"created": created, "skipped": skipped, "payroll_date": payroll_date}
 
+	cache = frappe.cache()
+	pipe = cache.pipeline()
+	pipe.expire(cache.make_key(get_salary_slip_shard_key(payroll_entry)), SHARD_REPORT_EXPIRY)
+	pipe.delete(cache.make_key(get_salary_slip_shard_key(payroll_entry, "finished")))
+	pipe.execute()
+
+	frappe.publish_realtime(
+		"salary_slip_shards_completed",
+		{"payroll_entry": payroll_entry, **report},
+		doctype="Payroll Entry",
+		docname=payroll_entry,
+	)
+
+
+@frappe.whitelist()
+def get_salary_slip_shard_report(payroll_entry: str):
+	"""
+	Results of the salary slip shards of a Payroll Entry.
+
+	Returns:
+		dict: {"shards": [{"shard", "employees", "created", "skipped", "failed",
+		"status", "seconds"}, ...], "total": number of shards}
+	"""
+	frappe.has_permission("Payroll Entry", "read", payroll_entry, throw=True)
+
+	cache = frappe.cache()
+	shards = cache.hgetall(get_salary_slip_shard_key(payroll_entry))
+	return {
+		"shards": sorted(shards.values(), key=lambda shard: shard["shard"]),
+		"total": cint(cache.get_value(get_salary_slip_shard_key(payroll_entry, "total"))),
+	}
+
+
+def get_salary_slip_shard_key(payroll_entry, suffix=None):
+	key = f"salary_slip_shards::{payroll_entry}"
+	return f"{key}::{suffix}" if suffix else key
+
+
+def get_salary_slip_shard_job_id(payroll_entry, shard):
+	return f"salary_slip_shard::{payroll_entry}::{shard}"
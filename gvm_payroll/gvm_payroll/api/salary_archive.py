@@ -0,0 +1,231 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+"""
+Archive tier of Salary Slip detail rows.
+
+The Salary Detail and Internal Salary Details rows of slips that ended before the
+archive cutoff are moved to `tab<Child DocType> Archive` tables with the same columns,
+so the live tables (scanned by every report join and HRMS slip query) only hold
+recent rows. The Salary Slips themselves stay in place; archived rows are shown on
+the slip form, and the reports read them through report_utils.get_detail_table.
+Slips restored with restore_salary_slips are flagged and stay live.
+
+Off unless the site config sets how many months of rows stay live:
+
+	bench --site <site> set-config gvm_payroll_archive_after_months 36
+"""
+
+import frappe
+from erpnext.accounts.utils import get_fiscal_year
+from frappe.utils import add_months, get_first_day, getdate, nowdate
+
+# Child doctypes of Salary Slip whose rows are archived
+ARCHIVED_DOCTYPES = ("Salary Detail", "Internal Salary Details")
+
+# Salary Slips whose rows are moved per transaction
+ARCHIVE_BATCH_SIZE = 500
+
+# Date before which slips may have archived rows (the latest cutoff archived up to)
+ARCHIVED_UNTIL_KEY = "gvm_payroll_salary_archive_until"
+
+
+def get_archive_table(doctype):
+	return f"tab{doctype} Archive"
+
+
+def get_archive_cutoff(today=None):
+	"""
+	First day of the month `gvm_payroll_archive_after_months` ago, never later than the
+	start of the current fiscal year (HRMS reads the year's earlier slips for tax and
+	year-to-date figures). None when archiving is off.
+	"""
+	months = frappe.conf.get("gvm_payroll_archive_after_months")
+	if not months:
+		return None
+
+	today = getdate(today or nowdate())
+	cutoff = get_first_day(add_months(today, -int(months)))
+	try:
+		cutoff = min(cutoff, getdate(get_fiscal_year(today)[1]))
+	except Exception:
+		# No fiscal year for today: keep the configured cutoff
+		pass
+
+	return cutoff
+
+
+def get_archived_until():
+	"""Slips that ended before this date may have archived rows; None if nothing was archived."""
+	archived_until = frappe.db.get_global(ARCHIVED_UNTIL_KEY)
+	return getdate(archived_until) if archived_until else None
+
+
+def archive_salary_slips(cutoff=None):
+	"""
+	Move the detail rows of submitted and cancelled Salary Slips that ended before the
+	cutoff to the archive tables, ARCHIVE_BATCH_SIZE slips per transaction. Runs
+	monthly; returns the number of slips archived.
+	"""
+	cutoff = getdate(cutoff) if cutoff else get_archive_cutoff()
+	if not cutoff:
+		return 0
+
+	ensure_archive_tables()
+
+	# Recorded before moving anything so the reports read the archive as soon as a
+	# batch is committed
+	archived_until = get_archived_until()
+	if not archived_until or cutoff > archived_until:
+		frappe.db.set_global(ARCHIVED_UNTIL_KEY, str(cutoff))
+		frappe.db.commit()
+
+	archived = 0
+	while names := get_slips_to_archive(cutoff):
+		move_rows(names, to_archive=True)
+		frappe.db.commit()
+		archived += len(names)
+
+	if archived:
+		frappe.logger("gvm_payroll").info(f"Archived the rows of {archived} Salary Slips before {cutoff}")
+
+	return archived
+
+
+def get_slips_to_archive(cutoff):
+	"""
+	Oldest submitted or cancelled Salary Slips that ended before `cutoff` and still have
+	rows in any live table of ARCHIVED_DOCTYPES, leaving out slips restored to stay live.
+	"""
+	has_live_rows = " or ".join(
+		f"""exists (select 1 from `tab{doctype}` d
+			where d.parent = ss.name and d.parenttype = 'Salary Slip')"""
+		for doctype in ARCHIVED_DOCTYPES
+	)
+
+	return frappe.db.sql_list(
+		f"""select ss.name from `tabSalary Slip` ss
+		where ss.docstatus != 0
+			and ss.end_date < %(cutoff)s
+			and ifnull(ss.custom_keep_details_live, 0) = 0
+			and ({has_live_rows})
+		order by ss.end_date
+		limit %(limit)s""",
+		{"cutoff": cutoff, "limit": ARCHIVE_BATCH_SIZE},
+	)
+
+
+@frappe.whitelist()
+def restore_salary_slips(salary_slips):
+	"""
+	Move the archived rows of the given Salary Slips back to the live tables, and mark
+	the slips so that later archive runs leave them there.
+	"""
+	frappe.only_for("System Manager")
+
+	names = frappe.parse_json(salary_slips) if isinstance(salary_slips, str) else salary_slips
+	for start in range(0, len(names), ARCHIVE_BATCH_SIZE):
+		batch = names[start : start + ARCHIVE_BATCH_SIZE]
+		move_rows(batch, to_archive=False)
+		frappe.db.set_value(
+			"Salary Slip", {"name": ["in", batch]}, "custom_keep_details_live", 1, update_modified=False
+		)
+
+	return len(names)
+
+
+def move_rows(names, to_archive=True):
+	"""
+	Move the rows of Salary Slips `names` to the archive tables, or back to the live tables.
+
+	Rows a failed or retried batch already copied to the target are replaced, so running
+	the same move again neither fails on duplicate names nor leaves rows in both tables.
+	"""
+	for doctype in ARCHIVED_DOCTYPES:
+		live, archive = f"tab{doctype}", get_archive_table(doctype)
+		source, target = (live, archive) if to_archive else (archive, live)
+		columns = ", ".join(f"`{column}`" for column in get_archive_columns(doctype))
+
+		frappe.db.sql(
+			f"""delete from `{target}` where name in (
+				select name from `{source}` where parenttype = 'Salary Slip' and parent in %(names)s
+			)""",
+			{"names": names},
+		)
+		frappe.db.sql(
+			f"""insert into `{target}` ({columns})
+			select {columns} from `{source}`
+			where parenttype = 'Salary Slip' and parent in %(names)s""",
+			{"names": names},
+		)
+		frappe.db.sql(
+			f"delete from `{source}` where parenttype = 'Salary Slip' and parent in %(names)s",
+			{"names": names},
+		)
+
+
+def get_archived_rows(salary_slip, doctype):
+	if not frappe.db.table_exists(f"{doctype} Archive"):
+		return []
+
+	return frappe.db.sql(
+		f"""select * from `{get_archive_table(doctype)}`
+		where parenttype = 'Salary Slip' and parent = %s order by idx""",
+		salary_slip,
+		as_dict=True,
+	)
+
+
+def has_archived_rows(salary_slip):
+	archived_until = get_archived_until()
+	if not archived_until:
+		return False
+
+	return any(
+		frappe.db.table_exists(f"{doctype} Archive")
+		and frappe.db.sql(
+			f"""select 1 from `{get_archive_table(doctype)}`
+			where parenttype = 'Salary Slip' and parent = %s limit 1""",
+			salary_slip,
+		)
+		for doctype in ARCHIVED_DOCTYPES
+	)
+
+
+def ensure_archive_tables():
+	"""
+	Create the archive tables like their live tables and add the columns (e.g. new
+	custom fields) the live tables gained since.
+	"""
+	for doctype in ARCHIVED_DOCTYPES:
+		live, archive = f"tab{doctype}", get_archive_table(doctype)
+		if not frappe.db.table_exists(f"{doctype} Archive", cached=False):
+			frappe.db.sql_ddl(f"create table `{archive}` like `{live}`")
+			frappe.cache().delete_value("db_tables")
+			continue
+
+		live_columns = get_column_types(live)
+		archive_columns = get_column_types(archive)
+		missing = [column for column in live_columns if column not in archive_columns]
+		if missing:
+			frappe.db.sql_ddl(
+				f"alter table `{archive}` "
+				+ ", ".join(f"add column `{column}` {live_columns[column]}" for column in missing)
+			)
+			frappe.cache().hdel("table_columns", archive)
+
+
+def get_archive_columns(doctype):
+	"""Columns of the live table that the archive table also has."""
+	archive_columns = set(frappe.db.get_table_columns(f"{doctype} Archive"))
+	return [column for column in frappe.db.get_table_columns(doctype) if column in archive_columns]
+
+
+def get_column_types(table):
+	return dict(
+		frappe.db.sql(
+			"""select column_name, column_type from information_schema.columns
+			where table_schema = database() and table_name = %s order by ordinal_position""",
+			table,
+		)
+	)
@@ -0,0 +1,184 @@
+# Copyright (c) 2026, Samuael Ketema and Contributors
+# See license.txt
+
+import frappe
+from erpnext.setup.doctype.employee.test_employee import make_employee
+from frappe.tests.utils import FrappeTestCase
+
+from gvm_payroll.gvm_payroll.api.pay_matrix import (
+	clear_designation_levels,
+	clear_pay_matrix_index,
+	get_basic_salary,
+	get_pay_matrix_index,
+	lookup_basic,
+	process_reprice_employees,
+	reprice_employees,
+)
+
+COMPANY = "_Test Company"
+DESIGNATION = "_Test Lookup Designation"
+UNPRICED_DESIGNATION = "_Test Lookup Unpriced Designation"
+PAY_MATRIX = "_Test Lookup Matrix : 7th"
+LEVEL = f"{PAY_MATRIX} - 1"
+
+
+class TestLookupBasic(FrappeTestCase):
+	def setUp(self):
+		make_pay_matrix()
+
+	def test_exact_year(self):
+		self.assertEqual(lookup_basic(PAY_MATRIX, LEVEL, 3), 22000)
+		self.assertEqual(lookup_basic(PAY_MATRIX, LEVEL, "5"), 25000)
+
+	def test_gap_uses_closest_lower_year(self):
+		self.assertEqual(lookup_basic(PAY_MATRIX, LEVEL, 4), 22000)
+		self.assertEqual(lookup_basic(PAY_MATRIX, LEVEL, 40), 25000)
+
+	def test_below_first_year(self):
+		self.assertIsNone(lookup_basic(PAY_MATRIX, LEVEL, 0))
+		self.assertIsNone(lookup_basic(PAY_MATRIX, f"{PAY_MATRIX} - 99", 3))
+
+	def test_non_numeric_years_are_skipped(self):
+		self.assertEqual(
+			get_pay_matrix_index()[(PAY_MATRIX, LEVEL)], ([1.0, 3.0, 5.0], [20000, 22000, 25000])
+		)
+
+	def test_index_is_rebuilt_after_level_save(self):
+		self.assertEqual(lookup_basic(PAY_MATRIX, LEVEL, 3), 22000)
+
+		level = frappe.get_doc("Pay Matrix Level", LEVEL)
+		next(row for row in level.years if row.year == "3").amount = 23000
+		level.save()
+
+		self.assertEqual(lookup_basic(PAY_MATRIX, LEVEL, 3), 23000)
+
+	def test_basic_salary_needs_pay_matrix_access(self):
+		self.assertEqual(get_basic_salary(DESIGNATION, PAY_MATRIX, 3)["basic_salary"], 22000)
+
+		frappe.set_user(make_user_without_roles())
+		self.addCleanup(frappe.set_user, "Administrator")
+		self.assertRaises(frappe.PermissionError, get_basic_salary, DESIGNATION, PAY_MATRIX, 3)
+
+
+class TestRepriceEmployees(FrappeTestCase):
+	def setUp(self):
+		make_pay_matrix()
+		# Processing commits, so employees left over from earlier runs are taken off the matrix
+		frappe.db.set_value("Employee", {"custom_pay_matrix": PAY_MATRIX}, "custom_pay_matrix", None)
+
+		self.current = make_reprice_employee("reprice_current@example.com", LEVEL, 22000)
+		self.stale = make_reprice_employee("reprice_stale@example.com", LEVEL, 20000)
+		self.left = make_reprice_employee("reprice_left@example.com", LEVEL, 20000, status="Left")
+		self.unpriced = make_reprice_employee(
+			"reprice_unpriced@example.com", None, 20000, designation=UNPRICED_DESIGNATION
+		)
+
+	def test_dry_run_does_not_write(self):
+		result = reprice_employees(PAY_MATRIX, dry_run=1)
+
+		self.assertEqual([d["employee"] for d in result["changes"]], [self.stale])
+		self.assertEqual(result["changes"][0]["old_basic_salary"], 20000)
+		self.assertEqual(result["changes"][0]["new_basic_salary"], 22000)
+		self.assertEqual(result["unchanged"], 1)
+		self.assertEqual([d["employee"] for d in result["unresolved"]], [self.unpriced])
+		self.assertEqual(frappe.db.get_value("Employee", self.stale, "custom_basic_salary"), 20000)
+		self.assertFalse(get_reprice_reports())
+
+	def test_job_writes_only_changed_employees(self):
+		self.addCleanup(delete_reprice_reports)
+		unchanged_modified = frappe.db.get_value("Employee", self.current, "modified")
+
+		summary = process_reprice_employees(PAY_MATRIX)
+
+		self.assertEqual(summary["updated"], 1)
+		self.assertEqual(summary["unchanged"], 1)
+		self.assertEqual(summary["unresolved"], 1)
+		self.assertEqual(frappe.db.get_value("Employee", self.stale, "custom_basic_salary"), 22000)
+		self.assertEqual(frappe.db.get_value("Employee", self.left, "custom_basic_salary"), 20000)
+		self.assertEqual(frappe.db.get_value("Employee", self.current, "modified"), unchanged_modified)
+		self.assertEqual(get_reprice_reports(), [summary["report"]])
+
+	def test_second_run_has_nothing_to_change(self):
+		self.addCleanup(delete_reprice_reports)
+		process_reprice_employees(PAY_MATRIX)
+
+		summary = process_reprice_employees(PAY_MATRIX)
+
+		self.assertEqual(summary["updated"], 0)
+		self.assertEqual(summary["unchanged"], 2)
+		self.assertIsNone(summary["report"])
+		self.assertEqual(len(get_reprice_reports()), 1)
+
+
+def make_reprice_employee(user, level, basic_salary, designation=DESIGNATION, status="Active"):
+	employee = make_employee(user, company=COMPANY, designation=designation)
+	frappe.db.set_value(
+		"Employee",
+		employee,
+		{
+			"designation": designation,
+			"status": status,
+			"custom_pay_matrix": PAY_MATRIX,
+			"custom_level": level,
+			"custom_years_experienced": 3,
+			"custom_basic_salary": basic_salary,
+		},
+	)
+	return employee
+
+
+def get_reprice_reports():
+	return frappe.get_all(
+		"File",
+		filters={"attached_to_doctype": "Pay Matrix", "attached_to_name": PAY_MATRIX},
+		pluck="file_url",
+	)
+
+
+def delete_reprice_reports():
+	for name in frappe.get_all(
+		"File", filters={"attached_to_doctype": "Pay Matrix", "attached_to_name": PAY_MATRIX}, pluck="name"
+	):
+		frappe.delete_doc("File", name, force=True)
+	frappe.db.commit()
+
+
+def make_user_without_roles():
+	user = "pay_matrix_no_access@example.com"
+	if not frappe.db.exists("User", user):
+		frappe.get_doc({"doctype": "User", "email": user, "first_name": "No Access"}).insert()
+	return user
+
+
+def make_pay_matrix():
+	if not frappe.db.exists("Pay Matrix", PAY_MATRIX):
+		frappe.get_doc({"doctype": "Pay Matrix", "pm": "_Test Lookup Matrix", "cpc": "7th"}).insert()
+
+	frappe.db.delete("Matrix Level Items", {"parent": LEVEL})
+	frappe.db.delete("Pay Matrix Level", {"name": LEVEL})
+	frappe.get_doc(
+		{
+			"doctype": "Pay Matrix Level",
+			"pay_matrix": PAY_MATRIX,
+			"level": "1",
+			"years": [
+				{"year": year, "amount": amount}
+				for year, amount in (("1", 20000), ("3", 22000), ("Stage II", 24000), ("", 1), (" 5 ", 25000))
+			],
+		}
+	).insert()
+
+	if not frappe.db.exists("Designation", DESIGNATION):
+		frappe.get_doc(
+			{
+				"doctype": "Designation",
+				"designation_name": DESIGNATION,
+				"custom_matrix_levels": [{"pay_matrix": PAY_MATRIX, "level": LEVEL}],
+			}
+		).insert()
+
+	if not frappe.db.exists("Designation", UNPRICED_DESIGNATION):
+		frappe.get_doc({"doctype": "Designation", "designation_name": UNPRICED_DESIGNATION}).insert()
+
+	clear_pay_matrix_index()
+	clear_designation_levels()
@@ -0,0 +1,198 @@
+# Copyright (c) 2025, Samuael Ketema and Contributors
+# See license.txt
+
+import threading
+
+import frappe
+from erpnext.setup.doctype.employee.test_employee import make_employee
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, get_first_day, get_last_day, nowdate
+from hrms.payroll.doctype.salary_structure.test_salary_structure import make_salary_structure
+
+from gvm_payroll.gvm_payroll.api.payroll_entry import (
+	get_quarter_payroll_date,
+	get_salary_slip_shard_key,
+	get_shard_employees,
+	get_stalled_salary_slip_shards,
+	process_quarter_additional_salaries,
+	reset_salary_slip_shards,
+)
+
+COMPANY = "_Test Company"
+CHARGES = {"_Test Quarter Rent": 1500, "_Test Quarter Water": 120}
+
+
+class TestQuarterAdditionalSalaries(FrappeTestCase):
+	def test_concurrent_workers_create_each_charge_once(self):
+		payroll_entry, employees = make_quarter_charges_payroll_entry()
+		# Workers run on their own connections, so the fixtures have to be committed
+		frappe.db.commit()
+		self.addCleanup(delete_quarter_charges_payroll_entry, payroll_entry)
+
+		site = frappe.local.site
+		errors = []
+
+		def worker():
+			frappe.init(site=site)
+			frappe.connect()
+			try:
+				process_quarter_additional_salaries(payroll_entry)
+			except Exception as e:
+				errors.append(e)
+			finally:
+				frappe.destroy()
+
+		workers = [threading.Thread(target=worker) for _ in range(2)]
+		for t in workers:
+			t.start()
+		for t in workers:
+			t.join()
+
+		self.assertFalse(errors)
+
+		created = frappe.get_all(
+			"Additional Salary",
+			filters={"ref_doctype": "Payroll Entry", "ref_docname": payroll_entry, "docstatus": 1},
+			fields=["employee", "salary_component"],
+		)
+		self.assertEqual(len(created), len(employees) * len(CHARGES))
+		self.assertEqual(len({(d.employee, d.salary_component) for d in created}), len(created))
+
+	def test_cancelled_charge_can_be_generated_again(self):
+		payroll_entry, employees = make_quarter_charges_payroll_entry()
+		# Processing commits, so the generated charges are removed explicitly
+		self.addCleanup(delete_quarter_charges_payroll_entry, payroll_entry)
+
+		process_quarter_additional_salaries(payroll_entry)
+		first = frappe.get_last_doc(
+			"Additional Salary", filters={"ref_docname": payroll_entry, "employee": employees[0]}
+		)
+		first.cancel()
+
+		result = process_quarter_additional_salaries(payroll_entry)
+		self.assertEqual(len(result["created"]), 1)
+
+	def test_charge_rejected_by_hrms_duplicate_check_is_skipped(self):
+		payroll_entry, employees = make_quarter_charges_payroll_entry()
+		component = next(iter(CHARGES))
+		pe = frappe.get_doc("Payroll Entry", payroll_entry)
+		self.addCleanup(delete_quarter_charges_payroll_entry, payroll_entry)
+
+		# A charge entered by hand for the same date is caught by HRMS before the unique index
+		manual = frappe.get_doc(
+			{
+				"doctype": "Additional Salary",
+				"employee": employees[0],
+				"salary_component": component,
+				"amount": 1,
+				"company": COMPANY,
+				"payroll_date": get_quarter_payroll_date(pe),
+				"overwrite_salary_structure_amount": 1,
+			}
+		)
+		manual.submit()
+		self.addCleanup(delete_additional_salary, manual.name)
+
+		result = process_quarter_additional_salaries(payroll_entry)
+		self.assertIn(
+			{"employee": employees[0], "component": component, "reason": "Already exists"}, result["skipped"]
+		)
+		self.assertEqual(len(result["created"]), len(employees) * len(CHARGES) - 1)
+
+
+class TestSalarySlipShards(FrappeTestCase):
+	def test_shard_split_is_stable(self):
+		employees = [f"EMP-{i}" for i in range(7)]
+		shards = [get_shard_employees(employees, 3, shard) for shard in range(3)]
+
+		self.assertEqual(shards, [employees[:3], employees[3:6], employees[6:]])
+
+	def test_shard_without_job_or_result_is_stalled(self):
+		payroll_entry = "_Test Sharded Payroll Entry"
+		reset_salary_slip_shards(payroll_entry, 2)
+		self.addCleanup(frappe.cache().delete_value, get_salary_slip_shard_key(payroll_entry))
+
+		self.assertEqual(get_stalled_salary_slip_shards(payroll_entry, 2), [0, 1])
+
+		frappe.cache().hset(
+			get_salary_slip_shard_key(payroll_entry), "0", {"shard": 0, "status": "Completed"}
+		)
+		self.assertEqual(get_stalled_salary_slip_shards(payroll_entry, 2), [1])
+
+
+def make_quarter_charges_payroll_entry():
+	for component in CHARGES:
+		if not frappe.db.exists("Salary Component", component):
+			frappe.get_doc(
+				{
+					"doctype": "Salary Component",
+					"salary_component": component,
+					"salary_component_abbr": frappe.scrub(component)[:8].upper(),
+					"type": "Deduction",
+				}
+			).insert()
+
+	quarter = frappe.get_doc(
+		{
+			"doctype": "Quarter",
+			"name1": "_Test Quarter",
+			"charges": [{"charge": component, "amount": amount} for component, amount in CHARGES.items()],
+		}
+	).insert()
+
+	employees = []
+	for i in range(3):
+		employee = make_employee(f"quarter_charges_{i}@example.com", company=COMPANY)
+		frappe.db.set_value("Employee", employee, "custom_quarter", quarter.name)
+		make_salary_structure(
+			"_Test Quarter Charges Structure",
+			"Monthly",
+			employee=employee,
+			company=COMPANY,
+			from_date=add_days(get_first_day(nowdate()), -31),
+		)
+		employees.append(employee)
+
+	pe = frappe.get_doc(
+		{
+			"doctype": "Payroll Entry",
+			"company": COMPANY,
+			"posting_date": nowdate(),
+			"payroll_frequency": "Monthly",
+			"start_date": get_first_day(nowdate()),
+			"end_date": get_last_day(nowdate()),
+			"currency": frappe.get_cached_value("Company", COMPANY, "default_currency"),
+			"exchange_rate": 1,
+			"employees": [{"employee": employee} for employee in employees],
+		}
+	)
+	pe.flags.ignore_validate = True
+	pe.insert(ignore_mandatory=True)
+
+	return pe.name, employees
+
+
+def delete_quarter_charges_payroll_entry(payroll_entry):
+	for name in frappe.get_all(
+		"Additional Salary",
+		filters={"ref_doctype": "Payroll Entry", "ref_docname": payroll_entry, "docstatus": 1},
+		pluck="name",
+	):
+		frappe.get_doc("Additional Salary", name).cancel()
+
+	frappe.db.delete("Additional Salary", {"ref_doctype": "Payroll Entry", "ref_docname": payroll_entry})
+	frappe.delete_doc("Payroll Entry", payroll_entry, force=True)
+
+	# Every test makes a new Quarter, so all of them are removed with the charge components
+	for quarter in frappe.get_all("Quarter", filters={"name1": "_Test Quarter"}, pluck="name"):
+		frappe.db.set_value("Employee", {"custom_quarter": quarter}, "custom_quarter", None)
+		frappe.delete_doc("Quarter", quarter, force=True)
+	for component in CHARGES:
+		frappe.delete_doc("Salary Component", component, force=True, ignore_missing=True)
+	frappe.db.commit()
+
+
+def delete_additional_salary(name):
+	frappe.get_doc("Additional Salary", name).cancel()
+	frappe.delete_doc("Additional Salary", name, force=True)
+	frappe.db.commit()
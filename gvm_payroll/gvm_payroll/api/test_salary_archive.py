@@ -0,0 +1,136 @@
+# Copyright (c) 2026, Samuael Ketema and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from gvm_payroll.gvm_payroll.api.salary_archive import (
+	ARCHIVED_UNTIL_KEY,
+	ensure_archive_tables,
+	get_archive_table,
+	get_slips_to_archive,
+	has_archived_rows,
+	move_rows,
+	restore_salary_slips,
+)
+from gvm_payroll.gvm_payroll.report.report_utils import get_detail_table, get_salary_slip_details
+
+SALARY_SLIP = "_Test Archive Salary Slip"
+# Slip with internal components only
+INTERNAL_SALARY_SLIP = "_Test Archive Internal Salary Slip"
+CUTOFF = "2020-01-01"
+
+
+class TestSalaryArchive(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		# DDL commits, so the tables are created before any test data
+		ensure_archive_tables()
+
+	def setUp(self):
+		self.addCleanup(delete_test_data, frappe.db.get_global(ARCHIVED_UNTIL_KEY))
+		make_archivable_salary_slip()
+
+	def test_archive_and_restore(self):
+		slips = [frappe._dict(name=SALARY_SLIP, end_date=getdate("1990-06-30"))]
+		before = get_salary_slip_details(slips, "earnings")
+
+		# Only the test slip is moved, not the site's other slips before the cutoff
+		frappe.db.set_global(ARCHIVED_UNTIL_KEY, CUTOFF)
+		move_rows([SALARY_SLIP], to_archive=True)
+		self.assertFalse(frappe.db.exists("Salary Detail", {"parent": SALARY_SLIP}))
+		self.assertTrue(has_archived_rows(SALARY_SLIP))
+
+		# Read through the union of the live and archive tables
+		self.assertIn("UNION ALL", str(get_detail_table("Salary Detail", slips)))
+		self.assertEqual(get_salary_slip_details(slips, "earnings"), before)
+
+		restore_salary_slips([SALARY_SLIP])
+		self.assertFalse(has_archived_rows(SALARY_SLIP))
+		self.assertEqual(frappe.db.count("Salary Detail", {"parent": SALARY_SLIP}), 2)
+
+	def test_slip_with_only_internal_details_is_archived(self):
+		# The test slips are the oldest, so they come first in the batch
+		self.assertIn(INTERNAL_SALARY_SLIP, get_slips_to_archive(getdate(CUTOFF)))
+
+		frappe.db.set_global(ARCHIVED_UNTIL_KEY, CUTOFF)
+		move_rows([INTERNAL_SALARY_SLIP], to_archive=True)
+		self.assertFalse(frappe.db.exists("Internal Salary Details", {"parent": INTERNAL_SALARY_SLIP}))
+		self.assertNotIn(INTERNAL_SALARY_SLIP, get_slips_to_archive(getdate(CUTOFF)))
+
+	def test_retried_move_does_not_duplicate_rows(self):
+		frappe.db.set_global(ARCHIVED_UNTIL_KEY, CUTOFF)
+		# A batch that failed after copying its rows left them in both tables
+		frappe.db.sql(
+			f"""insert into `{get_archive_table("Salary Detail")}`
+			select * from `tabSalary Detail` where parent = %s""",
+			SALARY_SLIP,
+		)
+
+		move_rows([SALARY_SLIP], to_archive=True)
+		move_rows([SALARY_SLIP], to_archive=True)
+		self.assertEqual(count_archived_rows(SALARY_SLIP), 2)
+		self.assertFalse(frappe.db.exists("Salary Detail", {"parent": SALARY_SLIP}))
+
+	def test_restored_slip_is_not_archived_again(self):
+		frappe.db.set_global(ARCHIVED_UNTIL_KEY, CUTOFF)
+		move_rows([SALARY_SLIP], to_archive=True)
+
+		restore_salary_slips([SALARY_SLIP])
+		self.assertEqual(frappe.db.count("Salary Detail", {"parent": SALARY_SLIP}), 2)
+		self.assertNotIn(SALARY_SLIP, get_slips_to_archive(getdate(CUTOFF)))
+
+	def test_recent_slips_read_live_table(self):
+		frappe.db.set_global(ARCHIVED_UNTIL_KEY, CUTOFF)
+
+		slips = [frappe._dict(name="_Test Recent Salary Slip", end_date=getdate("2020-01-31"))]
+		self.assertNotIn("UNION ALL", str(get_detail_table("Salary Detail", slips)))
+
+
+def make_archivable_salary_slip():
+	frappe.db.bulk_insert(
+		"Salary Slip",
+		["name", "docstatus", "start_date", "end_date", "posting_date"],
+		[(name, 1, "1990-06-01", "1990-06-30", "1990-06-30") for name in (SALARY_SLIP, INTERNAL_SALARY_SLIP)],
+	)
+	frappe.db.bulk_insert(
+		"Salary Detail",
+		["name", "parent", "parenttype", "parentfield", "idx", "salary_component", "amount"],
+		[
+			(f"{SALARY_SLIP}-1", SALARY_SLIP, "Salary Slip", "earnings", 1, "_Test Basic Salary", 10000),
+			(f"{SALARY_SLIP}-2", SALARY_SLIP, "Salary Slip", "earnings", 2, "_Test Allowance", 2500),
+		],
+	)
+	frappe.db.bulk_insert(
+		"Internal Salary Details",
+		["name", "parent", "parenttype", "parentfield", "idx", "salary_component", "amount"],
+		[
+			(
+				f"{INTERNAL_SALARY_SLIP}-1",
+				INTERNAL_SALARY_SLIP,
+				"Salary Slip",
+				"custom_internal_salary_details",
+				1,
+				"_Test PF Employer",
+				1800,
+			)
+		],
+	)
+
+
+def count_archived_rows(salary_slip):
+	return frappe.db.sql(
+		f"select count(*) from `{get_archive_table('Salary Detail')}` where parent = %s", salary_slip
+	)[0][0]
+
+
+def delete_test_data(archived_until):
+	names = (SALARY_SLIP, INTERNAL_SALARY_SLIP)
+	for doctype in ("Salary Detail", "Internal Salary Details"):
+		frappe.db.delete(doctype, {"parent": ["in", names]})
+		frappe.db.sql(f"delete from `{get_archive_table(doctype)}` where parent in %s", [names])
+	frappe.db.delete("Salary Slip", {"name": ["in", names]})
+	frappe.db.set_global(ARCHIVED_UNTIL_KEY, archived_until)
+	frappe.db.commit()
@@ -0,0 +1,218 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, now
+
+from gvm_payroll.gvm_payroll.doctype.internal_salary_ytd.internal_salary_ytd import get_slip_fiscal_year
+from gvm_payroll.gvm_payroll.report.annual_statement.annual_statement import (
+	add_to_month,
+	get_month_key,
+	get_salary_slip_details,
+)
+
+# Salary Slips whose details are read per query when building the ledgers
+BUILD_CHUNK_SIZE = 1000
+
+
+class AnnualTaxLedger(Document):
+	pass
+
+
+def get_ledger_name(employee, fiscal_year):
+	return f"ATL-{employee}-{fiscal_year}"
+
+
+def update_tax_ledger(doc, sign=1):
+	"""
+	Add (sign=1, on submit) or subtract (sign=-1, on cancel) a Salary Slip's component
+	amounts to its month in the employee's Annual Tax Ledger of the slip's fiscal year.
+
+	Components are kept by name and mapped to the Annual Statement buckets when the
+	report runs, across all of its employees, exactly as for slips read from details.
+
+	The ledger row is locked while it is updated, so slips of the same employee
+	submitted in parallel are applied one after the other.
+	"""
+	fiscal_year = get_slip_fiscal_year(doc)
+	if not fiscal_year:
+		return
+
+	earnings_map, deductions_map = {}, {}
+	for row in doc.earnings:
+		earnings_map[row.salary_component] = earnings_map.get(row.salary_component, 0.0) + flt(row.amount)
+	for row in doc.deductions:
+		deductions_map[row.salary_component] = deductions_map.get(row.salary_component, 0.0) + flt(row.amount)
+
+	name = get_ledger_name(doc.employee, fiscal_year)
+	ledger = get_locked_ledger(name)
+	if not ledger:
+		if sign < 0:
+			return
+		create_ledger(name, doc.employee, doc.employee_name, fiscal_year, doc.company)
+		ledger = get_locked_ledger(name)
+
+	months = frappe.parse_json(ledger.months) or {}
+	add_to_month(
+		months,
+		get_month_key(doc.start_date),
+		earnings_map,
+		deductions_map,
+		doc.current_month_income_tax,
+		sign,
+	)
+
+	frappe.db.set_value(
+		"Annual Tax Ledger",
+		name,
+		{
+			"months": json.dumps(months, sort_keys=True),
+			"salary_slips": max(ledger.salary_slips + sign, 0),
+			"employee_name": doc.employee_name,
+		},
+	)
+
+
+def get_locked_ledger(name):
+	return frappe.db.get_value(
+		"Annual Tax Ledger", name, ["name", "months", "salary_slips"], as_dict=True, for_update=True
+	)
+
+
+def create_ledger(name, employee, employee_name, fiscal_year, company):
+	try:
+		frappe.get_doc(
+			{
+				"doctype": "Annual Tax Ledger",
+				"name": name,
+				"employee": employee,
+				"employee_name": employee_name,
+				"fiscal_year": fiscal_year,
+				"company": company,
+				"months": "{}",
+			}
+		).db_insert()
+	except frappe.DuplicateEntryError:
+		# Created by a slip of the same employee submitted at the same time
+		pass
+
+
+@frappe.whitelist()
+def rebuild_tax_ledgers(fiscal_year: str, company=None):
+	"""Queue a rebuild of the Annual Tax Ledgers of a fiscal year (and company) from the Salary Slips."""
+	frappe.only_for("System Manager")
+
+	frappe.enqueue(
+		"gvm_payroll.gvm_payroll.doctype.annual_tax_ledger.annual_tax_ledger.build_tax_ledgers",
+		queue="long",
+		timeout=3600,
+		job_id=f"annual_tax_ledger::{fiscal_year}::{company or ''}",
+		deduplicate=True,
+		fiscal_year=fiscal_year,
+		company=company,
+	)
+	return {"queued": True}
+
+
+def build_tax_ledgers(fiscal_year, company=None):
+	"""
+	Replace the Annual Tax Ledgers of a fiscal year with the amounts of its submitted
+	Salary Slips, reading their details BUILD_CHUNK_SIZE slips at a time.
+
+	A ledger holds all of an employee's slips of the year, whatever their company, so
+	with `company` the ledgers of the employees with a slip (or a ledger) in that
+	company are rebuilt from all their slips.
+	"""
+	year_start_date, year_end_date = frappe.db.get_value(
+		"Fiscal Year", fiscal_year, ["year_start_date", "year_end_date"]
+	)
+	filters = {"docstatus": 1, "end_date": ["between", [year_start_date, year_end_date]]}
+	ledger_filters = {"fiscal_year": fiscal_year}
+	if company:
+		employees = set(
+			frappe.get_all("Salary Slip", filters=dict(filters, company=company), pluck="employee")
+		)
+		employees.update(
+			frappe.get_all(
+				"Annual Tax Ledger", filters=dict(ledger_filters, company=company), pluck="employee"
+			)
+		)
+		if not employees:
+			return 0
+		filters["employee"] = ledger_filters["employee"] = ["in", list(employees)]
+
+	salary_slips = frappe.get_all(
+		"Salary Slip",
+		filters=filters,
+		fields=[
+			"name",
+			"employee",
+			"employee_name",
+			"company",
+			"start_date",
+			"end_date",
+			"current_month_income_tax",
+		],
+		order_by="employee, start_date",
+	)
+
+	ledgers = {}
+	for start in range(0, len(salary_slips), BUILD_CHUNK_SIZE):
+		chunk = salary_slips[start : start + BUILD_CHUNK_SIZE]
+		ss_earning_map = get_salary_slip_details(chunk, "earnings")
+		ss_ded_map = get_salary_slip_details(chunk, "deductions")
+
+		for ss in chunk:
+			ledger = ledgers.setdefault(
+				ss.employee,
+				{"employee_name": ss.employee_name, "company": ss.company, "months": {}, "salary_slips": 0},
+			)
+			add_to_month(
+				ledger["months"],
+				get_month_key(ss.start_date),
+				ss_earning_map.get(ss.name, {}),
+				ss_ded_map.get(ss.name, {}),
+				ss.current_month_income_tax,
+			)
+			ledger["salary_slips"] += 1
+
+	frappe.db.delete("Annual Tax Ledger", ledger_filters)
+
+	timestamp, user = now(), frappe.session.user
+	frappe.db.bulk_insert(
+		"Annual Tax Ledger",
+		[
+			"name",
+			"employee",
+			"employee_name",
+			"fiscal_year",
+			"company",
+			"months",
+			"salary_slips",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		[
+			(
+				get_ledger_name(employee, fiscal_year),
+				employee,
+				ledger["employee_name"],
+				fiscal_year,
+				ledger["company"],
+				json.dumps(ledger["months"], sort_keys=True),
+				ledger["salary_slips"],
+				timestamp,
+				timestamp,
+				user,
+				user,
+			)
+			for employee, ledger in ledgers.items()
+		],
+	)
+
+	return len(ledgers)
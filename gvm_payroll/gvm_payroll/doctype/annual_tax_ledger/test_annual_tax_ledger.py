@@ -0,0 +1,135 @@
+# Copyright (c) 2026, Samuael Ketema and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import get_first_day, nowdate
+
+from gvm_payroll.gvm_payroll.doctype.annual_tax_ledger.annual_tax_ledger import (
+	get_ledger_name,
+	update_tax_ledger,
+)
+from gvm_payroll.gvm_payroll.doctype.internal_salary_ytd.internal_salary_ytd import get_slip_fiscal_year
+from gvm_payroll.gvm_payroll.report.annual_statement.annual_statement import (
+	get_employee_row,
+	get_ledger_monthly_data,
+	get_month_key,
+	get_monthly_data,
+	get_report_component_names,
+	get_slip_months,
+)
+
+EMPLOYEE = "_T-Employee-ATL"
+
+
+def get_detail_maps(slips):
+	return (
+		{ss.name: {row.salary_component: row.amount for row in ss.earnings} for ss in slips},
+		{ss.name: {row.salary_component: row.amount for row in ss.deductions} for ss in slips},
+	)
+
+
+def make_slip(basic, income_tax, employee=EMPLOYEE, earnings=None, deductions=None):
+	return frappe._dict(
+		name=frappe.generate_hash(length=10),
+		employee=employee,
+		employee_name="_Test Ledger Employee",
+		company="_Test Company",
+		start_date=get_first_day(nowdate()),
+		end_date=nowdate(),
+		current_month_income_tax=income_tax,
+		earnings=[
+			frappe._dict(salary_component=component, amount=amount)
+			for component, amount in dict({"Basic": basic}, **(earnings or {})).items()
+		],
+		deductions=[
+			frappe._dict(salary_component=component, amount=amount)
+			for component, amount in dict({"LIC": 200}, **(deductions or {})).items()
+		],
+	)
+
+
+def get_ledger(employee, fiscal_year):
+	return frappe.db.get_value(
+		"Annual Tax Ledger",
+		get_ledger_name(employee, fiscal_year),
+		["employee", "employee_name", "months", "salary_slips"],
+		as_dict=True,
+	)
+
+
+class TestAnnualTaxLedger(FrappeTestCase):
+	def setUp(self):
+		frappe.db.delete("Annual Tax Ledger", {"employee": ["like", f"{EMPLOYEE}%"]})
+
+	def test_submit_and_cancel_update_ledger(self):
+		first = make_slip(10000, 1500)
+		update_tax_ledger(first)
+		update_tax_ledger(make_slip(12000, 1800))
+
+		fiscal_year = get_slip_fiscal_year(first)
+		month_key = get_month_key(first.start_date)
+
+		ledger = get_ledger(EMPLOYEE, fiscal_year)
+		month = get_ledger_monthly_data(ledger, [month_key], {})[month_key]
+		self.assertEqual(ledger.salary_slips, 2)
+		self.assertEqual(month["basic"], 22000)
+		self.assertEqual(month["lic"], 400)
+		self.assertEqual(month["current_month_income_tax"], 3300)
+
+		update_tax_ledger(first, sign=-1)
+		ledger = get_ledger(EMPLOYEE, fiscal_year)
+		month = get_ledger_monthly_data(ledger, [month_key], {})[month_key]
+		self.assertEqual(ledger.salary_slips, 1)
+		self.assertEqual(month["basic"], 12000)
+		self.assertEqual(month["current_month_income_tax"], 1800)
+
+	def test_slip_details_sum_income_tax_like_the_ledger(self):
+		# An off-cycle slip in the same month adds to the month's income tax
+		slips = [make_slip(10000, 1500), make_slip(12000, 1800)]
+		month_key = get_month_key(slips[0].start_date)
+		ss_earning_map, ss_ded_map = get_detail_maps(slips)
+
+		month = get_monthly_data(EMPLOYEE, "", slips, [month_key], ss_earning_map, ss_ded_map, {})[month_key]
+		self.assertEqual(month["basic"], 22000)
+		self.assertEqual(month["current_month_income_tax"], 3300)
+
+	def test_ledger_and_slip_details_give_the_same_rows(self):
+		other = "_T-Employee-ATL-2"
+		slips = [
+			make_slip(10000, 1500, deductions={"House Rent": 800, "Water Charges": 50}),
+			make_slip(12000, 1800, deductions={"House Rent": 800, "Water Charges": 50}),
+			# Another employee's allowance is matched when the report maps its components
+			make_slip(9000, 900, employee=other, earnings={"House Rent Allowance": 3000}),
+		]
+		for ss in slips:
+			update_tax_ledger(ss)
+
+		month_key = get_month_key(slips[0].start_date)
+		fiscal_year = get_slip_fiscal_year(slips[0])
+		ss_earning_map, ss_ded_map = get_detail_maps(slips)
+		employee_slips = {EMPLOYEE: slips[:2], other: slips[2:]}
+
+		from_slips = {
+			employee: get_slip_months(employee_slips[employee], ss_earning_map, ss_ded_map)
+			for employee in employee_slips
+		}
+		ledgers = {employee: get_ledger(employee, fiscal_year) for employee in employee_slips}
+		from_ledgers = {employee: frappe.parse_json(ledger.months) for employee, ledger in ledgers.items()}
+		self.assertEqual(from_ledgers, from_slips)
+
+		actual_components = get_report_component_names(from_slips)
+		for employee, slips_of_employee in employee_slips.items():
+			slip_data = get_monthly_data(
+				employee, "", slips_of_employee, [month_key], ss_earning_map, ss_ded_map, actual_components
+			)
+			ledger_data = get_ledger_monthly_data(ledgers[employee], [month_key], actual_components)
+			self.assertEqual(ledger_data, slip_data)
+			self.assertEqual(
+				get_employee_row(employee, "", ledger_data, {month_key: month_key}, slips[0].start_date),
+				get_employee_row(employee, "", slip_data, {month_key: month_key}, slips[0].start_date),
+			)
+
+	def test_cancel_without_ledger_is_ignored(self):
+		update_tax_ledger(make_slip(10000, 1500), sign=-1)
+		self.assertFalse(frappe.db.exists("Annual Tax Ledger", {"employee": EMPLOYEE}))
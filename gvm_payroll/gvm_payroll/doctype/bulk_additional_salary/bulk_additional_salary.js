@@ -2,17 +2,72 @@
 // For license information, please see license.txt
 
 frappe.ui.form.on("Bulk Additional Salary", {
+	onload(frm) {
+		frappe.realtime.off("bulk_additional_salary_progress");
+		frappe.realtime.on("bulk_additional_salary_progress", (data) => {
+			if (data.docname !== frm.doc.name) return;
+			frappe.show_progress(
+				__("Submitting Additional Salaries"),
+				data.progress,
+				data.total,
+				__("Submitted {0} of {1}", [data.progress, data.total])
+			);
+		});
+
+		frappe.realtime.off("bulk_additional_salary_submitted");
+		frappe.realtime.on("bulk_additional_salary_submitted", (data) => {
+			if (data.docname !== frm.doc.name) return;
+			frappe.hide_progress();
+			show_submission_summary(data);
+			frm.reload_doc();
+		});
+
+		frappe.realtime.off("bulk_additional_salary_import_progress");
+		frappe.realtime.on("bulk_additional_salary_import_progress", (data) => {
+			if (data.docname !== frm.doc.name) return;
+			frappe.show_alert({
+				message: __("Imported {0} rows...", [data.processed]),
+				indicator: "blue",
+			});
+		});
+
+		frappe.realtime.off("bulk_additional_salary_import_completed");
+		frappe.realtime.on("bulk_additional_salary_import_completed", (data) => {
+			if (data.docname !== frm.doc.name) return;
+			show_import_summary(data);
+			frm.reload_doc();
+		});
+
+		frappe.realtime.off("bulk_additional_salary_import_failed");
+		frappe.realtime.on("bulk_additional_salary_import_failed", (data) => {
+			if (data.docname !== frm.doc.name) return;
+			frappe.msgprint({
+				title: __("Error"),
+				message: __("Charge import failed after {0} rows. Check the Error Log.", [data.processed]),
+				indicator: "red",
+			});
+			frm.reload_doc();
+		});
+	},
+
 	refresh(frm) {
 		// Remove all custom buttons first and clear flags
 		frm.page.clear_actions();
 		frm.page.btn_create_additional_salaries = null;
 		frm.page.btn_submit_additional_salaries = null;
+		frm.page.btn_import_charges = null;
 
 		// Before saving: NO button visible - return immediately
 		if (frm.doc.__islocal) {
 			return;
 		}
 
+		// Submission running in the background: no buttons and no auto-submit
+		if (frm.doc.__onload && frm.doc.__onload.submission_in_progress) {
+			frm.dashboard.set_headline(__("Additional Salary records are being submitted..."), "blue");
+			return;
+		}
+
 		// After saving: check if additional salaries exist
 		check_and_show_buttons(frm);
 	},
@@ -125,9 +180,75 @@ async function check_and_show_buttons(frm) {
 				frm.page.btn_create_additional_salaries = btn;
 			}
 		}
+
+		// Large charge lists are imported from CSV on the server instead of the grid
+		if (frm.doc.docstatus === 0 && !frm.page.btn_import_charges) {
+			frm.page.btn_import_charges = frm.page.add_button(__("Import Charges"), () =>
+				import_charges(frm)
+			);
+		}
 	}
 }
 
+function import_charges(frm) {
+	const dialog = new frappe.ui.Dialog({
+		title: __("Import Charges"),
+		fields: [
+			{
+				fieldname: "file_url",
+				fieldtype: "Attach",
+				label: __("CSV File"),
+				reqd: 1,
+			},
+			{
+				fieldname: "help",
+				fieldtype: "HTML",
+				options: `<p class="text-muted small">${__(
+					"Columns: employee, quarter, salary_component, amount. Empty quarter and salary component use the defaults of this document."
+				)}</p>`,
+			},
+		],
+		primary_action_label: __("Import"),
+		async primary_action(values) {
+			if (frm.is_dirty()) {
+				await frm.save();
+			}
+			await frappe.call({
+				method: "gvm_payroll.gvm_payroll.doctype.bulk_additional_salary.bulk_additional_salary.import_charges",
+				args: {
+					docname: frm.doc.name,
+					file_url: values.file_url,
+				},
+			});
+			dialog.hide();
+			frappe.show_alert({
+				message: __("Charge import queued"),
+				indicator: "blue",
+			});
+		},
+	});
+	dialog.show();
+}
+
+function show_import_summary(data) {
+	const errors = data.errors || [];
+	let message = __("Imported {0} of {1} rows.", [data.imported, data.processed]);
+	if (data.skipped) {
+		message += " " + __("{0} rows were already in the document.", [data.skipped]);
+	}
+
+	if (errors.length) {
+		const rows = errors.map((e) => `<li>${__("Row {0}", [e.row])}: ${e.error}</li>`).join("");
+		message += `<br>${__("Skipped rows:")}<ul>${rows}</ul>`;
+	}
+
+	frappe.msgprint({
+		title: __("Import Charges"),
+		message: message,
+		indicator: errors.length ? "orange" : "green",
+	});
+}
+
 async function create_bulk_additional_salary(frm) {
 	if (!frm.doc.company || !frm.doc.payroll_date) {
 		frappe.msgprint({
@@ -152,6 +273,7 @@ async function create_bulk_additional_salary(frm) {
 			method: "gvm_payroll.gvm_payroll.doctype.bulk_additional_salary.bulk_additional_salary.create_additional_salaries",
 			args: {
 				docname: frm.doc.name,
+				batched: 1,
 			},
 			freeze: true,
 			freeze_message: __("Creating Additional Salaries..."),
@@ -175,10 +297,11 @@ async function submit_additional_salaries(frm) {
 			args: {
 				docname: frm.doc.name,
 			},
-			freeze: true,
-			freeze_message: __("Submitting Additional Salaries..."),
 		});
-		frappe.msgprint(__("All Additional Salary records submitted"));
+		frappe.show_alert({
+			message: __("Additional Salary submission queued"),
+			indicator: "blue",
+		});
 		frm.reload_doc();
 	} catch (e) {
 		console.error(e);
@@ -189,3 +312,22 @@ async function submit_additional_salaries(frm) {
 		});
 	}
 }
+
+function show_submission_summary(data) {
+	const submitted = data.submitted || [];
+	const failed = data.failed || [];
+
+	if (!failed.length) {
+		frappe.msgprint(__("All Additional Salary records submitted"));
+		return;
+	}
+
+	const rows = failed.map((f) => `<li><b>${f.name}</b>: ${f.error || ""}</li>`).join("");
+	frappe.msgprint({
+		title: __("Additional Salary Submission"),
+		message:
+			__("Submitted {0} records, {1} failed:", [submitted.length, failed.length]) +
+			`<ul>${rows}</ul>`,
+		indicator: "orange",
+	});
+}
@@ -1,17 +1,52 @@
 # Copyright (c) 2025, Samuael Ketema and contributors
 # For license information, please see license.txt
 
+import csv
+
 import frappe
 from frappe.model.document import Document
+from frappe.model.naming import parse_naming_series
+from frappe.utils import cint, flt, getdate, now_datetime
+from frappe.utils.background_jobs import is_job_enqueued
+
+from gvm_payroll.gvm_payroll.overrides.additional_salary import get_idempotency_key
+from gvm_payroll.instrumentation import instrumented
+
+ADDITIONAL_SALARY_NAMING_SERIES = "HR-ADS-.YY.-.MM.-"
+
+# Number of Additional Salary rows written per INSERT in batched mode
+ADDITIONAL_SALARY_CHUNK_SIZE = 500
+
+# Number of Additional Salary records submitted between commits
+SUBMIT_CHUNK_SIZE = 100
+
+# Number of CSV rows read, validated and inserted between commits when importing charges
+IMPORT_CHUNK_SIZE = 1000
+
+# Columns expected in the charges CSV header
+IMPORT_COLUMNS = ("employee", "quarter", "salary_component", "amount")
+
+# Maximum number of row errors kept in the import summary
+IMPORT_MAX_ERRORS = 200
 
 
 class BulkAdditionalSalary(Document):
-	pass
+	def onload(self):
+		self.set_onload("submission_in_progress", is_submission_in_progress(self))
 
 
 @frappe.whitelist()
-def create_additional_salaries(docname: str):
-	"""Create Additional Salary docs from Bulk Additional Salary rows."""
+@instrumented("bulk_additional_salary.create")
+def create_additional_salaries(docname: str, batched: int = 0):
+	"""
+	Create Additional Salary docs from Bulk Additional Salary rows.
+
+	With `batched` set, the rows are validated up front with set-based queries and
+	written with bulk inserts instead of one `insert()` per row.
+	"""
+	if cint(batched):
+		return create_additional_salaries_batched(docname)
+
 	doc = frappe.get_doc("Bulk Additional Salary", docname)
 
 	if not doc.company or not doc.payroll_date:
@@ -45,30 +80,648 @@ def create_additional_salaries(docname: str):
 	return {"created": created}
 
 
+def create_additional_salaries_batched(docname):
+	"""
+	Create draft Additional Salary records for all rows of a Bulk Additional Salary
+	in one pass.
+
+	All rows are validated together (see validate_additional_salary_rows), names are
+	reserved from the naming series as one block and the records are written in
+	chunks of ADDITIONAL_SALARY_CHUNK_SIZE rows.
+	"""
+	frappe.has_permission("Additional Salary", "create", throw=True)
+
+	doc = frappe.db.get_value(
+		"Bulk Additional Salary", docname, ["name", "company", "payroll_date"], as_dict=True
+	)
+	if not doc:
+		frappe.throw(f"Bulk Additional Salary {docname} not found")
+
+	if not doc.company or not doc.payroll_date:
+		frappe.throw("Company and Payroll Date are required")
+
+	rows = frappe.get_all(
+		"Bulk Additional Salary Item",
+		filters={"parent": doc.name, "parenttype": "Bulk Additional Salary", "parentfield": "charges"},
+		fields=["idx", "employee", "salary_component", "amount"],
+		order_by="idx asc",
+	)
+	if not rows:
+		frappe.throw("Please add at least one charge row")
+
+	rows = [row for row in rows if row.employee and row.salary_component and row.amount is not None]
+	if not rows:
+		return {"created": []}
+
+	employees, components = validate_additional_salary_rows(rows, doc.company, doc.payroll_date)
+
+	names = reserve_names(ADDITIONAL_SALARY_NAMING_SERIES + ".#####", len(rows))
+	company_currency = frappe.get_cached_value("Company", doc.company, "default_currency")
+	now = now_datetime()
+	user = frappe.session.user
+
+	fields = [
+		"name",
+		"owner",
+		"creation",
+		"modified",
+		"modified_by",
+		"docstatus",
+		"naming_series",
+		"employee",
+		"employee_name",
+		"department",
+		"company",
+		"payroll_date",
+		"salary_component",
+		"type",
+		"currency",
+		"amount",
+		"overwrite_salary_structure_amount",
+		"ref_doctype",
+		"ref_docname",
+		"custom_idempotency_key",
+	]
+
+	values = []
+	for name, row in zip(names, rows, strict=True):
+		employee = employees[row.employee]
+		values.append(
+			(
+				name,
+				user,
+				now,
+				now,
+				user,
+				0,
+				ADDITIONAL_SALARY_NAMING_SERIES,
+				row.employee,
+				employee.employee_name,
+				employee.department,
+				doc.company,
+				doc.payroll_date,
+				row.salary_component,
+				components[row.salary_component].type,
+				employee.salary_currency or company_currency,
+				row.amount,
+				1,
+				"Bulk Additional Salary",
+				doc.name,
+				get_idempotency_key("Bulk Additional Salary", doc.name, row.employee, row.salary_component),
+			)
+		)
+
+	frappe.db.bulk_insert("Additional Salary", fields, values, chunk_size=ADDITIONAL_SALARY_CHUNK_SIZE)
+
+	return {"created": names}
+
+
+def validate_additional_salary_rows(rows, company, payroll_date):
+	"""
+	Validate Bulk Additional Salary rows with one query per check instead of one
+	document validation per row.
+
+	Checks that each employee exists, is Active, belongs to the company, has joined by
+	the payroll date and has a Salary Structure Assignment; that each salary component
+	exists, is enabled and belongs to the company; and that no Additional Salary for
+	the same employee, component and payroll date exists (in the database or twice in
+	the rows).
+
+	Returns:
+		tuple: (employee name -> details, salary component name -> details)
+	"""
+	payroll_date = getdate(payroll_date)
+	employee_names = list({row.employee for row in rows})
+	component_names = list({row.salary_component for row in rows})
+
+	employees = {
+		d.name: d
+		for d in frappe.get_all(
+			"Employee",
+			filters={"name": ["in", employee_names]},
+			fields=[
+				"name",
+				"employee_name",
+				"department",
+				"company",
+				"status",
+				"date_of_joining",
+				"salary_currency",
+			],
+		)
+	}
+	components = {
+		d.name: d
+		for d in frappe.get_all(
+			"Salary Component",
+			filters={"name": ["in", component_names]},
+			fields=["name", "type", "disabled", "custom_company"],
+		)
+	}
+	assigned = set(
+		frappe.get_all(
+			"Salary Structure Assignment",
+			filters={"employee": ["in", employee_names], "docstatus": 1},
+			pluck="employee",
+			distinct=True,
+		)
+	)
+	existing = {
+		(d.employee, d.salary_component)
+		for d in frappe.get_all(
+			"Additional Salary",
+			filters={
+				"employee": ["in", employee_names],
+				"salary_component": ["in", component_names],
+				"payroll_date": payroll_date,
+				"docstatus": ["!=", 2],
+				"disabled": 0,
+			},
+			fields=["employee", "salary_component"],
+		)
+	}
+
+	errors = []
+	seen = set()
+	for row in rows:
+		employee = employees.get(row.employee)
+		component = components.get(row.salary_component)
+		key = (row.employee, row.salary_component)
+
+		if not employee:
+			errors.append(f"Row {row.idx}: Employee {row.employee} does not exist")
+		elif employee.company != company:
+			errors.append(f"Row {row.idx}: Employee {row.employee} does not belong to {company}")
+		elif employee.status != "Active":
+			errors.append(f"Row {row.idx}: Employee {row.employee} is not Active")
+		elif employee.date_of_joining and getdate(employee.date_of_joining) > payroll_date:
+			errors.append(f"Row {row.idx}: Employee {row.employee} joins after the Payroll Date")
+		elif row.employee not in assigned:
+			errors.append(f"Row {row.idx}: No Salary Structure assigned to Employee {row.employee}")
+
+		if not component:
+			errors.append(f"Row {row.idx}: Salary Component {row.salary_component} does not exist")
+		elif component.disabled:
+			errors.append(f"Row {row.idx}: Salary Component {row.salary_component} is disabled")
+		elif component.custom_company and component.custom_company != company:
+			errors.append(
+				f"Row {row.idx}: Salary Component {row.salary_component} does not belong to {company}"
+			)
+
+		if key in existing:
+			errors.append(
+				f"Row {row.idx}: Additional Salary for {row.employee} / {row.salary_component} "
+				"already exists for this Payroll Date"
+			)
+		elif key in seen:
+			errors.append(f"Row {row.idx}: Duplicate row for {row.employee} / {row.salary_component}")
+		seen.add(key)
+
+	if errors:
+		frappe.throw("<br>".join(errors), title="Invalid Charges")
+
+	return employees, components
+
+
+def reserve_names(naming_series, count):
+	"""
+	Reserve `count` consecutive names from a naming series with a single upsert of
+	its counter.
+
+	Args:
+		naming_series (str): Series with a numeric part, e.g. "HR-ADS-.YY.-.MM.-.#####"
+		count (int): Number of names to reserve
+
+	Returns:
+		list: Names in series order
+	"""
+	placeholder = "\x00"
+	prefix = None
+	digits = 0
+
+	def capture_counter(partial_series, number_of_digits):
+		nonlocal prefix, digits
+		prefix, digits = partial_series, number_of_digits
+		return placeholder
+
+	template = parse_naming_series(naming_series, number_generator=capture_counter)
+
+	# One upsert creates or advances the counter, so the first use of a prefix by two
+	# workers at once cannot collide; the row stays locked until the transaction ends
+	frappe.db.sql(
+		"""insert into `tabSeries` (name, current) values (%(prefix)s, %(count)s)
+		on duplicate key update current = ifnull(current, 0) + values(current)""",
+		{"prefix": prefix, "count": count},
+	)
+	end = cint(frappe.db.get_value("Series", prefix, "current", for_update=True))
+	start = end - count + 1
+
+	return [template.replace(placeholder, str(n).zfill(digits)) for n in range(start, start + count)]
+
+
+@frappe.whitelist()
+def import_charges(docname: str, file_url: str):
+	"""
+	Queue import of charge rows from a CSV file into a Bulk Additional Salary.
+
+	The CSV needs a header with the columns employee, quarter, salary_component and
+	amount (quarter and salary_component fall back to the document defaults). Rows are
+	imported by `process_import_charges` in a background job and the summary is sent
+	with the `bulk_additional_salary_import_completed` realtime event.
+	"""
+	doc = frappe.get_doc("Bulk Additional Salary", docname)
+	doc.check_permission("write")
+
+	if doc.docstatus != 0:
+		frappe.throw("Charges can only be imported into a draft Bulk Additional Salary")
+
+	if frappe.db.exists(
+		"Additional Salary", {"ref_doctype": "Bulk Additional Salary", "ref_docname": docname}
+	):
+		frappe.throw("Additional Salary records are already created for this document")
+
+	if not frappe.db.exists("File", {"file_url": file_url}):
+		frappe.throw(f"File {file_url} not found")
+	frappe.has_permission("File", "read", frappe.get_doc("File", {"file_url": file_url}), throw=True)
+
+	job_id = get_import_job_id(docname)
+	if is_job_enqueued(job_id):
+		frappe.throw("Charges are already being imported into this document")
+
+	frappe.enqueue(
+		"gvm_payroll.gvm_payroll.doctype.bulk_additional_salary.bulk_additional_salary.process_import_charges",
+		queue="long",
+		timeout=3600,
+		job_id=job_id,
+		deduplicate=True,
+		docname=docname,
+		file_url=file_url,
+	)
+
+	return {"queued": True}
+
+
+@instrumented("job:bulk_additional_salary.import")
+def process_import_charges(docname: str, file_url: str):
+	"""
+	Stream charge rows from a CSV file into Bulk Additional Salary Item rows.
+
+	The file is read IMPORT_CHUNK_SIZE rows at a time, so memory use does not grow with
+	the file. Employees, quarters and salary components are loaded once into in-memory
+	lookups; each chunk is validated against them and written with one bulk insert,
+	followed by a commit. Invalid rows are skipped and the first IMPORT_MAX_ERRORS of
+	them are reported in `errors`.
+
+	Rows whose (employee, salary component) is already in the document are counted in
+	`skipped`, so re-running an import that failed part way does not add the rows its
+	committed chunks already inserted.
+	"""
+	doc = frappe.db.get_value(
+		"Bulk Additional Salary",
+		docname,
+		["name", "company", "default_quarter", "default_salary_component"],
+		as_dict=True,
+	)
+	file_path = frappe.get_doc("File", {"file_url": file_url}).get_full_path()
+	lookups = get_import_lookups(doc.company)
+	lookups.imported = get_imported_charges(docname)
+	lookups.seen = set()
+
+	start_idx = idx = cint(
+		frappe.db.get_value(
+			"Bulk Additional Salary Item",
+			{"parent": docname, "parenttype": "Bulk Additional Salary", "parentfield": "charges"},
+			"max(idx)",
+		)
+	)
+	processed = 0
+	skipped = []
+	errors = []
+
+	try:
+		with open(file_path, newline="", encoding="utf-8-sig") as f:
+			reader = csv.reader(f)
+			columns = get_import_columns(next(reader, None))
+
+			chunk = []
+			for line_no, values in enumerate(reader, start=2):
+				if not any(v.strip() for v in values):
+					continue
+
+				chunk.append((line_no, values))
+				if len(chunk) >= IMPORT_CHUNK_SIZE:
+					idx = insert_charge_rows(doc, chunk, columns, lookups, idx, skipped, errors)
+					processed += len(chunk)
+					chunk = []
+					publish_import_progress(docname, processed)
+
+			if chunk:
+				idx = insert_charge_rows(doc, chunk, columns, lookups, idx, skipped, errors)
+				processed += len(chunk)
+				publish_import_progress(docname, processed)
+	except Exception:
+		frappe.db.rollback()
+		frappe.log_error(
+			title=f"Bulk Additional Salary: charge import failed for {docname}",
+			reference_doctype="Bulk Additional Salary",
+			reference_name=docname,
+		)
+		frappe.publish_realtime(
+			"bulk_additional_salary_import_failed",
+			{"docname": docname, "processed": processed},
+			doctype="Bulk Additional Salary",
+			docname=docname,
+		)
+		raise
+
+	frappe.db.set_value("Bulk Additional Salary", docname, "modified", now_datetime(), update_modified=False)
+	frappe.db.commit()
+
+	result = {"imported": idx - start_idx, "processed": processed, "skipped": len(skipped), "errors": errors}
+	frappe.publish_realtime(
+		"bulk_additional_salary_import_completed",
+		dict(result, docname=docname),
+		doctype="Bulk Additional Salary",
+		docname=docname,
+	)
+	return result
+
+
+def get_import_lookups(company):
+	"""
+	Load the link values a charges import is validated against.
+
+	Returns:
+		frappe._dict: employees (name -> custom_quarter) of the company's active employees,
+		quarters (set of Quarter names) and components (set of enabled Salary Components
+		usable by the company)
+	"""
+	employees = dict(
+		frappe.get_all(
+			"Employee",
+			filters={"company": company, "status": "Active"},
+			fields=["name", "custom_quarter"],
+			as_list=True,
+		)
+	)
+	quarters = set(frappe.get_all("Quarter", pluck="name"))
+	components = {
+		d.name
+		for d in frappe.get_all(
+			"Salary Component", filters={"disabled": 0}, fields=["name", "custom_company"]
+		)
+		if not d.custom_company or d.custom_company == company
+	}
+	return frappe._dict(employees=employees, quarters=quarters, components=components)
+
+
+def get_imported_charges(docname):
+	"""(employee, salary component) of the charge rows already in a Bulk Additional Salary."""
+	return set(
+		frappe.get_all(
+			"Bulk Additional Salary Item",
+			filters={"parent": docname, "parenttype": "Bulk Additional Salary", "parentfield": "charges"},
+			fields=["employee", "salary_component"],
+			as_list=True,
+		)
+	)
+
+
+def get_import_columns(header):
+	"""Map the expected import columns to their position in the CSV header."""
+	if not header:
+		frappe.throw("The CSV file is empty")
+
+	header = [frappe.scrub(h.strip()) for h in header]
+	missing = [c for c in IMPORT_COLUMNS if c not in header and c != "quarter"]
+	if missing:
+		frappe.throw(f"Missing columns in CSV header: {', '.join(missing)}")
+
+	return {c: header.index(c) for c in IMPORT_COLUMNS if c in header}
+
+
+def insert_charge_rows(doc, chunk, columns, lookups, idx, skipped, errors):
+	"""
+	Validate a chunk of CSV rows, bulk insert the valid ones as charge rows and commit.
+	Rows already in the document before the import (lookups.imported) are added to
+	`skipped`; rows repeated within the file are errors.
+
+	Returns:
+		int: idx of the last inserted row
+	"""
+	now = now_datetime()
+	user = frappe.session.user
+	values = []
+
+	for line_no, row in chunk:
+		employee = get_cell(row, columns, "employee")
+		quarter = get_cell(row, columns, "quarter") or lookups.employees.get(employee) or doc.default_quarter
+		salary_component = get_cell(row, columns, "salary_component") or doc.default_salary_component
+		amount = get_cell(row, columns, "amount")
+
+		error = None
+		if employee not in lookups.employees:
+			error = f"Employee {employee} is not an active employee of {doc.company}"
+		elif quarter and quarter not in lookups.quarters:
+			error = f"Quarter {quarter} does not exist"
+		elif salary_component not in lookups.components:
+			error = f"Salary Component {salary_component} is not enabled for {doc.company}"
+		elif (employee, salary_component) in lookups.seen:
+			error = f"Employee {employee} and Salary Component {salary_component} appear more than once"
+		elif (employee, salary_component) in lookups.imported:
+			skipped.append(line_no)
+			continue
+		elif not amount:
+			error = "Amount is required"
+		else:
+			try:
+				amount = float(amount.replace(",", ""))
+			except ValueError:
+				error = f"Amount {amount} is not a number"
+
+		if error:
+			if len(errors) < IMPORT_MAX_ERRORS:
+				errors.append({"row": line_no, "error": error})
+			continue
+
+		lookups.seen.add((employee, salary_component))
+		idx += 1
+		values.append(
+			(
+				frappe.generate_hash(length=10),
+				user,
+				now,
+				now,
+				user,
+				0,
+				idx,
+				doc.name,
+				"Bulk Additional Salary",
+				"charges",
+				employee,
+				quarter or None,
+				salary_component,
+				flt(amount),
+			)
+		)
+
+	if values:
+		frappe.db.bulk_insert(
+			"Bulk Additional Salary Item",
+			[
+				"name",
+				"owner",
+				"creation",
+				"modified",
+				"modified_by",
+				"docstatus",
+				"idx",
+				"parent",
+				"parenttype",
+				"parentfield",
+				"employee",
+				"quarter",
+				"salary_component",
+				"amount",
+			],
+			values,
+		)
+	frappe.db.commit()
+
+	return idx
+
+
+def get_cell(row, columns, column):
+	position = columns.get(column)
+	if position is None or position >= len(row):
+		return ""
+	return row[position].strip()
+
+
+def publish_import_progress(docname, processed):
+	frappe.publish_realtime(
+		"bulk_additional_salary_import_progress",
+		{"docname": docname, "processed": processed},
+		doctype="Bulk Additional Salary",
+		docname=docname,
+	)
+
+
+def get_import_job_id(docname):
+	return f"bulk_additional_salary_import::{docname}"
+
+
 @frappe.whitelist()
 def submit_additional_salaries(docname: str):
-	"""Submit all draft Additional Salary records linked to Bulk Additional Salary."""
+	"""
+	Queue submission of all draft Additional Salary records linked to Bulk Additional Salary.
+
+	The Bulk Additional Salary document stays locked until the background job
+	(process_submit_additional_salaries) finishes, so two submissions cannot overlap.
+	A lock left behind by a job that is no longer queued is released here.
+	"""
 	doc = frappe.get_doc("Bulk Additional Salary", docname)
-	
-	# Get all draft additional salaries for this document
-	additional_salaries = frappe.get_all(
+
+	if is_submission_in_progress(doc):
+		frappe.throw("Additional Salary records of this document are already being submitted")
+	if doc.is_locked:
+		doc.unlock()
+
+	if not frappe.db.exists(
 		"Additional Salary",
-		filters={
-			"ref_doctype": "Bulk Additional Salary",
-			"ref_docname": docname,
-			"docstatus": 0,  # Draft
-		},
-		fields=["name"],
-	)
-	
-	if not additional_salaries:
+		{"ref_doctype": "Bulk Additional Salary", "ref_docname": docname, "docstatus": 0},
+	):
 		frappe.throw("No draft Additional Salary records found to submit")
-	
+
+	doc.lock()
+	try:
+		frappe.enqueue(
+			"gvm_payroll.gvm_payroll.doctype.bulk_additional_salary.bulk_additional_salary.process_submit_additional_salaries",
+			queue="long",
+			timeout=3600,
+			job_id=get_submit_job_id(docname),
+			deduplicate=True,
+			docname=docname,
+		)
+	except Exception:
+		doc.unlock()
+		raise
+
+	return {"queued": True}
+
+
+def is_submission_in_progress(doc):
+	"""
+	Whether the submit job of a Bulk Additional Salary is queued or running.
+
+	Only reads the lock, so it is safe on onload. A lock without a job (its worker was
+	killed or it was dropped from the queue) is stale; the next submit_additional_salaries
+	call releases it.
+	"""
+	return doc.is_locked and is_job_enqueued(get_submit_job_id(doc.name))
+
+
+def get_submit_job_id(docname):
+	return f"bulk_additional_salary_submit::{docname}"
+
+
+@instrumented("job:bulk_additional_salary.submit")
+def process_submit_additional_salaries(docname: str):
+	"""
+	Submit all draft Additional Salary records linked to Bulk Additional Salary.
+
+	Records are submitted in chunks of SUBMIT_CHUNK_SIZE with a commit after each chunk.
+	A record that fails to submit is rolled back on its own, logged and reported in the
+	`failed` list; the rest of the batch carries on.
+	"""
+	doc = frappe.get_doc("Bulk Additional Salary", docname)
+
 	submitted = []
-	for salary in additional_salaries:
-		salary_doc = frappe.get_doc("Additional Salary", salary.name)
-		salary_doc.submit()
-		submitted.append(salary.name)
-	
-	frappe.db.commit()
-	return {"submitted": submitted}
+	failed = []
+	try:
+		additional_salaries = frappe.get_all(
+			"Additional Salary",
+			filters={
+				"ref_doctype": "Bulk Additional Salary",
+				"ref_docname": docname,
+				"docstatus": 0,  # Draft
+			},
+			pluck="name",
+			order_by="name asc",
+		)
+		total = len(additional_salaries)
+
+		for chunk_start in range(0, total, SUBMIT_CHUNK_SIZE):
+			for name in additional_salaries[chunk_start : chunk_start + SUBMIT_CHUNK_SIZE]:
+				frappe.db.savepoint("submit_additional_salary")
+				try:
+					frappe.get_doc("Additional Salary", name).submit()
+					submitted.append(name)
+				except Exception as e:
+					frappe.db.rollback(save_point="submit_additional_salary")
+					frappe.clear_messages()
+					failed.append({"name": name, "error": str(e)})
+					frappe.log_error(
+						title=f"Bulk Additional Salary: could not submit {name}",
+						reference_doctype="Bulk Additional Salary",
+						reference_name=docname,
+					)
+
+			frappe.db.commit()
+			frappe.publish_realtime(
+				"bulk_additional_salary_progress",
+				{"docname": docname, "progress": min(chunk_start + SUBMIT_CHUNK_SIZE, total), "total": total},
+				doctype="Bulk Additional Salary",
+				docname=docname,
+			)
+	finally:
+		doc.unlock()
+
+	result = {"submitted": submitted, "failed": failed}
+	frappe.publish_realtime(
+		"bulk_additional_salary_submitted",
+		dict(result, docname=docname),
+		doctype="Bulk Additional Salary",
+		docname=docname,
+	)
+	return result
@@ -1,9 +1,216 @@
 # Copyright (c) 2025, Samuael Ketema and Contributors
 # See license.txt
 
-# import frappe
+import frappe
+from erpnext.setup.doctype.employee.test_employee import make_employee
+from frappe.model.naming import make_autoname
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_months, get_first_day, nowdate
+from hrms.payroll.doctype.salary_structure.test_salary_structure import make_salary_structure
+
+from gvm_payroll.gvm_payroll.doctype.bulk_additional_salary.bulk_additional_salary import (
+	ADDITIONAL_SALARY_NAMING_SERIES,
+	create_additional_salaries,
+	import_charges,
+	is_submission_in_progress,
+	process_import_charges,
+	reserve_names,
+	submit_additional_salaries,
+)
+
+COMPANY = "_Test Company"
+COMPONENT = "_Test Bulk Charge"
+
+# Fields an Additional Salary gets the same way from the batched and row-by-row paths
+COMPARED_FIELDS = (
+	"employee",
+	"employee_name",
+	"department",
+	"company",
+	"payroll_date",
+	"salary_component",
+	"type",
+	"currency",
+	"amount",
+	"overwrite_salary_structure_amount",
+	"naming_series",
+	"docstatus",
+	"ref_doctype",
+)
 
 
 class TestBulkAdditionalSalary(FrappeTestCase):
-	pass
+	def test_rerun_import_skips_rows_already_imported(self):
+		doc, file_url, employees = make_import(private=0)
+		# process_import_charges commits each chunk, so the data is removed explicitly
+		self.addCleanup(delete_import, doc.name, file_url)
+
+		first = process_import_charges(doc.name, file_url)
+		self.assertEqual(first["imported"], len(employees))
+
+		# A re-run after a partial failure only adds the rows that are not there yet
+		second = process_import_charges(doc.name, file_url)
+		self.assertEqual(second["imported"], 0)
+		self.assertEqual(second["skipped"], len(employees))
+		self.assertEqual(frappe.db.count("Bulk Additional Salary Item", {"parent": doc.name}), len(employees))
+
+	def test_import_needs_read_access_to_file(self):
+		doc, file_url, _employees = make_import(private=1)
+		frappe.db.set_value("File", {"file_url": file_url}, "owner", "Administrator")
+
+		frappe.share.add_docshare("Bulk Additional Salary", doc.name, "test@example.com", write=1)
+
+		frappe.set_user("test@example.com")
+		self.addCleanup(frappe.set_user, "Administrator")
+
+		self.assertRaises(frappe.PermissionError, import_charges, doc.name, file_url)
+
+	def test_lock_without_submit_job_is_released_on_submit(self):
+		doc, _file_url, _employees = make_import(private=0)
+		doc.lock()
+		self.addCleanup(doc.unlock)
+
+		self.assertFalse(is_submission_in_progress(doc))
+		self.assertTrue(doc.is_locked)
+
+		# Nothing to submit, but the stale lock is released on the attempt
+		self.assertRaises(frappe.ValidationError, submit_additional_salaries, doc.name)
+		self.assertFalse(doc.is_locked)
+
+
+class TestBatchedAdditionalSalaries(FrappeTestCase):
+	def test_reserved_names_continue_the_series(self):
+		series = ADDITIONAL_SALARY_NAMING_SERIES + ".#####"
+		before = make_autoname(series)
+
+		names = reserve_names(series, 3)
+		after = make_autoname(series)
+
+		numbers = [int(name.rsplit("-", 1)[1]) for name in [before, *names, after]]
+		self.assertEqual(numbers, list(range(numbers[0], numbers[0] + 5)))
+		self.assertTrue(all(name.startswith(before.rsplit("-", 1)[0]) for name in names))
+		self.assertFalse(frappe.db.exists("Additional Salary", {"name": ["in", names]}))
+
+	def test_batched_rows_match_row_by_row_creation(self):
+		employees = [make_structured_employee(f"bulk_batched_{i}@example.com") for i in range(2)]
+		rows = [{"employee": employee, "amount": 100 * (i + 1)} for i, employee in enumerate(employees)]
+
+		single = create_additional_salaries(make_charges_doc(rows).name)["created"]
+		expected = get_created_fields(single)
+		# The batched path rejects charges that already exist for the payroll date
+		for name in single:
+			frappe.delete_doc("Additional Salary", name)
+
+		batched = create_additional_salaries(make_charges_doc(rows).name, batched=1)["created"]
+		self.assertEqual(get_created_fields(batched), expected)
+
+	def test_set_based_validation_rejects_invalid_rows(self):
+		active = make_structured_employee("bulk_batched_active@example.com")
+		inactive = make_structured_employee("bulk_batched_inactive@example.com")
+		frappe.db.set_value("Employee", inactive, "status", "Inactive")
+		unassigned = make_employee("bulk_batched_unassigned@example.com", company=COMPANY)
+
+		doc = make_charges_doc(
+			[
+				{"employee": active, "amount": 100},
+				{"employee": active, "amount": 200},
+				{"employee": inactive, "amount": 100},
+				{"employee": unassigned, "amount": 100},
+			]
+		)
+
+		with self.assertRaises(frappe.ValidationError) as raised:
+			create_additional_salaries(doc.name, batched=1)
+
+		message = str(raised.exception)
+		self.assertIn(f"Row 2: Duplicate row for {active} / {COMPONENT}", message)
+		self.assertIn(f"Row 3: Employee {inactive} is not Active", message)
+		self.assertIn(f"Row 4: No Salary Structure assigned to Employee {unassigned}", message)
+		self.assertNotIn("Row 1:", message)
+		self.assertFalse(
+			frappe.db.exists(
+				"Additional Salary", {"ref_doctype": "Bulk Additional Salary", "ref_docname": doc.name}
+			)
+		)
+
+
+def make_component():
+	if not frappe.db.exists("Salary Component", COMPONENT):
+		frappe.get_doc(
+			{
+				"doctype": "Salary Component",
+				"salary_component": COMPONENT,
+				"salary_component_abbr": "TBC",
+				"type": "Deduction",
+			}
+		).insert()
+
+
+def make_structured_employee(user):
+	employee = make_employee(user, company=COMPANY)
+	make_salary_structure(
+		"_Test Bulk Charges Structure",
+		"Monthly",
+		employee=employee,
+		company=COMPANY,
+		from_date=add_months(get_first_day(nowdate()), -1),
+	)
+	return employee
+
+
+def make_charges_doc(rows):
+	make_component()
+	return frappe.get_doc(
+		{
+			"doctype": "Bulk Additional Salary",
+			"company": COMPANY,
+			"payroll_date": nowdate(),
+			"charges": [dict(row, salary_component=COMPONENT) for row in rows],
+		}
+	).insert()
+
+
+def get_created_fields(names):
+	records = frappe.get_all(
+		"Additional Salary", filters={"name": ["in", names]}, fields=COMPARED_FIELDS, order_by="employee"
+	)
+	return [tuple(record[field] for field in COMPARED_FIELDS) for record in records]
+
+
+def make_import(private):
+	make_component()
+
+	employees = [make_employee(f"bulk_charges_{i}@example.com", company=COMPANY) for i in range(2)]
+
+	doc = frappe.get_doc(
+		{
+			"doctype": "Bulk Additional Salary",
+			"company": COMPANY,
+			"payroll_date": nowdate(),
+			"charges": [{"employee": employees[0], "salary_component": COMPONENT, "amount": 1}],
+		}
+	)
+	doc.insert()
+	# The placeholder row only satisfies the mandatory table
+	frappe.db.delete("Bulk Additional Salary Item", {"parent": doc.name})
+
+	content = "employee,salary_component,amount\n" + "".join(
+		f"{employee},{COMPONENT},{100 * (i + 1)}\n" for i, employee in enumerate(employees)
+	)
+	file = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": f"{doc.name}.csv",
+			"content": content,
+			"is_private": private,
+		}
+	).insert()
+
+	return doc, file.file_url, employees
+
+
+def delete_import(docname, file_url):
+	frappe.db.delete("Bulk Additional Salary Item", {"parent": docname})
+	frappe.db.delete("Bulk Additional Salary", {"name": docname})
+	frappe.delete_doc("File", frappe.db.get_value("File", {"file_url": file_url}), force=True)
+	frappe.db.commit()
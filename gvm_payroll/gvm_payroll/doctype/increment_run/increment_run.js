@@ -0,0 +1,79 @@
+// Copyright (c) 2026, Samuael Ketema and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Increment Run", {
+	onload(frm) {
+		frappe.realtime.off("increment_run_progress");
+		frappe.realtime.on("increment_run_progress", (data) => {
+			if (data.name !== frm.doc.name) return;
+			frappe.show_progress(
+				__("Processing Increments"),
+				data.progress,
+				data.total,
+				__("Processed {0} of {1}", [data.progress, data.total])
+			);
+		});
+
+		frappe.realtime.off("increment_run_completed");
+		frappe.realtime.on("increment_run_completed", (data) => {
+			if (data.name !== frm.doc.name) return;
+			frappe.hide_progress();
+			frappe.show_alert({
+				message: data.failed
+					? __("Increment Run {0}: {1} rows failed", [data.status, data.failed])
+					: __("Increment Run {0}", [data.status]),
+				indicator: data.failed ? "orange" : "green",
+			});
+			frm.reload_doc();
+		});
+	},
+
+	refresh(frm) {
+		set_status_headline(frm);
+
+		if (frm.doc.docstatus === 0 && !frm.is_new()) {
+			frm.add_custom_button(__("Get Employees"), () => {
+				frm.call({
+					doc: frm.doc,
+					method: "get_employees",
+					freeze: true,
+					freeze_message: __("Finding employees due for an increment..."),
+				}).then(() => {
+					frm.dirty();
+					frm.refresh();
+					if (!frm.doc.employees.length) {
+						frappe.msgprint(__("No employees are due for an increment on this date."));
+					}
+				});
+			});
+		}
+
+		if (frm.doc.docstatus === 1 && ["Partly Completed", "Failed"].includes(frm.doc.status)) {
+			frm.add_custom_button(__("Retry Failed"), () => {
+				frm.call({ doc: frm.doc, method: "retry_failed" }).then(() => frm.reload_doc());
+			});
+		}
+	},
+
+	company(frm) {
+		frm.clear_table("employees");
+		frm.refresh_field("employees");
+	},
+
+	increment_date(frm) {
+		frm.clear_table("employees");
+		frm.refresh_field("employees");
+	},
+});
+
+function set_status_headline(frm) {
+	const messages = {
+		Queued: [__("Increment Run is queued..."), "blue"],
+		"In Progress": [__("Salary Structure Assignments are being created..."), "blue"],
+		Cancelling: [__("Salary Structure Assignments are being cancelled..."), "orange"],
+	};
+	const message = messages[frm.doc.status];
+	if (message) {
+		frm.dashboard.set_headline(message[0], message[1]);
+	}
+}
@@ -0,0 +1,336 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_years, cint, flt, getdate
+
+from gvm_payroll.gvm_payroll.api.pay_matrix import (
+	get_designation_levels,
+	get_pay_matrix_index,
+	lookup_basic,
+)
+from gvm_payroll.gvm_payroll.doctype.ind_payroll_setting.ind_payroll_setting import (
+	DEFAULT_INCREMENT_DATES,
+	get_increment_date_from_string,
+	get_increment_date_strings,
+)
+from gvm_payroll.gvm_payroll.doctype.pay_matrix_snapshot.pay_matrix_snapshot import get_matrix_as_of
+
+# Number of Salary Structure Assignments created (or cancelled) between commits
+INCREMENT_CHUNK_SIZE = 100
+
+
+class IncrementRun(Document):
+	def validate(self):
+		self.validate_increment_date()
+		self.total_employees = len(self.employees)
+		if self.docstatus == 0:
+			self.status = "Draft"
+
+	def validate_increment_date(self):
+		year = getdate(self.increment_date).year
+		allowed = [
+			get_increment_date_from_string(d, year)
+			for d in get_increment_date_strings(self.company) or DEFAULT_INCREMENT_DATES
+		]
+		if getdate(self.increment_date) not in allowed:
+			frappe.throw(
+				f"Increment Date must be one of: {', '.join(str(d) for d in allowed if d)}",
+				title="Invalid Increment Date",
+			)
+
+	def before_submit(self):
+		if not self.employees:
+			frappe.throw("No employees to increment. Click 'Get Employees' first.")
+
+	def on_submit(self):
+		self.db_set("status", "Queued")
+		enqueue_increment_run(self.name, "process_increment_run")
+
+	def before_cancel(self):
+		if self.status in ("Queued", "In Progress", "Cancelling"):
+			frappe.throw("The increment run is still being processed. Cancel it once it has finished.")
+
+	def on_cancel(self):
+		self.db_set("status", "Cancelling")
+		enqueue_increment_run(self.name, "rollback_increment_run")
+
+	@frappe.whitelist()
+	def get_employees(self):
+		"""Fill the employees table with everyone due for an increment on the increment date."""
+		self.set("employees", [])
+		for row in get_eligible_employees(self.company, self.increment_date):
+			self.append("employees", row)
+		self.total_employees = len(self.employees)
+
+	@frappe.whitelist()
+	def retry_failed(self):
+		"""Queue the rows that failed again."""
+		if self.docstatus != 1 or self.status in ("Queued", "In Progress", "Cancelling"):
+			frappe.throw("Only a finished, submitted increment run can be retried.")
+
+		frappe.db.set_value(
+			"Increment Run Employee",
+			{"parent": self.name, "parenttype": "Increment Run", "status": "Failed"},
+			{"status": "Pending", "error": None},
+			update_modified=False,
+		)
+		self.db_set("status", "Queued")
+		enqueue_increment_run(self.name, "process_increment_run")
+
+
+def get_eligible_employees(company, increment_date):
+	"""
+	Employees of a company due for an increment on `increment_date`, with their new basic.
+
+	Employees are selected with one query on custom_next_increment_date: it equals the
+	increment date until the daily job applies the experience year, and is a year later
+	afterwards. Their latest Salary Structure Assignments are read with one more query
+	and the new basic is resolved from the pay matrix index (the Pay Matrix Snapshot
+	effective on the increment date, if any).
+
+	Returns:
+		list: Increment Run Employee rows
+	"""
+	increment_date = getdate(increment_date)
+	employees = frappe.get_all(
+		"Employee",
+		filters={
+			"company": company,
+			"status": "Active",
+			"custom_pay_matrix": ["is", "set"],
+			"custom_next_increment_date": ["in", [increment_date, add_years(increment_date, 1)]],
+		},
+		fields=[
+			"name",
+			"employee_name",
+			"designation",
+			"custom_pay_matrix",
+			"custom_years_experienced",
+			"custom_level",
+			"custom_basic_salary",
+			"custom_next_increment_date",
+		],
+		order_by="name asc",
+	)
+	if not employees:
+		return []
+
+	assignments = {}
+	already_incremented = set()
+	for ssa in frappe.get_all(
+		"Salary Structure Assignment",
+		filters={
+			"employee": ["in", [emp.name for emp in employees]],
+			"docstatus": 1,
+			"from_date": ["<=", increment_date],
+		},
+		fields=["name", "employee", "from_date"],
+		order_by="from_date desc",
+	):
+		if getdate(ssa.from_date) == increment_date:
+			already_incremented.add(ssa.employee)
+		elif ssa.employee not in assignments:
+			assignments[ssa.employee] = ssa.name
+
+	designation_levels = get_designation_levels()
+	indexes = {}
+	rows = []
+	for emp in employees:
+		if emp.name in already_incremented or emp.name not in assignments:
+			continue
+
+		level = designation_levels.get((emp.designation, emp.custom_pay_matrix))
+		if not level:
+			continue
+
+		# Experience year not applied yet by the daily job
+		years = cint(emp.custom_years_experienced)
+		if getdate(emp.custom_next_increment_date) == increment_date:
+			years += 1
+
+		if emp.custom_pay_matrix not in indexes:
+			index = get_matrix_as_of(emp.custom_pay_matrix, increment_date)
+			indexes[emp.custom_pay_matrix] = get_pay_matrix_index() if index is None else index
+
+		new_basic = lookup_basic(emp.custom_pay_matrix, level, years, index=indexes[emp.custom_pay_matrix])
+		if not new_basic or flt(new_basic) == flt(emp.custom_basic_salary):
+			continue
+
+		rows.append(
+			{
+				"employee": emp.name,
+				"employee_name": emp.employee_name,
+				"pay_matrix": emp.custom_pay_matrix,
+				"old_level": emp.custom_level,
+				"level": level,
+				"years_experienced": years,
+				"old_basic": flt(emp.custom_basic_salary),
+				"new_basic": new_basic,
+				"previous_assignment": assignments[emp.name],
+				"status": "Pending",
+			}
+		)
+
+	return rows
+
+
+def process_increment_run(name: str):
+	"""
+	Create the Salary Structure Assignments of an Increment Run.
+
+	Pending rows are processed in chunks of INCREMENT_CHUNK_SIZE with a commit and a
+	progress event after each chunk, so an interrupted run resumes where it stopped.
+	Each assignment is a copy of the employee's previous one from the increment date
+	with the new basic. A row that fails is rolled back on its own and marked Failed.
+	"""
+	doc = frappe.get_doc("Increment Run", name)
+	doc.db_set("status", "In Progress")
+	frappe.db.commit()
+
+	rows = [row for row in doc.employees if row.status == "Pending"]
+	total = len(doc.employees)
+	progress = total - len(rows)
+
+	try:
+		for chunk_start in range(0, len(rows), INCREMENT_CHUNK_SIZE):
+			row_updates = {}
+			employee_updates = {}
+
+			for row in rows[chunk_start : chunk_start + INCREMENT_CHUNK_SIZE]:
+				frappe.db.savepoint("increment_run_row")
+				try:
+					assignment = create_increment_assignment(row, doc.increment_date)
+				except Exception as e:
+					frappe.db.rollback(save_point="increment_run_row")
+					frappe.clear_messages()
+					row_updates[row.name] = {"status": "Failed", "error": str(e)}
+					continue
+
+				row_updates[row.name] = {
+					"status": "Created",
+					"salary_structure_assignment": assignment.name,
+					"error": None,
+				}
+				employee_updates[row.employee] = {
+					"custom_basic_salary": row.new_basic,
+					"custom_level": row.level,
+				}
+
+			frappe.db.bulk_update("Increment Run Employee", row_updates, update_modified=False)
+			if employee_updates:
+				frappe.db.bulk_update("Employee", employee_updates)
+			frappe.db.commit()
+
+			progress += len(row_updates)
+			publish_increment_run_progress(name, progress, total)
+	except Exception:
+		frappe.db.rollback()
+		doc.db_set("status", "Failed")
+		frappe.db.commit()
+		frappe.log_error(
+			title=f"Increment Run {name} failed",
+			reference_doctype="Increment Run",
+			reference_name=name,
+		)
+		raise
+
+	finish_increment_run(name, "Failed", "Completed", "Partly Completed")
+
+
+def create_increment_assignment(row, increment_date):
+	"""Submit a copy of the previous Salary Structure Assignment with the new basic."""
+	previous = frappe.get_doc("Salary Structure Assignment", row.previous_assignment)
+
+	assignment = frappe.copy_doc(previous)
+	assignment.from_date = increment_date
+	assignment.custom_basic_amount = row.new_basic
+	# `base` is hidden; keep it in step when it carried the basic pay
+	if flt(previous.base) == flt(previous.custom_basic_amount):
+		assignment.base = row.new_basic
+
+	assignment.insert()
+	assignment.submit()
+	return assignment
+
+
+def rollback_increment_run(name: str):
+	"""
+	Undo a cancelled Increment Run.
+
+	Cancels the Salary Structure Assignments it created and restores the employees'
+	basic salary and level, in chunks of INCREMENT_CHUNK_SIZE with a commit after each chunk.
+	"""
+	doc = frappe.get_doc("Increment Run", name)
+	rows = [row for row in doc.employees if row.status == "Created"]
+	total = len(rows)
+
+	for chunk_start in range(0, total, INCREMENT_CHUNK_SIZE):
+		row_updates = {}
+		employee_updates = {}
+
+		for row in rows[chunk_start : chunk_start + INCREMENT_CHUNK_SIZE]:
+			frappe.db.savepoint("increment_run_row")
+			try:
+				assignment = frappe.get_doc("Salary Structure Assignment", row.salary_structure_assignment)
+				if assignment.docstatus == 1:
+					assignment.cancel()
+			except Exception as e:
+				frappe.db.rollback(save_point="increment_run_row")
+				frappe.clear_messages()
+				row_updates[row.name] = {"error": str(e)}
+				continue
+
+			row_updates[row.name] = {"status": "Reverted", "error": None}
+			employee_updates[row.employee] = {"custom_basic_salary": row.old_basic}
+			# Rows of runs from before old_level was recorded leave the level as is
+			if row.old_level:
+				employee_updates[row.employee]["custom_level"] = row.old_level
+
+		frappe.db.bulk_update("Increment Run Employee", row_updates, update_modified=False)
+		if employee_updates:
+			frappe.db.bulk_update("Employee", employee_updates)
+		frappe.db.commit()
+
+		publish_increment_run_progress(name, min(chunk_start + INCREMENT_CHUNK_SIZE, total), total)
+
+	finish_increment_run(name, "Created", "Cancelled", "Failed")
+
+
+def finish_increment_run(name, failed_status, success_status, partial_status):
+	"""Set the final status from the number of rows left in `failed_status`."""
+	failed = frappe.db.count(
+		"Increment Run Employee", {"parent": name, "parenttype": "Increment Run", "status": failed_status}
+	)
+	status = partial_status if failed else success_status
+	frappe.db.set_value("Increment Run", name, "status", status)
+	frappe.db.commit()
+
+	frappe.publish_realtime(
+		"increment_run_completed",
+		{"name": name, "status": status, "failed": failed},
+		doctype="Increment Run",
+		docname=name,
+	)
+
+
+def publish_increment_run_progress(name, progress, total):
+	frappe.publish_realtime(
+		"increment_run_progress",
+		{"name": name, "progress": progress, "total": total},
+		doctype="Increment Run",
+		docname=name,
+	)
+
+
+def enqueue_increment_run(name, method):
+	frappe.enqueue(
+		f"gvm_payroll.gvm_payroll.doctype.increment_run.increment_run.{method}",
+		queue="long",
+		timeout=3600,
+		job_id=f"increment_run::{name}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		name=name,
+	)
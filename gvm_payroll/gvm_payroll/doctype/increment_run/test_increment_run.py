@@ -0,0 +1,161 @@
+# Copyright (c) 2026, Samuael Ketema and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from erpnext.setup.doctype.employee.test_employee import make_employee
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_months, getdate, nowdate
+from hrms.payroll.doctype.salary_structure.test_salary_structure import make_salary_structure
+
+from gvm_payroll.gvm_payroll.api.pay_matrix import clear_designation_levels, clear_pay_matrix_index
+from gvm_payroll.gvm_payroll.doctype.increment_run.increment_run import (
+	get_eligible_employees,
+	process_increment_run,
+	rollback_increment_run,
+)
+
+MODULE = "gvm_payroll.gvm_payroll.doctype.increment_run.increment_run"
+COMPANY = "_Test Company"
+DESIGNATION = "_Test Increment Designation"
+PAY_MATRIX = "_Test Increment Matrix : 7th"
+OLD_LEVEL = f"{PAY_MATRIX} - 0"
+LEVEL = f"{PAY_MATRIX} - 1"
+INCREMENT_DATES = ["1st April", "1st October"]
+
+
+@patch(f"{MODULE}.get_increment_date_strings", return_value=INCREMENT_DATES)
+@patch(f"{MODULE}.enqueue_increment_run")
+class TestIncrementRun(FrappeTestCase):
+	def setUp(self):
+		make_pay_matrix()
+		self.increment_date = getdate(f"{getdate(nowdate()).year}-10-01")
+
+	def test_eligible_employee_gets_matrix_basic(self, *_):
+		employee = make_increment_employee("increment_run_eligible@example.com", self.increment_date)
+
+		row = get_employee_row(employee, self.increment_date)
+		self.assertEqual(row["old_level"], OLD_LEVEL)
+		self.assertEqual(row["level"], LEVEL)
+		# Experience year of the increment date not applied yet by the daily job
+		self.assertEqual(row["years_experienced"], 3)
+		self.assertEqual(row["old_basic"], 20000)
+		self.assertEqual(row["new_basic"], 22000)
+
+	def test_submit_creates_assignment_and_cancel_rolls_back(self, *_):
+		employee = make_increment_employee("increment_run_rollback@example.com", self.increment_date)
+		run = make_increment_run(employee, self.increment_date)
+
+		process_increment_run(run.name)
+		run.reload()
+		self.assertEqual(run.status, "Completed")
+
+		assignment = frappe.get_doc(
+			"Salary Structure Assignment", run.employees[0].salary_structure_assignment
+		)
+		self.assertEqual(assignment.docstatus, 1)
+		self.assertEqual(getdate(assignment.from_date), self.increment_date)
+		self.assertEqual(assignment.custom_basic_amount, 22000)
+		self.assertEqual(get_employee_pay(employee), (22000, LEVEL))
+
+		run.cancel()
+		rollback_increment_run(run.name)
+		run.reload()
+		self.assertEqual(run.status, "Cancelled")
+		self.assertEqual(run.employees[0].status, "Reverted")
+		self.assertEqual(frappe.db.get_value("Salary Structure Assignment", assignment.name, "docstatus"), 2)
+		self.assertEqual(get_employee_pay(employee), (20000, OLD_LEVEL))
+
+	def test_retry_failed_rows(self, *_):
+		employee = make_increment_employee("increment_run_retry@example.com", self.increment_date)
+		run = make_increment_run(employee, self.increment_date)
+
+		with patch(f"{MODULE}.create_increment_assignment", side_effect=frappe.ValidationError("Failed")):
+			process_increment_run(run.name)
+		run.reload()
+		self.assertEqual(run.employees[0].status, "Failed")
+		self.assertEqual(get_employee_pay(employee), (20000, OLD_LEVEL))
+
+		run.retry_failed()
+		process_increment_run(run.name)
+		run.reload()
+		self.assertEqual(run.status, "Completed")
+		self.assertEqual(run.employees[0].status, "Created")
+		self.assertEqual(get_employee_pay(employee), (22000, LEVEL))
+
+
+def make_pay_matrix():
+	if not frappe.db.exists("Pay Matrix", PAY_MATRIX):
+		frappe.get_doc({"doctype": "Pay Matrix", "pm": "_Test Increment Matrix", "cpc": "7th"}).insert()
+
+	for level, amounts in (("0", {"1": 18000, "3": 19000}), ("1", {"1": 20000, "3": 22000})):
+		if not frappe.db.exists("Pay Matrix Level", f"{PAY_MATRIX} - {level}"):
+			frappe.get_doc(
+				{
+					"doctype": "Pay Matrix Level",
+					"pay_matrix": PAY_MATRIX,
+					"level": level,
+					"years": [{"year": year, "amount": amount} for year, amount in amounts.items()],
+				}
+			).insert()
+
+	if not frappe.db.exists("Designation", DESIGNATION):
+		frappe.get_doc(
+			{
+				"doctype": "Designation",
+				"designation_name": DESIGNATION,
+				"custom_matrix_levels": [{"pay_matrix": PAY_MATRIX, "level": LEVEL}],
+			}
+		).insert()
+
+	clear_pay_matrix_index()
+	clear_designation_levels()
+
+
+def make_increment_employee(user, increment_date):
+	# Processing commits, so every run of the tests needs employees not incremented yet
+	user = user.replace("@", f"_{frappe.generate_hash(length=6)}@")
+	employee = make_employee(user, company=COMPANY, designation=DESIGNATION)
+	frappe.db.set_value(
+		"Employee",
+		employee,
+		{
+			"custom_pay_matrix": PAY_MATRIX,
+			"custom_level": OLD_LEVEL,
+			"custom_years_experienced": 2,
+			"custom_basic_salary": 20000,
+			"custom_next_increment_date": increment_date,
+		},
+	)
+	make_salary_structure(
+		"_Test Increment Run Structure",
+		"Monthly",
+		employee=employee,
+		company=COMPANY,
+		from_date=add_months(increment_date, -6),
+	)
+	return employee
+
+
+def make_increment_run(employee, increment_date):
+	run = frappe.get_doc(
+		{
+			"doctype": "Increment Run",
+			"company": COMPANY,
+			"increment_date": increment_date,
+			"employees": [get_employee_row(employee, increment_date)],
+		}
+	)
+	run.insert()
+	run.submit()
+	return run
+
+
+def get_employee_row(employee, increment_date):
+	return next(row for row in get_eligible_employees(COMPANY, increment_date) if row["employee"] == employee)
+
+
+def get_employee_pay(employee):
+	basic, level = frappe.db.get_value("Employee", employee, ["custom_basic_salary", "custom_level"])
+	return basic, level
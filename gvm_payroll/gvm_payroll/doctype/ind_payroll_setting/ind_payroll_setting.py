@@ -3,83 +3,182 @@
 
 import frappe
 from frappe.model.document import Document
+from frappe.utils import add_years, getdate, nowdate
+
+# Increment dates used when no IND Payroll Setting defines any
+DEFAULT_INCREMENT_DATES = ["1st April", "1st October"]
+
+INCREMENT_DATE_RULES_KEY = "gvm_payroll:increment_date_rules"
 
 
 class INDPayrollSetting(Document):
-	pass
+	def on_update(self):
+		clear_increment_date_rules()
+
+	def on_trash(self):
+		clear_increment_date_rules()
+
+	def after_rename(self, old, new, merge=False):
+		clear_increment_date_rules()
+
+
+@frappe.whitelist()
+def get_increment_date_strings(company=None):
+	"""
+	Increment date strings (e.g. "1st April") that apply to a company.
+
+	Uses the company's IND Payroll Setting, falling back to the most recently modified
+	setting when the company has none (or it has no dates). Served from the cached
+	rules, so it makes no queries once warm.
+
+	Returns:
+		list: Unique increment date strings in table order, empty if none are configured
+	"""
+	rules = get_increment_date_rules()
+	dates = rules.get(company) if company else None
+	if not dates and rules:
+		dates = next(iter(rules.values()))
+
+	return list(dict.fromkeys(dates or []))
+
+
+def get_increment_date_from_string(date_str, year):
+	"""Convert an increment date option (e.g. "1st April") to the date in `year`."""
+	if date_str == "1st April":
+		return getdate(f"{year}-04-01")
+	elif date_str == "1st October":
+		return getdate(f"{year}-10-01")
+	return None
+
+
+def get_initial_increment_date(date_of_joining, company=None, today=None):
+	"""
+	Increment date of a new employee: the first of the company's increment dates, from
+	the current year (`today`, default today) on, falling on or after the completion of
+	one year of service.
+
+	Returns:
+		datetime.date | None
+	"""
+	increment_date_strings = get_increment_date_strings(company) or DEFAULT_INCREMENT_DATES
+	one_year_date = add_years(getdate(date_of_joining), 1)
+	current_year = getdate(today or nowdate()).year
+
+	for year in range(current_year, current_year + 3):
+		dates = sorted(filter(None, (get_increment_date_from_string(d, year) for d in increment_date_strings)))
+		for date in dates:
+			if date >= one_year_date:
+				return date
+
+	# Joining too far ahead: first increment date of the year after one year of service
+	return get_increment_date_from_string(increment_date_strings[0], one_year_date.year + 1)
+
+
+def get_next_increment_date(date_of_joining, company=None, increment_date=None, start=None):
+	"""
+	Next increment date of an employee, on or after `start` (default today).
+
+	Increments are yearly on the day and month of the employee's increment date
+	(custom_date_of_increment). Without one, the first increment date of the company on
+	or after the completion of one year of service is used.
+
+	Args:
+		date_of_joining: Employee's date of joining
+		company (str, optional): Employee's company, for its IND Payroll Setting
+		increment_date (optional): Employee's increment date
+		start (optional): Earliest date to return
+
+	Returns:
+		datetime.date | None
+	"""
+	if not date_of_joining:
+		return None
+
+	earliest = max(add_years(getdate(date_of_joining), 1), getdate(start or nowdate()))
+
+	if increment_date:
+		increment_date = getdate(increment_date)
+		candidates = [get_anniversary(increment_date, year) for year in (earliest.year, earliest.year + 1)]
+	else:
+		increment_date_strings = get_increment_date_strings(company) or DEFAULT_INCREMENT_DATES
+		candidates = [
+			get_increment_date_from_string(d, year)
+			for year in (earliest.year, earliest.year + 1)
+			for d in increment_date_strings
+		]
+
+	candidates = sorted(d for d in candidates if d and d >= earliest)
+	return candidates[0] if candidates else None
+
+
+def get_anniversary(date, year):
+	"""`date` in `year`; 29 February falls on the 28th in other years."""
+	try:
+		return date.replace(year=year)
+	except ValueError:
+		return date.replace(year=year, day=28)
+
+
+def get_increment_date_rules():
+	"""
+	Increment dates of every IND Payroll Setting, cached until a setting is saved.
+
+	Returns:
+		dict: company -> increment date strings in table order (empty list if the
+		setting has no dates), most recently modified setting first
+	"""
+	return frappe.cache().get_value(INCREMENT_DATE_RULES_KEY, generator=build_increment_date_rules)
+
+
+def build_increment_date_rules():
+	setting = frappe.qb.DocType("IND Payroll Setting")
+	item = frappe.qb.DocType("IND Payroll Setting Increment Date")
+
+	rows = (
+		frappe.qb.from_(setting)
+		.left_join(item)
+		.on((item.parent == setting.name) & (item.parenttype == "IND Payroll Setting"))
+		.select(setting.company, item.increment_date)
+		.orderby(setting.modified, order=frappe.qb.desc)
+		.orderby(item.idx)
+		.run(as_dict=True)
+	)
+
+	rules = {}
+	for row in rows:
+		dates = rules.setdefault(row.company, [])
+		if row.increment_date:
+			dates.append(row.increment_date)
+
+	return rules
+
+
+def clear_increment_date_rules():
+	frappe.cache().delete_value(INCREMENT_DATE_RULES_KEY)
 
 
 @frappe.whitelist()
 def get_increment_dates(doctype, txt, searchfield, start, page_len, filters):
 	"""Get increment dates for date field filter"""
-	increment_dates = []
 	company = filters.get("company") if filters else None
-	
-	# Get increment dates from IND Payroll Setting
-	if company:
-		setting = frappe.db.get_value("IND Payroll Setting", {"company": company}, "name")
-		if setting:
-			setting_doc = frappe.get_doc("IND Payroll Setting", setting)
-			for inc_date in setting_doc.increment_dates:
-				if inc_date.increment_date:
-					increment_dates.append([inc_date.increment_date])
-	
-	# If no company-specific dates, get from any setting
-	if not increment_dates:
-		payroll_settings = frappe.get_all("IND Payroll Setting", fields=["name"], limit=1)
-		if payroll_settings:
-			setting_doc = frappe.get_doc("IND Payroll Setting", payroll_settings[0].name)
-			for inc_date in setting_doc.increment_dates:
-				if inc_date.increment_date:
-					increment_dates.append([inc_date.increment_date])
-	
-	# If still no dates, return empty (will allow any date)
-	return increment_dates
+
+	# If no dates are configured, return empty (will allow any date)
+	return [[date_str] for date_str in get_increment_date_strings(company)]
 
 
 @frappe.whitelist()
 def get_increment_dates_list(company=None):
 	"""Get list of increment dates as actual date strings for current year"""
-	from frappe.utils import getdate, nowdate
-	
-	def get_increment_date_from_string(date_str, year):
-		if date_str == "1st April":
-			return getdate(f"{year}-04-01")
-		elif date_str == "1st October":
-			return getdate(f"{year}-10-01")
-		return None
-	
-	increment_date_strings = []
 	current_year = getdate(nowdate()).year
-	
-	# Get increment date strings from IND Payroll Setting
-	if company:
-		setting = frappe.db.get_value("IND Payroll Setting", {"company": company}, "name")
-		if setting:
-			setting_doc = frappe.get_doc("IND Payroll Setting", setting)
-			for inc_date in setting_doc.increment_dates:
-				if inc_date.increment_date and inc_date.increment_date not in increment_date_strings:
-					increment_date_strings.append(inc_date.increment_date)
-	
-	# If no company-specific dates, get from any setting
-	if not increment_date_strings:
-		payroll_settings = frappe.get_all("IND Payroll Setting", fields=["name"], limit=1)
-		if payroll_settings:
-			setting_doc = frappe.get_doc("IND Payroll Setting", payroll_settings[0].name)
-			for inc_date in setting_doc.increment_dates:
-				if inc_date.increment_date and inc_date.increment_date not in increment_date_strings:
-					increment_date_strings.append(inc_date.increment_date)
-	
-	# If still no dates, use defaults
-	if not increment_date_strings:
-		increment_date_strings = ["1st April", "1st October"]
-	
+
+	# If no dates are configured, use defaults
+	increment_date_strings = get_increment_date_strings(company) or DEFAULT_INCREMENT_DATES
+
 	# Convert to actual dates for current year
 	increment_dates = []
 	for date_str in increment_date_strings:
 		date_obj = get_increment_date_from_string(date_str, current_year)
 		if date_obj:
 			increment_dates.append(str(date_obj))
-	
-	return increment_dates
 
+	return increment_dates
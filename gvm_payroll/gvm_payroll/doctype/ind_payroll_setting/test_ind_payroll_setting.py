@@ -3,7 +3,24 @@
 
 # import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from gvm_payroll.gvm_payroll.doctype.ind_payroll_setting.ind_payroll_setting import get_next_increment_date
 
 
 class TestINDPayrollSetting(FrappeTestCase):
-	pass
+	def test_next_increment_date_on_employee_increment_day(self):
+		self.assertEqual(
+			get_next_increment_date("2020-01-01", increment_date="2024-10-01", start="2026-10-19"),
+			getdate("2027-10-01"),
+		)
+
+	def test_29_february_falls_on_28th_in_other_years(self):
+		self.assertEqual(
+			get_next_increment_date("2020-01-01", increment_date="2024-02-29", start="2025-01-01"),
+			getdate("2025-02-28"),
+		)
+		self.assertEqual(
+			get_next_increment_date("2020-01-01", increment_date="2024-02-29", start="2027-03-01"),
+			getdate("2028-02-29"),
+		)
@@ -0,0 +1,202 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from erpnext.accounts.utils import FiscalYearError, get_fiscal_year
+from frappe.model.document import Document
+from frappe.utils import flt, getdate, now
+
+from gvm_payroll.gvm_payroll.api.salary_archive import get_archive_table
+
+YTD_COLUMNS = (
+	"name",
+	"employee",
+	"fiscal_year",
+	"company",
+	"month",
+	"salary_component",
+	"amount",
+	"salary_slips",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+)
+
+# Adds to the month's total when the (employee, fiscal year, component, month) row exists
+ON_DUPLICATE_KEY = """on duplicate key update
+	amount = amount + values(amount),
+	salary_slips = salary_slips + values(salary_slips),
+	modified = values(modified)"""
+
+
+class InternalSalaryYTD(Document):
+	pass
+
+
+def get_ytd_key(employee, fiscal_year, salary_component, month):
+	"""
+	Name of the Internal Salary YTD row of an (employee, fiscal year, component, month).
+
+	Returns:
+		str: sha256 hex digest of the four values (built the same way in SQL by build_year_to_date)
+	"""
+	raw = "\x1f".join((employee, fiscal_year, salary_component, month))
+	return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def get_ytd_month(date):
+	"""YYYYMM of a Salary Slip's end date, the month its amounts are kept under."""
+	date = getdate(date)
+	return f"{date.year}{date.month:02d}"
+
+
+def get_slip_fiscal_year(doc):
+	try:
+		return get_fiscal_year(doc.end_date, company=doc.company)[0]
+	except FiscalYearError:
+		return None
+
+
+def get_year_to_date(employee, fiscal_year, salary_components, end_date):
+	"""
+	Submitted totals of `salary_components` for an employee and fiscal year, up to and
+	including the month of `end_date`; slips of later months are left out.
+
+	Returns:
+		dict: salary component -> amount
+	"""
+	if not salary_components:
+		return {}
+
+	rows = frappe.get_all(
+		"Internal Salary YTD",
+		filters={
+			"employee": employee,
+			"fiscal_year": fiscal_year,
+			"salary_component": ["in", list(salary_components)],
+			"month": ["<=", get_ytd_month(end_date)],
+		},
+		fields=["salary_component", "sum(amount) as amount"],
+		group_by="salary_component",
+	)
+	return {row.salary_component: flt(row.amount) for row in rows}
+
+
+def update_year_to_date(doc, sign=1):
+	"""
+	Add (sign=1, on submit) or subtract (sign=-1, on cancel) the internal components of
+	a Salary Slip to the totals of its month, with one upsert for all its components.
+	"""
+	fiscal_year = get_slip_fiscal_year(doc)
+	if not fiscal_year or not doc.get("custom_internal_salary_details"):
+		return
+
+	amounts = {}
+	for row in doc.custom_internal_salary_details:
+		amounts[row.salary_component] = amounts.get(row.salary_component, 0.0) + flt(row.amount)
+
+	month = get_ytd_month(doc.end_date)
+	timestamp, user = now(), frappe.session.user
+	values = []
+	for component, amount in amounts.items():
+		values += [
+			get_ytd_key(doc.employee, fiscal_year, component, month),
+			doc.employee,
+			fiscal_year,
+			doc.company,
+			month,
+			component,
+			sign * amount,
+			sign,
+			timestamp,
+			timestamp,
+			user,
+			user,
+		]
+
+	placeholders = ", ".join(["(" + ", ".join(["%s"] * len(YTD_COLUMNS)) + ")"] * len(amounts))
+	frappe.db.sql(
+		f"""insert into `tabInternal Salary YTD` ({", ".join(YTD_COLUMNS)})
+		values {placeholders}
+		{ON_DUPLICATE_KEY}""",
+		values,
+	)
+
+
+@frappe.whitelist()
+def rebuild_year_to_date(fiscal_year: str, company=None):
+	"""Recompute the Internal Salary YTD rows of a fiscal year (and company) from the Salary Slips."""
+	frappe.only_for("System Manager")
+	return build_year_to_date(fiscal_year, company)
+
+
+def build_year_to_date(fiscal_year, company=None):
+	"""
+	Replace the Internal Salary YTD rows of a fiscal year with the monthly totals of its
+	submitted Salary Slips, with one grouped query per detail table (live and, if
+	present, archive).
+
+	A row holds all of an employee's slips of the year, whatever their company, so
+	with `company` the rows of the employees with a slip (or a row) in that company
+	are rebuilt from all their slips.
+	"""
+	year_start_date, year_end_date = frappe.db.get_value(
+		"Fiscal Year", fiscal_year, ["year_start_date", "year_end_date"]
+	)
+	filters = {"fiscal_year": fiscal_year}
+	employees = None
+	if company:
+		employees = set(
+			frappe.get_all(
+				"Salary Slip",
+				filters={
+					"docstatus": 1,
+					"company": company,
+					"end_date": ["between", [year_start_date, year_end_date]],
+				},
+				pluck="employee",
+			)
+		)
+		employees.update(
+			frappe.get_all("Internal Salary YTD", filters=dict(filters, company=company), pluck="employee")
+		)
+		if not employees:
+			return 0
+		filters["employee"] = ["in", list(employees)]
+	frappe.db.delete("Internal Salary YTD", filters)
+
+	tables = ["tabInternal Salary Details"]
+	if frappe.db.table_exists("Internal Salary Details Archive"):
+		tables.append(get_archive_table("Internal Salary Details"))
+
+	for table in tables:
+		frappe.db.sql(
+			f"""insert into `tabInternal Salary YTD` ({", ".join(YTD_COLUMNS)})
+			select
+				sha2(concat_ws(char(31), ss.employee, %(fiscal_year)s, isd.salary_component,
+					date_format(ss.end_date, '%%Y%%m')), 256),
+				ss.employee, %(fiscal_year)s, max(ss.company), date_format(ss.end_date, '%%Y%%m'),
+				isd.salary_component, sum(isd.amount), count(distinct ss.name),
+				%(now)s, %(now)s, %(user)s, %(user)s
+			from `{table}` isd
+			join `tabSalary Slip` ss on ss.name = isd.parent
+			where isd.parenttype = 'Salary Slip'
+				and ss.docstatus = 1
+				and ss.end_date between %(year_start_date)s and %(year_end_date)s
+				{"and ss.employee in %(employees)s" if employees else ""}
+			group by ss.employee, isd.salary_component, date_format(ss.end_date, '%%Y%%m')
+			{ON_DUPLICATE_KEY}""",
+			{
+				"fiscal_year": fiscal_year,
+				"employees": tuple(employees or ()),
+				"year_start_date": year_start_date,
+				"year_end_date": year_end_date,
+				"now": now(),
+				"user": frappe.session.user,
+			},
+		)
+
+	return frappe.db.count("Internal Salary YTD", filters)
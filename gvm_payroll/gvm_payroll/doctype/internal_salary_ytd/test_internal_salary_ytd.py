@@ -0,0 +1,73 @@
+# Copyright (c) 2026, Samuael Ketema and Contributors
+# See license.txt
+
+import frappe
+from erpnext.accounts.utils import get_fiscal_year
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_months, get_last_day, nowdate
+
+from gvm_payroll.gvm_payroll.doctype.internal_salary_ytd.internal_salary_ytd import (
+	get_slip_fiscal_year,
+	get_year_to_date,
+	update_year_to_date,
+)
+from gvm_payroll.gvm_payroll.overrides.salary_slip import set_internal_year_to_date
+
+EMPLOYEE = "_T-Employee-YTD"
+
+
+def make_slip(end_date=None, **amounts):
+	return frappe._dict(
+		employee=EMPLOYEE,
+		company="_Test Company",
+		end_date=end_date or nowdate(),
+		custom_internal_salary_details=[
+			frappe._dict(salary_component=component.replace("_", " "), amount=amount)
+			for component, amount in amounts.items()
+		],
+	)
+
+
+class TestInternalSalaryYTD(FrappeTestCase):
+	def setUp(self):
+		frappe.db.delete("Internal Salary YTD", {"employee": EMPLOYEE})
+
+	def test_submit_and_cancel_update_running_total(self):
+		first = make_slip(PF_Employer=1000, Pension=500)
+		update_year_to_date(first)
+		update_year_to_date(make_slip(PF_Employer=1200))
+
+		fiscal_year = get_slip_fiscal_year(first)
+		self.assertEqual(
+			get_year_to_date(EMPLOYEE, fiscal_year, {"PF Employer", "Pension"}, nowdate()),
+			{"PF Employer": 2200, "Pension": 500},
+		)
+
+		update_year_to_date(first, sign=-1)
+		self.assertEqual(
+			get_year_to_date(EMPLOYEE, fiscal_year, {"PF Employer", "Pension"}, nowdate()),
+			{"PF Employer": 1200, "Pension": 0},
+		)
+
+	def test_year_to_date_includes_current_slip(self):
+		update_year_to_date(make_slip(PF_Employer=1000))
+
+		slip = make_slip(PF_Employer=1100, Pension=300)
+		set_internal_year_to_date(slip)
+		self.assertEqual([row.year_to_date for row in slip.custom_internal_salary_details], [2100, 300])
+
+	def test_slip_of_earlier_month_ignores_later_months(self):
+		year_start_date = get_fiscal_year(nowdate(), company="_Test Company")[1]
+		first, arrears_month, later_month = (get_last_day(add_months(year_start_date, i)) for i in range(3))
+
+		update_year_to_date(make_slip(first, PF_Employer=900))
+		# The later month is submitted before the arrears slip of the earlier month
+		update_year_to_date(make_slip(later_month, PF_Employer=1000))
+
+		arrears = make_slip(arrears_month, PF_Employer=400)
+		set_internal_year_to_date(arrears)
+		self.assertEqual(arrears.custom_internal_salary_details[0].year_to_date, 1300)
+
+		later = make_slip(later_month, PF_Employer=1000)
+		set_internal_year_to_date(later)
+		self.assertEqual(later.custom_internal_salary_details[0].year_to_date, 1900)
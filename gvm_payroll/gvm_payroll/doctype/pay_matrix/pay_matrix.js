@@ -2,8 +2,31 @@
 // For license information, please see license.txt
 
 frappe.ui.form.on("Pay Matrix", {
+	onload(frm) {
+		frappe.realtime.off("pay_matrix_reprice_completed");
+		frappe.realtime.on("pay_matrix_reprice_completed", (data) => {
+			if (data.pay_matrix !== frm.doc.name) return;
+			let message = __("Updated {0} employees, {1} already up to date, {2} without a level in this matrix.", [
+				data.updated,
+				data.unchanged,
+				data.unresolved,
+			]);
+			if (data.report) {
+				message += `<br><a href="${data.report}" target="_blank">${__("Download change report")}</a>`;
+			}
+			frappe.msgprint({ title: __("Re-price Employees"), message: message, indicator: "green" });
+			frm.reload_doc();
+		});
+	},
 	refresh(frm) {
 		render_matrix(frm);
+
+		if (!frm.is_new()) {
+			frm.add_custom_button(__("Re-price Employees"), () => reprice_employees(frm));
+			frm.add_custom_button(__("Export CSV"), () => export_matrix_grid(frm), __("Grid"));
+			frm.add_custom_button(__("Import CSV"), () => import_matrix_grid(frm), __("Grid"));
+			frm.add_custom_button(__("Save Version"), () => create_snapshot(frm), __("Grid"));
+		}
 	},
 	pay_matrix_levels(frm) {
 		render_matrix(frm);
@@ -16,59 +39,27 @@ frappe.ui.form.on("Pay Matrix", {
 async function render_matrix(frm) {
 	if (!frm.doc.name) return;
 
-	// Fetch all Pay Matrix Levels for this Pay Matrix
-	const level_list = await frappe.db.get_list("Pay Matrix Level", {
-		filters: { pay_matrix: frm.doc.name },
-		fields: ["name"],
-		order_by: "level asc",
+	// Whole grid (levels sorted by level, year axis and amounts) in one call
+	const { message: grid } = await frappe.call({
+		method: "gvm_payroll.gvm_payroll.doctype.pay_matrix.pay_matrix.get_matrix_grid",
+		args: { pay_matrix: frm.doc.name },
 	});
 
-	if (!level_list.length) {
+	if (!grid || !grid.levels.length) {
 		$(frm.fields_dict.matrix_html.wrapper).html("<p>No data found.</p>");
 		return;
 	}
 
-	// Fetch full doc for each level to get the child table
-	const levels = [];
-	for (const lvl of level_list) {
-		const full_doc = await frappe.db.get_doc("Pay Matrix Level", lvl.name);
-		levels.push(full_doc);
-	}
-
-	// Sort levels numerically
-	// Sort levels with numeric part first, then alpha suffix (e.g., 1 < 1A < 2)
-	const parseLevel = (val) => {
-		const m = String(val || "").match(/^(\d+)([A-Za-z]*)$/);
-		return {
-			num: m ? parseInt(m[1], 10) : Number.MAX_SAFE_INTEGER,
-			suffix: m ? m[2] || "" : "",
-		};
-	};
-	levels.sort((a, b) => {
-		const pa = parseLevel(a.level);
-		const pb = parseLevel(b.level);
-		if (pa.num !== pb.num) return pa.num - pb.num;
-		return pa.suffix.localeCompare(pb.suffix);
-	});
-
-	// Prepare matrix data
-	let all_years = new Set();
-	const matrix_data = {};
-
-	levels.forEach((lvl) => {
-		matrix_data[lvl.level] = {};
-		if (lvl.years && lvl.years.length) {
-			lvl.years.forEach((y) => {
-				matrix_data[lvl.level][y.year] = y.amount;
-				all_years.add(y.year);
-			});
-		}
-	});
-
-	all_years = Array.from(all_years).sort((a, b) => a - b);
+	const levels = grid.levels;
+	const all_years = grid.years;
+	const matrix_data = grid.amounts;
 
 	// Build HTML table with styling
 	let html = `
+	<div class="pm-toolbar">
+		<button class="btn btn-xs btn-default pm-edit-grid">${__("Edit Grid")}</button>
+		<button class="btn btn-xs btn-primary pm-save-grid hidden">${__("Save Changes")}</button>
+	</div>
 	<div class="pm-table-wrapper">
 	<table class="pay-matrix-grid">
 		<thead>
@@ -91,11 +82,11 @@ async function render_matrix(frm) {
 		html += `<tr>
 					<td class="pm-header pm-row">${year}</td>`;
 		levels.forEach((lvl) => {
-			let amount = matrix_data[lvl.level][year] || "";
+			let amount = matrix_data[lvl.name][year] || "";
 			if (amount !== "") {
 				amount = Number(amount).toLocaleString(); // add comma
 			}
-			html += `<td class="pm-cell">${amount}</td>`;
+			html += `<td class="pm-cell" data-level-name="${lvl.name}" data-year="${year}">${amount}</td>`;
 		});
 		html += `</tr>`;
 	});
@@ -103,6 +94,23 @@ async function render_matrix(frm) {
 	html += `</tbody></table>
 	</div>
 	<style>
+		.pm-toolbar {
+			margin-bottom: 8px;
+			text-align: right;
+		}
+		.pay-matrix-grid .pm-cell input {
+			width: 100%;
+			min-width: 60px;
+			font-size: 0.68rem;
+			text-align: right;
+			border: 1px solid #d1d8dd;
+			border-radius: 4px;
+			padding: 2px 4px;
+		}
+		.pay-matrix-grid .pm-cell.pm-dirty input {
+			background: #fff5e6;
+			border-color: #f0ad4e;
+		}
 		.pm-table-wrapper {
 			width: 100%;
 			overflow-x: auto;
@@ -158,6 +166,215 @@ async function render_matrix(frm) {
 	const wrapper = $(frm.fields_dict.matrix_html.wrapper);
 	wrapper.html(html);
 	bind_level_clicks(frm, levels);
+	bind_grid_edit(frm, grid);
+}
+
+function bind_grid_edit(frm, grid) {
+	const wrapper = $(frm.fields_dict.matrix_html.wrapper);
+
+	wrapper.find(".pm-edit-grid").on("click", function (e) {
+		e.preventDefault();
+		wrapper.find("td.pm-cell[data-level-name]").each(function () {
+			const $cell = $(this);
+			const amount = grid.amounts[$cell.data("level-name")][$cell.attr("data-year")];
+			$cell.html(`<input type="number" step="0.01" value="${amount ?? ""}">`);
+		});
+		$(this).addClass("hidden");
+		wrapper.find(".pm-save-grid").removeClass("hidden");
+	});
+
+	wrapper.off("change", "td.pm-cell input");
+	wrapper.on("change", "td.pm-cell input", function () {
+		const $cell = $(this).closest("td");
+		const original = grid.amounts[$cell.data("level-name")][$cell.attr("data-year")];
+		const value = $(this).val();
+		const dirty = value === "" ? original !== undefined : Number(value) !== original;
+		$cell.toggleClass("pm-dirty", dirty);
+	});
+
+	wrapper.find(".pm-save-grid").on("click", async function (e) {
+		e.preventDefault();
+
+		// Only the changed cells are sent; an emptied cell deletes the year
+		const edits = {};
+		wrapper.find("td.pm-cell.pm-dirty").each(function () {
+			const $cell = $(this);
+			const level_name = $cell.data("level-name");
+			const value = $cell.find("input").val();
+			edits[level_name] = edits[level_name] || { years: {} };
+			edits[level_name].years[$cell.attr("data-year")] = value === "" ? null : Number(value);
+		});
+
+		if (!Object.keys(edits).length) {
+			render_matrix(frm);
+			return;
+		}
+
+		await save_pay_matrix_edits(frm, edits);
+	});
+}
+
+async function save_pay_matrix_edits(frm, edits) {
+	try {
+		const { message } = await frappe.call({
+			method: "gvm_payroll.gvm_payroll.doctype.pay_matrix.pay_matrix.apply_pay_matrix_edits",
+			args: {
+				pay_matrix: frm.doc.name,
+				edits: edits,
+			},
+			freeze: true,
+			freeze_message: __("Saving Pay Matrix..."),
+		});
+		frappe.show_alert({
+			message: __("{0} added, {1} updated, {2} removed", [message.inserted, message.updated, message.deleted]),
+			indicator: "green",
+		});
+		render_matrix(frm);
+		return message;
+	} catch (e) {
+		console.error(e);
+		frappe.msgprint({
+			title: __("Error"),
+			message: e.message || __("Could not update Pay Matrix"),
+			indicator: "red",
+		});
+	}
+}
+
+function create_snapshot(frm) {
+	frappe.prompt(
+		{
+			fieldname: "effective_date",
+			fieldtype: "Date",
+			label: __("Effective From"),
+			default: frappe.datetime.get_today(),
+			reqd: 1,
+		},
+		async (values) => {
+			await frappe.call({
+				method: "gvm_payroll.gvm_payroll.doctype.pay_matrix_snapshot.pay_matrix_snapshot.create_snapshot",
+				args: {
+					pay_matrix: frm.doc.name,
+					effective_date: values.effective_date,
+				},
+			});
+			frappe.show_alert({ message: __("Pay Matrix version saved"), indicator: "green" });
+		},
+		__("Save Pay Matrix Version"),
+		__("Save")
+	);
+}
+
+function export_matrix_grid(frm) {
+	open_url_post("/api/method/gvm_payroll.gvm_payroll.doctype.pay_matrix.pay_matrix.export_matrix_grid", {
+		pay_matrix: frm.doc.name,
+	});
+}
+
+function import_matrix_grid(frm) {
+	const d = new frappe.ui.Dialog({
+		title: __("Import Pay Matrix Grid"),
+		fields: [
+			{
+				fieldname: "file_url",
+				fieldtype: "Attach",
+				label: __("CSV File"),
+				reqd: 1,
+			},
+			{
+				fieldname: "help",
+				fieldtype: "HTML",
+				options: `<p class="text-muted small">${__(
+					"Use the layout of Export CSV: a Level row (one level per column), optional Pay Band and Grade rows, then one row per year. Levels in the file are created or replaced; other levels are not changed."
+				)}</p>`,
+			},
+		],
+		primary_action_label: __("Import"),
+		primary_action: async (values) => {
+			const { message } = await frappe.call({
+				method: "gvm_payroll.gvm_payroll.doctype.pay_matrix.pay_matrix.import_matrix_grid",
+				args: {
+					pay_matrix: frm.doc.name,
+					file_url: values.file_url,
+				},
+				freeze: true,
+				freeze_message: __("Importing Pay Matrix..."),
+			});
+			d.hide();
+			frappe.msgprint(
+				__("{0} levels created. {1} amounts added, {2} updated, {3} removed.", [
+					message.created.length,
+					message.inserted,
+					message.updated,
+					message.deleted,
+				])
+			);
+			render_matrix(frm);
+		},
+	});
+	d.show();
+}
+
+async function reprice_employees(frm) {
+	// Dry run first: show what would change before writing anything
+	const { message: result } = await frappe.call({
+		method: "gvm_payroll.gvm_payroll.api.pay_matrix.reprice_employees",
+		args: { pay_matrix: frm.doc.name, dry_run: 1 },
+		freeze: true,
+		freeze_message: __("Computing changes..."),
+	});
+
+	const changes = result.changes || [];
+	const shown = changes.slice(0, 200);
+	const fmt = (v) => (v === null || v === undefined ? "" : Number(v).toLocaleString());
+
+	let html = `<p>${__("{0} employees will change, {1} are up to date, {2} have no level in this matrix.", [
+		changes.length,
+		result.unchanged,
+		(result.unresolved || []).length,
+	])}</p>`;
+
+	if (shown.length) {
+		html += `<div class="pm-table-wrapper"><table class="table table-bordered table-sm small">
+			<thead><tr>
+				<th>${__("Employee")}</th>
+				<th>${__("Level")}</th>
+				<th>${__("Basic Salary")}</th>
+			</tr></thead><tbody>`;
+		shown.forEach((d) => {
+			const level =
+				d.old_level === d.new_level ? d.new_level : `${d.old_level || "-"} &rarr; ${d.new_level}`;
+			html += `<tr>
+				<td>${d.employee}: ${d.employee_name || ""}</td>
+				<td>${level}</td>
+				<td>${fmt(d.old_basic_salary)} &rarr; ${fmt(d.new_basic_salary)}</td>
+			</tr>`;
+		});
+		html += `</tbody></table></div>`;
+		if (changes.length > shown.length) {
+			html += `<p class="text-muted">${__("Showing first {0} changes.", [shown.length])}</p>`;
+		}
+	}
+
+	const d = new frappe.ui.Dialog({
+		title: __("Re-price Employees"),
+		size: "large",
+		fields: [{ fieldname: "diff_html", fieldtype: "HTML", options: html }],
+		primary_action_label: __("Apply"),
+		primary_action: async () => {
+			await frappe.call({
+				method: "gvm_payroll.gvm_payroll.api.pay_matrix.reprice_employees",
+				args: { pay_matrix: frm.doc.name, dry_run: 0 },
+			});
+			d.hide();
+			frappe.show_alert({ message: __("Re-pricing queued"), indicator: "blue" });
+		},
+	});
+
+	if (!changes.length) {
+		d.get_primary_btn().prop("disabled", true);
+	}
+	d.show();
 }
 
 function create_pay_matrix_level(frm) {
@@ -419,26 +636,36 @@ function edit_pay_matrix_level(frm, level_doc) {
 					return;
 				}
 
-				// Call Python method to update
-				const result = await frappe.call({
-					method: "gvm_payroll.gvm_payroll.doctype.pay_matrix.pay_matrix.update_pay_matrix_level",
-					args: {
-						level_name: level_doc.name,
-						level: values.level,
-						pay_band: values.pay_band || "",
-						grade: values.grade || "",
-						years_data: years,
-					},
-					freeze: true,
-					freeze_message: __("Updating Level..."),
+				// Send only what changed: new/edited years, removed years (null) and header fields
+				const original = {};
+				(level_doc.years || []).forEach((row) => {
+					original[String(row.year).trim()] = row.amount;
 				});
-				
-				if (result && result.message && result.message.success) {
+				const edited = {};
+				years.forEach((row) => {
+					edited[String(row.year).trim()] = row.amount;
+				});
+
+				const edit = { years: {} };
+				Object.keys(edited).forEach((year) => {
+					if (original[year] === undefined || Number(original[year]) !== edited[year]) {
+						edit.years[year] = edited[year];
+					}
+				});
+				Object.keys(original).forEach((year) => {
+					if (!(year in edited)) {
+						edit.years[year] = null;
+					}
+				});
+				["level", "pay_band", "grade"].forEach((field) => {
+					if ((values[field] || "") !== (level_doc[field] || "")) {
+						edit[field] = values[field] || "";
+					}
+				});
+
+				const result = await save_pay_matrix_edits(frm, { [level_doc.name]: edit });
+				if (result) {
 					d.hide();
-					frappe.msgprint(__("Pay Matrix Level updated"));
-					render_matrix(frm);
-				} else {
-					throw new Error(result?.message?.message || __("Could not update Pay Matrix Level"));
 				}
 			} catch (e) {
 				console.error(e);
@@ -1,47 +1,442 @@
 # Copyright (c) 2025, Samuael Ketema and contributors
 # For license information, please see license.txt
 
+import json
+import re
+
 import frappe
 from frappe.model.document import Document
+from frappe.utils import flt, now_datetime
+from frappe.utils.csvutils import build_csv_response, read_csv_content
+
+from gvm_payroll.gvm_payroll.api.pay_matrix import clear_designation_levels, clear_pay_matrix_index
+from gvm_payroll.gvm_payroll.doctype.pay_matrix_snapshot.pay_matrix_snapshot import take_snapshot
 
 
 class PayMatrix(Document):
-	pass
+	def on_trash(self):
+		clear_matrix_grid_cache(self.name)
+
+	def after_rename(self, old, new, merge=False):
+		clear_designation_levels()
+		clear_pay_matrix_index()
+		clear_matrix_grid_cache(old)
+		clear_matrix_grid_cache(new)
+
+
+@frappe.whitelist()
+def get_matrix_grid(pay_matrix: str):
+	"""
+	Return the whole grid of a Pay Matrix for rendering.
+
+	The grid is built from one query joining Pay Matrix Level with its Matrix Level Items
+	and cached per Pay Matrix until one of its levels is saved or deleted.
+
+	Returns:
+		dict: {
+			"levels": [{"name", "level", "pay_band", "grade"}, ...] sorted by level
+				(numeric part first, then suffix: 1 < 1A < 2),
+			"years": year values sorted ascending,
+			"amounts": {level name: {year: amount}},
+		}
+	"""
+	frappe.has_permission("Pay Matrix", "read", pay_matrix, throw=True)
+
+	key = get_matrix_grid_cache_key(pay_matrix)
+	grid = frappe.cache().get_value(key)
+	if grid is None:
+		grid = build_matrix_grid(pay_matrix)
+		frappe.cache().set_value(key, grid)
+
+	return grid
+
+
+def build_matrix_grid(pay_matrix):
+	level = frappe.qb.DocType("Pay Matrix Level")
+	item = frappe.qb.DocType("Matrix Level Items")
+
+	rows = (
+		frappe.qb.from_(level)
+		.left_join(item)
+		.on((item.parent == level.name) & (item.parenttype == "Pay Matrix Level") & (item.parentfield == "years"))
+		.select(level.name, level.level, level.pay_band, level.grade, item.year, item.amount)
+		.where(level.pay_matrix == pay_matrix)
+		.orderby(item.idx)
+		.run(as_dict=True)
+	)
+
+	levels = {}
+	amounts = {}
+	years = set()
+	for row in rows:
+		if row.name not in levels:
+			levels[row.name] = {"name": row.name, "level": row.level, "pay_band": row.pay_band, "grade": row.grade}
+			amounts[row.name] = {}
+
+		if row.year:
+			amounts[row.name][row.year] = flt(row.amount)
+			years.add(row.year)
+
+	return {
+		"levels": sorted(levels.values(), key=lambda d: level_sort_key(d["level"])),
+		"years": sorted(years, key=year_sort_key),
+		"amounts": amounts,
+	}
+
+
+def level_sort_key(level):
+	"""Sort key for pay levels: numeric part first, then alpha suffix (e.g. 1 < 1A < 2)."""
+	m = re.match(r"^(\d+)([A-Za-z]*)$", str(level or ""))
+	if not m:
+		return (float("inf"), "")
+	return (int(m.group(1)), m.group(2))
+
+
+def year_sort_key(year):
+	year = str(year).strip()
+	return (0, int(year), "") if year.isdigit() else (1, 0, year)
+
+
+def get_matrix_grid_cache_key(pay_matrix):
+	return f"pay_matrix_grid::{pay_matrix}"
+
+
+def clear_matrix_grid_cache(pay_matrix):
+	if pay_matrix:
+		frappe.cache().delete_value(get_matrix_grid_cache_key(pay_matrix))
 
 
 @frappe.whitelist()
 def update_pay_matrix_level(level_name, level, pay_band, grade, years_data):
 	"""Update Pay Matrix Level with custom years data"""
 	try:
-		# Get the document
-		doc = frappe.get_doc("Pay Matrix Level", level_name)
-		
-		# Update main fields
-		doc.level = level
-		doc.pay_band = pay_band or ""
-		doc.grade = grade or ""
-		
-		# Clear existing years
-		doc.years = []
-		
-		# Add new years
-		if years_data:
-			import json
-			if isinstance(years_data, str):
-				years_data = json.loads(years_data)
-			
-			for year_row in years_data:
-				if year_row.get("year") and year_row.get("amount") is not None:
-					doc.append("years", {
-						"year": year_row["year"],
-						"amount": year_row["amount"]
-					})
-		
-		# Save the document
-		doc.save()
-		frappe.db.commit()
-		
+		if isinstance(years_data, str):
+			years_data = json.loads(years_data)
+
+		# Full set of years: rows missing from years_data are deleted
+		years = {
+			str(row["year"]).strip(): row["amount"]
+			for row in years_data or []
+			if row.get("year") and row.get("amount") is not None
+		}
+		existing = get_level_items([level_name]).get(level_name, {})
+		years.update({year: None for year in existing if year not in years})
+
+		pay_matrix = frappe.db.get_value("Pay Matrix Level", level_name, "pay_matrix")
+		apply_pay_matrix_edits(
+			pay_matrix,
+			{level_name: {"level": level, "pay_band": pay_band or "", "grade": grade or "", "years": years}},
+		)
+
 		return {"success": True, "message": "Pay Matrix Level updated successfully"}
 	except Exception as e:
+		frappe.db.rollback()
 		frappe.log_error(f"Error updating Pay Matrix Level: {str(e)}")
 		return {"success": False, "message": str(e)}
+
+
+@frappe.whitelist()
+def apply_pay_matrix_edits(pay_matrix: str, edits):
+	"""
+	Apply edits to many levels of a Pay Matrix in one transaction.
+
+	Only the given cells are touched: each is diffed against the existing Matrix Level
+	Items and turned into an insert, an update or a delete. Levels without an actual
+	change keep their `modified` timestamp.
+
+	Args:
+		pay_matrix (str): Pay Matrix name
+		edits (dict | str): {level name: {"level"?, "pay_band"?, "grade"?, "years": {year: amount}}};
+			an amount of None deletes the year
+
+	Returns:
+		dict: {"inserted": int, "updated": int, "deleted": int, "levels": changed level names}
+	"""
+	if isinstance(edits, str):
+		edits = json.loads(edits)
+
+	frappe.has_permission("Pay Matrix Level", "write", throw=True)
+
+	levels = {
+		d.name: d
+		for d in frappe.get_all(
+			"Pay Matrix Level",
+			filters={"name": ["in", list(edits)]},
+			fields=["name", "pay_matrix", "level", "pay_band", "grade"],
+		)
+	}
+	for level_name in edits:
+		if level_name not in levels or levels[level_name].pay_matrix != pay_matrix:
+			frappe.throw(f"Pay Matrix Level {level_name} does not belong to Pay Matrix {pay_matrix}")
+
+	existing = get_level_items(list(edits))
+	now = now_datetime()
+	user = frappe.session.user
+
+	inserts = []
+	updates = {}
+	deletes = []
+	level_updates = {}
+
+	for level_name, edit in edits.items():
+		current = levels[level_name]
+		items = existing.get(level_name, {})
+		next_idx = max((item.idx for item in items.values()), default=0)
+		changed = False
+
+		for year, amount in (edit.get("years") or {}).items():
+			year = str(year).strip()
+			if not year:
+				continue
+
+			item = items.get(year)
+			if amount is None or amount == "":
+				if item:
+					deletes.append(item.name)
+					changed = True
+			elif not item:
+				next_idx += 1
+				inserts.append(
+					(
+						frappe.generate_hash(length=10),
+						user,
+						now,
+						now,
+						user,
+						next_idx,
+						level_name,
+						"Pay Matrix Level",
+						"years",
+						year,
+						flt(amount),
+					)
+				)
+				changed = True
+			elif flt(item.amount) != flt(amount):
+				updates[item.name] = {"amount": flt(amount)}
+				changed = True
+
+		header = {
+			field: edit[field] or ""
+			for field in ("level", "pay_band", "grade")
+			if field in edit and (edit[field] or "") != (current[field] or "")
+		}
+		if header.get("level") == "":
+			frappe.throw(f"Level is required for Pay Matrix Level {level_name}")
+
+		if header or changed:
+			level_updates[level_name] = header
+
+	# Everything is validated at this point; write the whole diff
+	for level_name, header in level_updates.items():
+		frappe.db.set_value("Pay Matrix Level", level_name, header or {"modified": now})
+	if deletes:
+		frappe.db.delete("Matrix Level Items", {"name": ["in", deletes]})
+	if updates:
+		frappe.db.bulk_update("Matrix Level Items", updates, update_modified=False)
+	if inserts:
+		frappe.db.bulk_insert(
+			"Matrix Level Items",
+			[
+				"name",
+				"owner",
+				"creation",
+				"modified",
+				"modified_by",
+				"idx",
+				"parent",
+				"parenttype",
+				"parentfield",
+				"year",
+				"amount",
+			],
+			inserts,
+		)
+
+	if level_updates:
+		clear_pay_matrix_index()
+		clear_matrix_grid_cache(pay_matrix)
+		take_snapshot(pay_matrix)
+
+	return {
+		"inserted": len(inserts),
+		"updated": len(updates),
+		"deleted": len(deletes),
+		"levels": list(level_updates),
+	}
+
+
+@frappe.whitelist()
+def export_matrix_grid(pay_matrix: str):
+	"""
+	Download the level x year grid of a Pay Matrix as CSV.
+
+	The first rows hold Level, Pay Band and Grade per column, followed by one row per
+	year. The same layout is read back by import_matrix_grid.
+	"""
+	grid = get_matrix_grid(pay_matrix)
+	levels = grid["levels"]
+
+	rows = [
+		["Level", *[d["level"] for d in levels]],
+		["Pay Band", *[d["pay_band"] or "" for d in levels]],
+		["Grade", *[d["grade"] or "" for d in levels]],
+	]
+	for year in grid["years"]:
+		rows.append([year, *[grid["amounts"][d["name"]].get(year, "") for d in levels]])
+
+	build_csv_response(rows, frappe.scrub(pay_matrix))
+
+
+@frappe.whitelist()
+def import_matrix_grid(pay_matrix: str, file_url: str):
+	"""
+	Create or update the levels of a Pay Matrix from a CSV in the export_matrix_grid layout.
+
+	The whole file is validated before anything is written. New levels are bulk inserted,
+	then the year amounts of every level in the file are applied with
+	apply_pay_matrix_edits, all in one transaction. For the levels in the file the CSV is
+	authoritative: empty cells and years missing from the file are removed. Levels not
+	in the file are left untouched.
+
+	Returns:
+		dict: {"created": new level names, "inserted", "updated", "deleted"}
+	"""
+	frappe.has_permission("Pay Matrix Level", "create", throw=True)
+	if not frappe.db.exists("Pay Matrix", pay_matrix):
+		frappe.throw(f"Pay Matrix {pay_matrix} not found")
+
+	content = frappe.get_doc("File", {"file_url": file_url}).get_content()
+	columns, years = parse_matrix_grid_csv(read_csv_content(content))
+
+	existing = dict(
+		frappe.get_all(
+			"Pay Matrix Level", filters={"pay_matrix": pay_matrix}, fields=["level", "name"], as_list=True
+		)
+	)
+	new_columns = [column for column in columns if column["level"] not in existing]
+	for column in new_columns:
+		column["name"] = f"{pay_matrix} - {column['level']}"
+
+	if new_columns:
+		taken = frappe.get_all(
+			"Pay Matrix Level", filters={"name": ["in", [c["name"] for c in new_columns]]}, pluck="name"
+		)
+		if taken:
+			frappe.throw(f"Pay Matrix Level already exists: {', '.join(sorted(taken))}")
+
+		now = now_datetime()
+		user = frappe.session.user
+		frappe.db.bulk_insert(
+			"Pay Matrix Level",
+			["name", "owner", "creation", "modified", "modified_by", "pay_matrix", "level", "pay_band", "grade"],
+			[
+				(c["name"], user, now, now, user, pay_matrix, c["level"], c.get("pay_band"), c.get("grade"))
+				for c in new_columns
+			],
+		)
+
+	existing_items = get_level_items(list(existing.values())) if existing else {}
+	edits = {}
+	for position, column in enumerate(columns):
+		name = existing.get(column["level"]) or column["name"]
+		amounts = {year: values[position] for year, values in years.items()}
+		# Years of the level that are not in the file are removed
+		amounts.update({year: None for year in existing_items.get(name, {}) if year not in amounts})
+		# Pay Band and Grade are only changed when the file has their row
+		edits[name] = {key: column[key] for key in ("pay_band", "grade") if key in column}
+		edits[name]["years"] = amounts
+
+	result = apply_pay_matrix_edits(pay_matrix, edits)
+	clear_matrix_grid_cache(pay_matrix)
+
+	return {
+		"created": [c["name"] for c in new_columns],
+		"inserted": result["inserted"],
+		"updated": result["updated"],
+		"deleted": result["deleted"],
+	}
+
+
+def parse_matrix_grid_csv(rows):
+	"""
+	Validate a Pay Matrix grid CSV and split it into level columns and year rows.
+
+	All problems in the file are collected and raised together.
+
+	Returns:
+		tuple: ([{"level", "pay_band"?, "grade"?}, ...], {year: [amount or None per level]});
+			pay_band and grade are only set when the file has a Pay Band or Grade row
+	"""
+	rows = [[str(cell).strip() for cell in row] for row in rows if any(str(cell).strip() for cell in row)]
+	if not rows or rows[0][0].lower() != "level":
+		frappe.throw("The first row must start with 'Level' followed by one level per column")
+
+	levels = rows[0][1:]
+	width = len(levels)
+	# Pay Band and Grade rows are optional
+	header_fields = {"pay band": "pay_band", "grade": "grade"}
+	header_rows = {}
+	errors = []
+
+	for position, level in enumerate(levels, start=2):
+		if not level:
+			errors.append(f"Column {position}: Level is empty")
+	duplicates = {level for level in levels if level and levels.count(level) > 1}
+	if duplicates:
+		errors.append(f"Duplicate levels: {', '.join(sorted(duplicates))}")
+
+	years = {}
+	for line_no, row in enumerate(rows[1:], start=2):
+		label, cells = row[0], (row[1:] + [""] * width)[:width]
+		if label.lower() in header_fields:
+			header_rows[label.lower()] = cells
+			continue
+
+		if not label:
+			errors.append(f"Row {line_no}: Year is empty")
+			continue
+		if label in years:
+			errors.append(f"Row {line_no}: Year {label} appears more than once")
+			continue
+
+		amounts = []
+		for position, cell in enumerate(cells, start=2):
+			if cell == "":
+				amounts.append(None)
+				continue
+			try:
+				amounts.append(float(cell.replace(",", "")))
+			except ValueError:
+				errors.append(f"Row {line_no}, column {position}: {cell} is not a number")
+				amounts.append(None)
+		years[label] = amounts
+
+	grades = {grade for grade in header_rows.get("grade", []) if grade}
+	if grades:
+		missing = grades - set(frappe.get_all("Employee Grade", filters={"name": ["in", list(grades)]}, pluck="name"))
+		if missing:
+			errors.append(f"Employee Grade not found: {', '.join(sorted(missing))}")
+
+	if errors:
+		frappe.throw("<br>".join(errors), title="Invalid Pay Matrix File")
+
+	columns = [
+		{"level": level, **{header_fields[label]: cells[i] for label, cells in header_rows.items()}}
+		for i, level in enumerate(levels)
+	]
+	return columns, years
+
+
+def get_level_items(level_names):
+	"""level name -> {year: Matrix Level Items row} for the given Pay Matrix Levels."""
+	items = {}
+	for row in frappe.get_all(
+		"Matrix Level Items",
+		filters={"parent": ["in", level_names], "parenttype": "Pay Matrix Level", "parentfield": "years"},
+		fields=["name", "parent", "idx", "year", "amount"],
+		order_by="idx asc",
+	):
+		items.setdefault(row.parent, {})[str(row.year).strip()] = row
+
+	return items
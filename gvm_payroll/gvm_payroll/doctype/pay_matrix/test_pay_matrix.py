@@ -1,9 +1,212 @@
 # Copyright (c) 2025, Samuael Ketema and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from gvm_payroll.gvm_payroll.api.pay_matrix import (
+	clear_pay_matrix_index,
+	get_designation_levels,
+	get_pay_matrix_index,
+)
+from gvm_payroll.gvm_payroll.doctype.pay_matrix.pay_matrix import (
+	apply_pay_matrix_edits,
+	clear_matrix_grid_cache,
+	get_level_items,
+	get_matrix_grid,
+	import_matrix_grid,
+	parse_matrix_grid_csv,
+	update_pay_matrix_level,
+)
+
+PAY_MATRIX = "_Test Edit Matrix : 7th"
+OTHER_PAY_MATRIX = "_Test Edit Other Matrix : 7th"
+LEVEL_1 = f"{PAY_MATRIX} - 1"
+LEVEL_2 = f"{PAY_MATRIX} - 2"
+DESIGNATION = "_Test Edit Designation"
+
 
 class TestPayMatrix(FrappeTestCase):
-	pass
+	def test_grid_without_header_rows_leaves_pay_band_and_grade_out(self):
+		columns, years = parse_matrix_grid_csv([["Level", "1", "2"], ["1", "18000", "19900"]])
+
+		self.assertEqual(columns, [{"level": "1"}, {"level": "2"}])
+		self.assertEqual(years, {"1": [18000, 19900]})
+
+	def test_grid_with_pay_band_row(self):
+		columns, _years = parse_matrix_grid_csv(
+			[["Level", "1", "2"], ["Pay Band", "PB-1", "PB-2"], ["1", "18000", ""]]
+		)
+
+		self.assertEqual(columns, [{"level": "1", "pay_band": "PB-1"}, {"level": "2", "pay_band": "PB-2"}])
+
+
+class TestPayMatrixEdits(FrappeTestCase):
+	def setUp(self):
+		make_pay_matrix(PAY_MATRIX, {"1": {"1": 100, "2": 200}, "2": {"1": 300, "2": 400}})
+
+	def test_add_update_and_remove_across_levels(self):
+		result = apply_pay_matrix_edits(
+			PAY_MATRIX,
+			{
+				LEVEL_1: {"years": {"2": 250, "3": 300}},
+				LEVEL_2: {"years": {"1": None, "2": 400}},
+			},
+		)
+
+		self.assertEqual(result, {"inserted": 1, "updated": 1, "deleted": 1, "levels": [LEVEL_1, LEVEL_2]})
+		self.assertEqual(get_amounts(LEVEL_1), {"1": 100, "2": 250, "3": 300})
+		self.assertEqual(get_amounts(LEVEL_2), {"2": 400})
+
+	def test_unchanged_level_keeps_modified(self):
+		modified = frappe.db.get_value("Pay Matrix Level", LEVEL_2, "modified")
+
+		result = apply_pay_matrix_edits(
+			PAY_MATRIX, {LEVEL_1: {"pay_band": "PB-1"}, LEVEL_2: {"years": {"1": 300, "2": "400"}}}
+		)
+
+		self.assertEqual(result["levels"], [LEVEL_1])
+		self.assertEqual(frappe.db.get_value("Pay Matrix Level", LEVEL_1, "pay_band"), "PB-1")
+		self.assertEqual(frappe.db.get_value("Pay Matrix Level", LEVEL_2, "modified"), modified)
+
+	def test_level_of_another_matrix_is_rejected(self):
+		make_pay_matrix(OTHER_PAY_MATRIX, {"1": {"1": 100}})
+
+		self.assertRaises(
+			frappe.ValidationError,
+			apply_pay_matrix_edits,
+			PAY_MATRIX,
+			{LEVEL_1: {"years": {"1": 1}}, f"{OTHER_PAY_MATRIX} - 1": {"years": {"1": 1}}},
+		)
+		self.assertEqual(get_amounts(LEVEL_1), {"1": 100, "2": 200})
+
+	def test_update_pay_matrix_level_replaces_the_years(self):
+		result = update_pay_matrix_level(
+			LEVEL_1,
+			"1",
+			"PB-1",
+			None,
+			'[{"year": "1", "amount": 100}, {"year": " 3 ", "amount": 300}, {"year": "", "amount": 1}]',
+		)
+
+		self.assertTrue(result["success"])
+		self.assertEqual(get_amounts(LEVEL_1), {"1": 100, "3": 300})
+		self.assertEqual(frappe.db.get_value("Pay Matrix Level", LEVEL_1, "pay_band"), "PB-1")
+		self.assertEqual(get_amounts(LEVEL_2), {"1": 300, "2": 400})
+
+	def test_edit_clears_grid_and_index(self):
+		self.assertEqual(get_matrix_grid(PAY_MATRIX)["amounts"][LEVEL_1]["2"], 200)
+		self.assertEqual(get_pay_matrix_index()[(PAY_MATRIX, LEVEL_1)], ([1.0, 2.0], [100, 200]))
+
+		apply_pay_matrix_edits(PAY_MATRIX, {LEVEL_1: {"years": {"2": 250}}})
+
+		self.assertEqual(get_matrix_grid(PAY_MATRIX)["amounts"][LEVEL_1]["2"], 250)
+		self.assertEqual(get_pay_matrix_index()[(PAY_MATRIX, LEVEL_1)], ([1.0, 2.0], [100, 250]))
+
+
+class TestMatrixGrid(FrappeTestCase):
+	def setUp(self):
+		make_pay_matrix(PAY_MATRIX, {"10": {"1": 500}, "2": {"10": 210, "1": 200}, "1A": {}, "1": {"2": 110}})
+		# Cached before every change below
+		get_matrix_grid(PAY_MATRIX)
+
+	def test_levels_and_years_are_sorted(self):
+		grid = get_matrix_grid(PAY_MATRIX)
+
+		self.assertEqual([d["level"] for d in grid["levels"]], ["1", "1A", "2", "10"])
+		self.assertEqual(grid["years"], ["1", "2", "10"])
+		self.assertEqual(grid["amounts"][f"{PAY_MATRIX} - 1A"], {})
+
+	def test_grid_reflects_level_changes(self):
+		frappe.get_doc(
+			{
+				"doctype": "Pay Matrix Level",
+				"pay_matrix": PAY_MATRIX,
+				"level": "3",
+				"years": [{"year": "1", "amount": 1}],
+			}
+		).insert()
+		self.assertIn(f"{PAY_MATRIX} - 3", get_matrix_grid(PAY_MATRIX)["amounts"])
+
+		level = frappe.get_doc("Pay Matrix Level", LEVEL_2)
+		level.years[0].amount = 220
+		level.save()
+		self.assertEqual(get_matrix_grid(PAY_MATRIX)["amounts"][LEVEL_2]["10"], 220)
+
+		frappe.delete_doc("Pay Matrix Level", LEVEL_2)
+		self.assertNotIn(LEVEL_2, get_matrix_grid(PAY_MATRIX)["amounts"])
+
+	def test_grid_reflects_edits(self):
+		apply_pay_matrix_edits(PAY_MATRIX, {LEVEL_1: {"pay_band": "PB-1", "years": {"2": None, "5": 150}}})
+
+		grid = get_matrix_grid(PAY_MATRIX)
+		self.assertEqual(grid["levels"][0]["pay_band"], "PB-1")
+		self.assertEqual(grid["amounts"][LEVEL_1], {"5": 150})
+		self.assertEqual(grid["years"], ["1", "5", "10"])
+
+	def test_grid_reflects_import(self):
+		file = frappe.get_doc(
+			{
+				"doctype": "File",
+				"file_name": "_test_pay_matrix_grid.csv",
+				"content": "Level,1,4\n1,120,400\n2,130,\n",
+				"is_private": 1,
+			}
+		).insert()
+		self.addCleanup(frappe.delete_doc, "File", file.name, force=True)
+
+		import_matrix_grid(PAY_MATRIX, file.file_url)
+
+		grid = get_matrix_grid(PAY_MATRIX)
+		self.assertEqual(grid["amounts"][LEVEL_1], {"1": 120, "2": 130})
+		self.assertEqual(grid["amounts"][f"{PAY_MATRIX} - 4"], {"1": 400})
+
+	def test_designation_levels_reflect_designation_save(self):
+		# The grid has no designation data; designations feed the level lookup instead
+		if not frappe.db.exists("Designation", DESIGNATION):
+			frappe.get_doc({"doctype": "Designation", "designation_name": DESIGNATION}).insert()
+		designation = frappe.get_doc("Designation", DESIGNATION)
+		# A linked level could not be deleted by the other tests
+		self.addCleanup(clear_designation_matrix_levels)
+		designation.set("custom_matrix_levels", [{"pay_matrix": PAY_MATRIX, "level": LEVEL_1}])
+		designation.save()
+		self.assertEqual(get_designation_levels()[(DESIGNATION, PAY_MATRIX)], LEVEL_1)
+
+		designation.custom_matrix_levels[0].level = LEVEL_2
+		designation.save()
+		self.assertEqual(get_designation_levels()[(DESIGNATION, PAY_MATRIX)], LEVEL_2)
+
+
+def make_pay_matrix(pay_matrix, levels):
+	"""Recreate the levels of a Pay Matrix from {level: {year: amount}}."""
+	if not frappe.db.exists("Pay Matrix", pay_matrix):
+		pm, cpc = pay_matrix.split(" : ")
+		frappe.get_doc({"doctype": "Pay Matrix", "pm": pm, "cpc": cpc}).insert()
+
+	existing = frappe.get_all("Pay Matrix Level", filters={"pay_matrix": pay_matrix}, pluck="name")
+	if existing:
+		frappe.db.delete("Matrix Level Items", {"parent": ["in", existing]})
+		frappe.db.delete("Pay Matrix Level", {"name": ["in", existing]})
+
+	for level, years in levels.items():
+		frappe.get_doc(
+			{
+				"doctype": "Pay Matrix Level",
+				"pay_matrix": pay_matrix,
+				"level": level,
+				"years": [{"year": year, "amount": amount} for year, amount in years.items()],
+			}
+		).insert()
+
+	clear_pay_matrix_index()
+	clear_matrix_grid_cache(pay_matrix)
+
+
+def clear_designation_matrix_levels():
+	designation = frappe.get_doc("Designation", DESIGNATION)
+	designation.set("custom_matrix_levels", [])
+	designation.save()
+
+
+def get_amounts(level_name):
+	return {year: row.amount for year, row in get_level_items([level_name]).get(level_name, {}).items()}
@@ -4,6 +4,30 @@
 # import frappe
 from frappe.model.document import Document
 
+from gvm_payroll.gvm_payroll.api.pay_matrix import clear_designation_levels, clear_pay_matrix_index
+from gvm_payroll.gvm_payroll.doctype.pay_matrix.pay_matrix import clear_matrix_grid_cache
+from gvm_payroll.gvm_payroll.doctype.pay_matrix_snapshot.pay_matrix_snapshot import take_snapshot
+
 
 class PayMatrixLevel(Document):
-	pass
+	def on_update(self):
+		clear_pay_matrix_index()
+		clear_matrix_grid_cache(self.pay_matrix)
+		take_snapshot(self.pay_matrix)
+
+		# Level moved to another Pay Matrix
+		previous = self.get_doc_before_save()
+		if previous and previous.pay_matrix != self.pay_matrix:
+			clear_matrix_grid_cache(previous.pay_matrix)
+			take_snapshot(previous.pay_matrix)
+
+	def on_trash(self):
+		clear_pay_matrix_index()
+		clear_matrix_grid_cache(self.pay_matrix)
+		take_snapshot(self.pay_matrix, exclude_level=self.name)
+
+	def after_rename(self, old, new, merge=False):
+		# Designation matrix levels link to the old name
+		clear_designation_levels()
+		clear_pay_matrix_index()
+		clear_matrix_grid_cache(self.pay_matrix)
@@ -0,0 +1,163 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+import json
+from bisect import bisect_right
+from functools import lru_cache
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, getdate, nowdate
+
+
+class PayMatrixSnapshot(Document):
+	def validate(self):
+		if not self.grid:
+			self.grid = serialize_grid(get_current_grid(self.pay_matrix))
+
+	def on_update(self):
+		clear_snapshot_dates(self.pay_matrix)
+
+	def on_trash(self):
+		clear_snapshot_dates(self.pay_matrix)
+
+
+@frappe.whitelist()
+def create_snapshot(pay_matrix: str, effective_date=None):
+	"""
+	Store the current grid of a Pay Matrix as the version effective from `effective_date`.
+
+	An existing snapshot for the same date is overwritten.
+	"""
+	frappe.has_permission("Pay Matrix Snapshot", "create", throw=True)
+	return take_snapshot(pay_matrix, effective_date).name
+
+
+def take_snapshot(pay_matrix, effective_date=None, exclude_level=None):
+	"""
+	Create or refresh the snapshot of a Pay Matrix for `effective_date` (default today).
+
+	`exclude_level` leaves out a level that is being deleted but whose rows still exist.
+	"""
+	effective_date = getdate(effective_date or nowdate())
+	grid = get_current_grid(pay_matrix)
+	grid.pop(exclude_level, None)
+	grid = serialize_grid(grid)
+
+	name = frappe.db.get_value(
+		"Pay Matrix Snapshot", {"pay_matrix": pay_matrix, "effective_date": effective_date}
+	)
+	if name:
+		doc = frappe.get_doc("Pay Matrix Snapshot", name)
+		if doc.grid == grid:
+			return doc
+		doc.grid = grid
+		doc.save(ignore_permissions=True)
+		return doc
+
+	return frappe.get_doc(
+		{
+			"doctype": "Pay Matrix Snapshot",
+			"pay_matrix": pay_matrix,
+			"effective_date": effective_date,
+			"grid": grid,
+		}
+	).insert(ignore_permissions=True)
+
+
+def get_current_grid(pay_matrix):
+	"""level name -> [[year, amount], ...] sorted by year, from the live Matrix Level Items."""
+	level = frappe.qb.DocType("Pay Matrix Level")
+	item = frappe.qb.DocType("Matrix Level Items")
+
+	rows = (
+		frappe.qb.from_(item)
+		.join(level)
+		.on(item.parent == level.name)
+		.select(level.name, item.year, item.amount)
+		.where(
+			(level.pay_matrix == pay_matrix)
+			& (item.parenttype == "Pay Matrix Level")
+			& (item.parentfield == "years")
+		)
+		.run(as_dict=True)
+	)
+
+	grid = {}
+	for row in rows:
+		try:
+			year = float(str(row.year or "").strip())
+		except ValueError:
+			continue
+		grid.setdefault(row.name, []).append([year, flt(row.amount)])
+
+	for steps in grid.values():
+		steps.sort()
+
+	return grid
+
+
+def serialize_grid(grid):
+	return json.dumps(grid, sort_keys=True, separators=(",", ":"))
+
+
+def get_matrix_as_of(pay_matrix, date):
+	"""
+	Pay matrix index that applied on `date`.
+
+	Returns:
+		dict | None: (pay_matrix, level) -> (sorted years, amounts), in the shape of
+		gvm_payroll.gvm_payroll.api.pay_matrix.get_pay_matrix_index; None if no
+		snapshot is effective on that date, in which case callers use the live index
+	"""
+	dates, versions = get_snapshot_dates(pay_matrix)
+	position = bisect_right(dates, getdate(date).isoformat())
+	if not position:
+		return None
+
+	name, modified = versions[position - 1]
+	return load_snapshot(frappe.local.site, name, modified)
+
+
+@lru_cache(maxsize=256)
+def load_snapshot(site, name, modified):
+	"""
+	Parse a snapshot into a lookup index.
+
+	Cached per process; `site` and `modified` are part of the key, so a snapshot that
+	is rewritten is parsed again and sites never share entries.
+	"""
+	pay_matrix, grid = frappe.db.get_value("Pay Matrix Snapshot", name, ["pay_matrix", "grid"])
+	index = {}
+	for level, steps in json.loads(grid or "{}").items():
+		index[(pay_matrix, level)] = ([year for year, _ in steps], [amount for _, amount in steps])
+
+	return index
+
+
+def get_snapshot_dates(pay_matrix):
+	"""Sorted effective dates of a Pay Matrix's snapshots and their (name, modified), cached."""
+	return frappe.cache().get_value(
+		get_snapshot_dates_key(pay_matrix), generator=lambda: build_snapshot_dates(pay_matrix)
+	)
+
+
+def build_snapshot_dates(pay_matrix):
+	snapshots = frappe.get_all(
+		"Pay Matrix Snapshot",
+		filters={"pay_matrix": pay_matrix},
+		fields=["name", "effective_date", "modified"],
+		order_by="effective_date asc",
+	)
+	return (
+		[getdate(d.effective_date).isoformat() for d in snapshots],
+		[(d.name, str(d.modified)) for d in snapshots],
+	)
+
+
+def get_snapshot_dates_key(pay_matrix):
+	return f"pay_matrix_snapshot_dates::{pay_matrix}"
+
+
+def clear_snapshot_dates(pay_matrix):
+	frappe.cache().delete_value(get_snapshot_dates_key(pay_matrix))
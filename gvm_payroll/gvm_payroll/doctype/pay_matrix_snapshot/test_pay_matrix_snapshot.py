@@ -0,0 +1,89 @@
+# Copyright (c) 2026, Samuael Ketema and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from gvm_payroll.gvm_payroll.api.pay_matrix import (
+	clear_designation_levels,
+	clear_pay_matrix_index,
+	get_basic_salary,
+)
+from gvm_payroll.gvm_payroll.doctype.pay_matrix_snapshot.pay_matrix_snapshot import (
+	clear_snapshot_dates,
+	get_matrix_as_of,
+	take_snapshot,
+)
+
+DESIGNATION = "_Test Snapshot Designation"
+PAY_MATRIX = "_Test Snapshot Matrix : 7th"
+LEVEL = f"{PAY_MATRIX} - 1"
+
+
+class TestPayMatrixSnapshot(FrappeTestCase):
+	def setUp(self):
+		make_pay_matrix()
+		# Saving the level snapshots today's grid; the tests use their own dates
+		frappe.db.delete("Pay Matrix Snapshot", {"pay_matrix": PAY_MATRIX})
+		clear_snapshot_dates(PAY_MATRIX)
+
+		take_snapshot(PAY_MATRIX, "2025-04-01")
+		set_live_amount(22000)
+		take_snapshot(PAY_MATRIX, "2025-10-01")
+		set_live_amount(25000)
+
+	def test_matrix_as_of_effective_date(self):
+		self.assertIsNone(get_matrix_as_of(PAY_MATRIX, "2025-03-31"))
+		self.assertEqual(get_matrix_as_of(PAY_MATRIX, "2025-04-01")[(PAY_MATRIX, LEVEL)], ([1.0], [20000.0]))
+		self.assertEqual(get_matrix_as_of(PAY_MATRIX, "2025-09-30")[(PAY_MATRIX, LEVEL)], ([1.0], [20000.0]))
+		self.assertEqual(get_matrix_as_of(PAY_MATRIX, "2025-10-01")[(PAY_MATRIX, LEVEL)], ([1.0], [22000.0]))
+		self.assertEqual(get_matrix_as_of(PAY_MATRIX, "2026-01-01")[(PAY_MATRIX, LEVEL)], ([1.0], [22000.0]))
+
+	def test_snapshot_for_same_date_is_refreshed(self):
+		doc = take_snapshot(PAY_MATRIX, "2025-10-01")
+
+		self.assertEqual(frappe.db.count("Pay Matrix Snapshot", {"pay_matrix": PAY_MATRIX}), 2)
+		self.assertEqual(doc.name, f"{PAY_MATRIX} - 2025-10-01")
+		self.assertEqual(get_matrix_as_of(PAY_MATRIX, "2025-10-01")[(PAY_MATRIX, LEVEL)], ([1.0], [25000.0]))
+
+	def test_basic_salary_as_of(self):
+		self.assertEqual(
+			get_basic_salary(DESIGNATION, PAY_MATRIX, 1, as_of="2025-05-01")["basic_salary"], 20000
+		)
+		# Before the first snapshot the live matrix is used, like Increment Run does
+		self.assertEqual(
+			get_basic_salary(DESIGNATION, PAY_MATRIX, 1, as_of="2025-01-01")["basic_salary"], 25000
+		)
+
+
+def make_pay_matrix():
+	if not frappe.db.exists("Pay Matrix", PAY_MATRIX):
+		frappe.get_doc({"doctype": "Pay Matrix", "pm": "_Test Snapshot Matrix", "cpc": "7th"}).insert()
+
+	if not frappe.db.exists("Pay Matrix Level", LEVEL):
+		frappe.get_doc(
+			{
+				"doctype": "Pay Matrix Level",
+				"pay_matrix": PAY_MATRIX,
+				"level": "1",
+				"years": [{"year": "1", "amount": 20000}],
+			}
+		).insert()
+	set_live_amount(20000)
+
+	if not frappe.db.exists("Designation", DESIGNATION):
+		frappe.get_doc(
+			{
+				"doctype": "Designation",
+				"designation_name": DESIGNATION,
+				"custom_matrix_levels": [{"pay_matrix": PAY_MATRIX, "level": LEVEL}],
+			}
+		).insert()
+
+	clear_designation_levels()
+
+
+def set_live_amount(amount):
+	# Written directly so the level's own snapshot on save does not interfere
+	frappe.db.set_value("Matrix Level Items", {"parent": LEVEL}, "amount", amount)
+	clear_pay_matrix_index()
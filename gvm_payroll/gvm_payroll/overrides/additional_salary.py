@@ -0,0 +1,54 @@
+# Copyright (c) 2025, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+
+# Documents that generate Additional Salary records in bulk. Records referencing
+# them carry an idempotency key backed by a unique index.
+GENERATED_REF_DOCTYPES = ("Payroll Entry", "Bulk Additional Salary")
+
+
+def get_idempotency_key(ref_doctype, ref_docname, employee, salary_component):
+	"""
+	Build the idempotency key of a generated Additional Salary.
+
+	Args:
+		ref_doctype (str): Generating DocType (e.g. "Payroll Entry")
+		ref_docname (str): Generating document name
+		employee (str): Employee ID
+		salary_component (str): Salary Component name
+
+	Returns:
+		str: sha256 hex digest of the four values
+	"""
+	raw = "\x1f".join((ref_doctype or "", ref_docname or "", employee or "", salary_component or ""))
+	return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def set_idempotency_key(doc, method=None):
+	"""
+	Set custom_idempotency_key on Additional Salary records generated by this app.
+
+	Runs on before_insert hook. The unique index on the field rejects a second
+	non-cancelled record for the same (ref_doctype, ref_docname, employee,
+	salary_component), so concurrent generators cannot create duplicates.
+	"""
+	if doc.ref_doctype not in GENERATED_REF_DOCTYPES or not doc.ref_docname:
+		doc.custom_idempotency_key = None
+		return
+
+	doc.custom_idempotency_key = get_idempotency_key(
+		doc.ref_doctype, doc.ref_docname, doc.employee, doc.salary_component
+	)
+
+
+def clear_idempotency_key(doc, method=None):
+	"""
+	Release the idempotency key when an Additional Salary is cancelled.
+
+	Runs on on_cancel hook, so the charge can be generated again (or amended).
+	"""
+	if doc.get("custom_idempotency_key"):
+		doc.db_set("custom_idempotency_key", None, update_modified=False)
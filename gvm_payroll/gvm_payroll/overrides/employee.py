@@ -0,0 +1,67 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.utils import getdate, nowdate
+
+from gvm_payroll.gvm_payroll.doctype.ind_payroll_setting.ind_payroll_setting import (
+	get_increment_date_from_string,
+	get_increment_date_strings,
+	get_initial_increment_date,
+	get_next_increment_date,
+)
+
+
+def validate_increment_date(doc, method=None):
+	"""
+	Check that custom_date_of_increment is one of the company's increment dates.
+
+	Runs on validate hook. Any date is allowed when no increment dates are configured.
+	"""
+	if not doc.custom_date_of_increment:
+		return
+
+	increment_date_strings = get_increment_date_strings(doc.company)
+	if not increment_date_strings:
+		return
+
+	selected_date = getdate(doc.custom_date_of_increment)
+	allowed_dates = [get_increment_date_from_string(d, selected_date.year) for d in increment_date_strings]
+	if selected_date not in allowed_dates:
+		frappe.throw(f"Increment Date must be one of: {', '.join(increment_date_strings)}")
+
+
+def set_increment_date(doc, method=None):
+	"""
+	Default custom_date_of_increment from the date of joining when it is not set.
+
+	Runs on before_save hook, ahead of set_next_increment_date.
+	"""
+	if doc.date_of_joining and not doc.custom_date_of_increment:
+		doc.custom_date_of_increment = get_initial_increment_date(doc.date_of_joining, doc.company)
+
+
+def set_next_increment_date(doc, method=None):
+	"""
+	Maintain custom_next_increment_date, the indexed date the daily experience job
+	looks employees up by.
+
+	Runs on before_save hook. The date is recomputed when it is missing or already past,
+	or when the date of joining, company or increment date changes.
+	"""
+	if not doc.date_of_joining:
+		doc.custom_next_increment_date = None
+		return
+
+	if (
+		doc.custom_next_increment_date
+		and getdate(doc.custom_next_increment_date) >= getdate(nowdate())
+		and not doc.has_value_changed("date_of_joining")
+		and not doc.has_value_changed("company")
+		and not doc.has_value_changed("custom_date_of_increment")
+	):
+		return
+
+	doc.custom_next_increment_date = get_next_increment_date(
+		doc.date_of_joining, doc.company, doc.custom_date_of_increment
+	)
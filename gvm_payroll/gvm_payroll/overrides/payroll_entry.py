@@ -0,0 +1,33 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+import frappe
+from hrms.payroll.doctype.payroll_entry.payroll_entry import PayrollEntry
+
+from gvm_payroll.gvm_payroll.api.payroll_entry import get_payroll_entry_employees, queue_salary_slip_shards
+
+# Largest Payroll Entry whose Salary Slips HRMS creates in the request instead of a job
+INLINE_SALARY_SLIPS_LIMIT = 30
+
+
+class CustomPayrollEntry(PayrollEntry):
+	@frappe.whitelist()
+	def create_salary_slips(self):
+		"""
+		Create the Salary Slips in parallel shards instead of HRMS's single background
+		job. Runs on submit and from the form's Create Salary Slips button; small entries
+		are still created in the request, as HRMS does.
+		"""
+		self.check_permission("write")
+
+		employees = get_payroll_entry_employees(self)
+		if len(employees) <= INLINE_SALARY_SLIPS_LIMIT and not frappe.flags.enqueue_payroll_entry:
+			return super().create_salary_slips()
+
+		result = queue_salary_slip_shards(self)
+		frappe.msgprint(
+			f"Salary Slip creation for {result['total']} employees is queued in {result['shards']} shards. "
+			"It may take a few minutes",
+			alert=True,
+			indicator="blue",
+		)
@@ -2,8 +2,20 @@
 # For license information, please see license.txt
 
 import frappe
+from frappe.query_builder.functions import Sum
+from frappe.utils import flt, getdate
 
+from gvm_payroll.gvm_payroll.api.salary_archive import ARCHIVED_DOCTYPES, get_archived_rows, has_archived_rows
+from gvm_payroll.gvm_payroll.doctype.annual_tax_ledger.annual_tax_ledger import update_tax_ledger
+from gvm_payroll.gvm_payroll.doctype.internal_salary_ytd.internal_salary_ytd import (
+	get_slip_fiscal_year,
+	get_year_to_date,
+	update_year_to_date,
+)
+from gvm_payroll.instrumentation import instrumented
 
+
+@instrumented("salary_slip.split_internal_components")
 def split_internal_components(doc, method=None):
 	"""
 	Move salary components marked as 'Internal Component' to a separate table.
@@ -120,6 +132,51 @@ def calculate_internal_total(doc):
 	doc.custom_gross_internal_payable = total
 
 
+def set_internal_year_to_date(doc, method=None):
+	"""
+	Set year_to_date of the internal salary details rows.
+
+	Runs on before_save and before_submit hooks, after split_internal_components. The
+	total is the employee's submitted amount of the component in the fiscal year up to
+	the month of the slip's end date (kept per month in Internal Salary YTD, summed in
+	one grouped query) plus this slip's amount, so slips of later months that were
+	submitted first (e.g. before an arrears slip) are not counted.
+	"""
+	if not doc.get("custom_internal_salary_details"):
+		return
+
+	fiscal_year = get_slip_fiscal_year(doc)
+	if not fiscal_year:
+		return
+
+	running = get_year_to_date(
+		doc.employee,
+		fiscal_year,
+		{row.salary_component for row in doc.custom_internal_salary_details},
+		doc.end_date,
+	)
+	for row in doc.custom_internal_salary_details:
+		running[row.salary_component] = running.get(row.salary_component, 0.0) + flt(row.amount)
+		row.year_to_date = running[row.salary_component]
+
+
+def update_internal_year_to_date(doc, method=None):
+	"""
+	Add a submitted Salary Slip's internal components to Internal Salary YTD, or take
+	a cancelled one's off. Runs on on_submit and on_cancel hooks.
+	"""
+	update_year_to_date(doc, sign=-1 if doc.docstatus == 2 else 1)
+
+
+def update_annual_tax_ledger(doc, method=None):
+	"""
+	Add a submitted Salary Slip's month to the employee's Annual Tax Ledger, or take a
+	cancelled one's off. Runs on on_submit and on_cancel hooks.
+	"""
+	update_tax_ledger(doc, sign=-1 if doc.docstatus == 2 else 1)
+
+
+@instrumented("salary_slip.calculate_unpaid_days")
 def calculate_unpaid_days(doc, method=None):
 	"""
 	Calculate total unpaid days for the employee from Unpaid Days doctype.
@@ -137,6 +194,16 @@ def calculate_unpaid_days(doc, method=None):
 		doc.custom_unpaid_days = 0.0
 		return
 
+	# Served from the prefetch of a sharded slip creation job, if it covers this slip
+	prefetched = getattr(frappe.local, "gvm_payroll_unpaid_days", None)
+	if (
+		prefetched
+		and prefetched["period"] == (getdate(doc.start_date), getdate(doc.end_date))
+		and doc.employee in prefetched["employees"]
+	):
+		doc.custom_unpaid_days = prefetched["days"].get(doc.employee, 0.0)
+		return
+
 	# Query all submitted Unpaid Days documents within salary slip date range
 	unpaid_days_docs = frappe.get_all(
 		"Unpaid Days",
@@ -174,3 +241,70 @@ def calculate_unpaid_days(doc, method=None):
 
 	# Update the custom field
 	doc.custom_unpaid_days = total_unpaid_days
+
+
+def prefetch_unpaid_days(start_date, end_date, employees):
+	"""
+	Load the unpaid days of `employees` for a payroll period with one query, so
+	calculate_unpaid_days needs none for their slips. Used by the sharded salary slip
+	creation jobs; call clear_prefetched_unpaid_days when done.
+	"""
+	unpaid_days = frappe.qb.DocType("Unpaid Days")
+	detail = frappe.qb.DocType("Unpaid Days Detail")
+
+	rows = (
+		frappe.qb.from_(detail)
+		.join(unpaid_days)
+		.on(detail.parent == unpaid_days.name)
+		.select(detail.employee, Sum(detail.days).as_("days"))
+		.where(
+			(unpaid_days.docstatus == 1)
+			& (unpaid_days.payroll_date.between(getdate(start_date), getdate(end_date)))
+			& (detail.parenttype == "Unpaid Days")
+			& (detail.employee.isin(list(employees)))
+		)
+		.groupby(detail.employee)
+		.run(as_dict=True)
+	)
+
+	frappe.local.gvm_payroll_unpaid_days = {
+		"period": (getdate(start_date), getdate(end_date)),
+		"employees": set(employees),
+		"days": {row.employee: flt(row.days) for row in rows},
+	}
+
+
+def clear_prefetched_unpaid_days():
+	frappe.local.gvm_payroll_unpaid_days = None
+
+
+def load_archived_details(doc, method=None):
+	"""
+	Show the archived earnings, deductions and internal components of an old Salary
+	Slip on its form (see gvm_payroll.gvm_payroll.api.salary_archive). Runs on onload;
+	the rows are only set on the loaded document.
+	"""
+	if doc.docstatus == 0 or not has_archived_rows(doc.name):
+		return
+
+	rows_by_field = {}
+	for doctype in ARCHIVED_DOCTYPES:
+		for row in get_archived_rows(doc.name, doctype):
+			rows_by_field.setdefault(row.parentfield, []).append(row)
+
+	for fieldname, rows in rows_by_field.items():
+		doc.set(fieldname, rows)
+
+	doc.set_onload("details_archived", 1)
+
+
+def validate_archived_details(doc, method=None):
+	"""
+	Block cancelling or updating a Salary Slip whose detail rows are archived.
+	Runs on before_cancel and before_update_after_submit.
+	"""
+	if has_archived_rows(doc.name):
+		frappe.throw(
+			f"The earnings and deductions of Salary Slip {doc.name} are archived. "
+			"Ask a System Manager to restore them before changing it."
+		)
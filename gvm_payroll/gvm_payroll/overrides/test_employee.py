@@ -0,0 +1,67 @@
+# Copyright (c) 2026, Samuael Ketema and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from erpnext.setup.doctype.employee.test_employee import make_employee
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from gvm_payroll.gvm_payroll.doctype.ind_payroll_setting.ind_payroll_setting import get_initial_increment_date
+
+COMPANY = "_Test Company"
+INCREMENT_DATES = ["1st April", "1st October"]
+SETTING_MODULE = "gvm_payroll.gvm_payroll.doctype.ind_payroll_setting.ind_payroll_setting"
+
+
+@patch(f"{SETTING_MODULE}.get_increment_date_strings", return_value=INCREMENT_DATES)
+class TestInitialIncrementDate(FrappeTestCase):
+	def test_first_date_after_one_year_of_service(self, _):
+		self.assertEqual(get_initial_increment_date("2025-06-15", today="2026-01-10"), getdate("2026-10-01"))
+		self.assertEqual(get_initial_increment_date("2025-03-01", today="2026-01-10"), getdate("2026-04-01"))
+
+	def test_one_year_completed_on_the_increment_date(self, _):
+		self.assertEqual(get_initial_increment_date("2025-04-01", today="2026-01-10"), getdate("2026-04-01"))
+
+	def test_long_serving_employee_gets_current_year_date(self, _):
+		self.assertEqual(get_initial_increment_date("2010-05-01", today="2026-10-19"), getdate("2026-04-01"))
+
+	def test_joining_beyond_search_window_falls_back(self, _):
+		self.assertEqual(get_initial_increment_date("2030-06-15", today="2026-01-10"), getdate("2032-04-01"))
+
+
+@patch("gvm_payroll.gvm_payroll.overrides.employee.get_increment_date_strings", return_value=INCREMENT_DATES)
+@patch(f"{SETTING_MODULE}.get_increment_date_strings", return_value=INCREMENT_DATES)
+class TestEmployeeIncrementDateHooks(FrappeTestCase):
+	def test_increment_date_set_on_save(self, *_):
+		employee = make_employee(
+			"increment_date_default@example.com", company=COMPANY, date_of_joining="2025-06-15"
+		)
+		doc = frappe.get_doc("Employee", employee)
+
+		self.assertEqual(
+			getdate(doc.custom_date_of_increment), get_initial_increment_date("2025-06-15", COMPANY)
+		)
+		self.assertTrue(doc.custom_next_increment_date)
+
+	def test_explicit_increment_date_is_kept(self, *_):
+		employee = make_employee(
+			"increment_date_explicit@example.com",
+			company=COMPANY,
+			date_of_joining="2024-02-01",
+			custom_date_of_increment="2025-10-01",
+		)
+		self.assertEqual(
+			getdate(frappe.db.get_value("Employee", employee, "custom_date_of_increment")),
+			getdate("2025-10-01"),
+		)
+
+	def test_increment_date_must_be_allowed(self, *_):
+		employee = make_employee(
+			"increment_date_invalid@example.com", company=COMPANY, date_of_joining="2024-02-01"
+		)
+		doc = frappe.get_doc("Employee", employee)
+		doc.custom_date_of_increment = "2025-05-01"
+
+		self.assertRaises(frappe.ValidationError, doc.save)
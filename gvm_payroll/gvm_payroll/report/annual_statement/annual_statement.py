@@ -4,10 +4,23 @@ from frappe.utils import flt, getdate, formatdate
 from datetime import datetime, timedelta
 import calendar
 
+from gvm_payroll.gvm_payroll.report.report_utils import get_detail_table, replica_report
+from gvm_payroll.instrumentation import instrumented_report
+from gvm_payroll.profiling import mark_phase, profiled_report
+
 salary_slip = frappe.qb.DocType("Salary Slip")
 salary_detail = frappe.qb.DocType("Salary Detail")
 
+# Amounts taken from each salary slip
+SLIP_BUCKETS = ("basic", "da", "ta", "house_rent", "grinsur", "lic", "mpf")
+
+# Amounts of each month of the statement
+MONTH_BUCKETS = ("basic", "da", "fixall", "ta", "house_rent", "grinsur", "lic", "mpf", "current_month_income_tax")
 
+
+@replica_report
+@instrumented_report
+@profiled_report
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -37,13 +50,6 @@ def execute(filters=None):
 	if not salary_slips:
 		return [], []
 
-	# Get salary slip details for earnings and deductions
-	ss_earning_map = get_salary_slip_details(salary_slips, "earnings")
-	ss_ded_map = get_salary_slip_details(salary_slips, "deductions")
-
-	# Get actual component names from salary slips
-	actual_components = get_actual_component_names(salary_slips, ss_earning_map, ss_ded_map)
-
 	# Group salary slips by employee
 	employee_slips = {}
 	for ss in salary_slips:
@@ -51,354 +57,486 @@ def execute(filters=None):
 			employee_slips[ss.employee] = []
 		employee_slips[ss.employee].append(ss)
 
+	# Employees whose Annual Tax Ledger covers all their slips are read from it;
+	# only the others' slip details are fetched
+	ledgers = get_tax_ledgers(filters, fiscal_year, employee_slips)
+	salary_slips = [ss for ss in salary_slips if ss.employee not in ledgers]
+
+	mark_phase("fetch_details")
+
+	# Get salary slip details for earnings and deductions
+	ss_earning_map = get_salary_slip_details(salary_slips, "earnings") if salary_slips else {}
+	ss_ded_map = get_salary_slip_details(salary_slips, "deductions") if salary_slips else {}
+
+	mark_phase("build_rows")
+
+	# Component amounts of each employee's months, from the ledger or the slip details
+	employee_months = {}
+	for employee, slips in employee_slips.items():
+		if employee in ledgers:
+			employee_months[employee] = frappe.parse_json(ledgers[employee].months) or {}
+		else:
+			employee_months[employee] = get_slip_months(slips, ss_earning_map, ss_ded_map)
+
+	# Get actual component names from all the report's components, whatever their source
+	actual_components = get_report_component_names(employee_months)
+
 	columns = get_columns(months)
 
 	data = []
 
 	for employee, slips in employee_slips.items():
-		# Get employee name
-		employee_name = slips[0].employee_name if slips else ""
-		
-		# Initialize monthly data
-		monthly_data = {}
-		for month_key in months.keys():
-			monthly_data[month_key] = {
-				"basic": 0.0,
-				"da": 0.0,
-				"fixall": 0.0,
-				"ta": 0.0,
-				"house_rent": 0.0,
-				"grinsur": 0.0,
-				"lic": 0.0,
-				"mpf": 0.0,
-				"current_month_income_tax": 0.0,
-			}
-
-		# Process each salary slip
-		for ss in slips:
-			month_key = get_month_key(ss.start_date)
-			if month_key not in monthly_data:
-				continue
-
-			earnings_map = ss_earning_map.get(ss.name, {})
-			deductions_map = ss_ded_map.get(ss.name, {})
-			
-			# Debug: Check if maps are empty
-			if not earnings_map and not deductions_map:
-				frappe.log_error(
-					title="Annual Statement - Empty Maps Debug",
-					message=frappe.as_json({
-						"employee": employee,
-						"salary_slip_name": ss.name,
-						"available_keys_in_ss_ded_map": list(ss_ded_map.keys())[:10],  # First 10 keys
-						"available_keys_in_ss_earning_map": list(ss_earning_map.keys())[:10],  # First 10 keys
-					})
-				)
-
-			# Basic - use actual component name if found
-			basic = 0.0
-			if actual_components.get("basic"):
-				basic = flt(earnings_map.get(actual_components["basic"], 0))
-			else:
-				basic = get_component_amount(earnings_map, ["Basic Salary", "Basic", "BASIC"])
-			monthly_data[month_key]["basic"] += basic
-
-			# DA = Dearness Allowences - use actual component name if found
-			da = 0.0
-			if actual_components.get("da"):
-				da = flt(earnings_map.get(actual_components["da"], 0))
-			else:
-				da = get_component_amount(earnings_map, ["Dearness Allowences", "Dearness Allowence", "DA", "D.A.", "Dearness"])
-			monthly_data[month_key]["da"] += da
-
-			# TA = Travel Allowences - use actual component name if found
-			ta = 0.0
-			if actual_components.get("ta"):
-				ta = flt(earnings_map.get(actual_components["ta"], 0))
-			else:
-				ta = get_component_amount(earnings_map, ["Travel Allowences", "Travel Allowence", "TA", "T.A.", "Travel"])
-			monthly_data[month_key]["ta"] += ta
-
-			# House Rent = House Rent + Water Charges + Garbage Maintainence + Servant Charge + Parking Charge
-			# Use exact component names from actual_components (found from database)
-			house_rent_total = 0.0
-			house_rent_breakup = {}
-			
-			def add_component_total(key):
-				"""Add earnings + deductions for a component and store debug info."""
-				if not key:
-					return 0.0
-				# Access maps directly - frappe._dict supports .get()
-				earn = flt(earnings_map.get(key, 0) if earnings_map else 0)
-				ded = flt(deductions_map.get(key, 0) if deductions_map else 0)
-				house_rent_breakup[key] = {"earnings": earn, "deductions": ded}
-				total = earn + ded
-				return total
-
-			# House Rent (exact name from actual_components, avoid "House Rent Allowance")
-			if actual_components.get("house_rent"):
-				comp_name = actual_components["house_rent"]
-				if "allowance" not in comp_name.lower():
-					house_rent_total += add_component_total(comp_name) or 0
-			
-			# Water Charges
-			if actual_components.get("water"):
-				house_rent_total += add_component_total(actual_components["water"]) or 0
-			
-			# Garbage Maintainence
-			if actual_components.get("garbage"):
-				house_rent_total += add_component_total(actual_components["garbage"]) or 0
-			
-			# Servant Charge
-			if actual_components.get("servant"):
-				house_rent_total += add_component_total(actual_components["servant"]) or 0
-			
-			# Parking Charge
-			if actual_components.get("parking"):
-				house_rent_total += add_component_total(actual_components["parking"]) or 0
-
-			# Log debug info to help diagnose mismatched components/values
+		ledger = ledgers.get(employee)
+		if ledger:
+			employee_name = ledger.employee_name
+		else:
+			employee_name = slips[0].employee_name if slips else ""
+
+		monthly_data = get_month_buckets(
+			employee, employee_name, employee_months[employee], months, actual_components
+		)
+		data.append(get_employee_row(employee, employee_name, monthly_data, months, from_date))
+
+	return columns, data
+
+
+def get_tax_ledgers(filters, fiscal_year, employee_slips):
+	"""
+	Annual Tax Ledgers of the employees whose ledger includes every one of their listed
+	slips. Ledgers only hold submitted slips, so none are used for other statuses.
+	"""
+	if filters.get("docstatus", "Submitted") != "Submitted":
+		return {}
+
+	ledger_filters = {"fiscal_year": fiscal_year, "company": filters.get("company")}
+	if filters.get("employee"):
+		ledger_filters["employee"] = filters["employee"]
+
+	ledgers = frappe.get_all(
+		"Annual Tax Ledger",
+		filters=ledger_filters,
+		fields=["employee", "employee_name", "months", "salary_slips"],
+	)
+	return {
+		ledger.employee: ledger
+		for ledger in ledgers
+		if ledger.employee in employee_slips and ledger.salary_slips == len(employee_slips[ledger.employee])
+	}
+
+
+def get_empty_month():
+	return {bucket: 0.0 for bucket in MONTH_BUCKETS}
+
+
+def get_monthly_data(employee, employee_name, slips, months, ss_earning_map, ss_ded_map, actual_components):
+	"""Bucket totals of each month of the fiscal year, from an employee's Salary Slips."""
+	return get_month_buckets(
+		employee,
+		employee_name,
+		get_slip_months(slips, ss_earning_map, ss_ded_map),
+		months,
+		actual_components,
+	)
+
+
+def get_ledger_monthly_data(ledger, months, actual_components):
+	"""Bucket totals of each month of the fiscal year, from the employee's Annual Tax Ledger."""
+	return get_month_buckets(
+		ledger.employee,
+		ledger.employee_name,
+		frappe.parse_json(ledger.months) or {},
+		months,
+		actual_components,
+	)
+
+
+def get_slip_months(slips, ss_earning_map, ss_ded_map):
+	"""
+	Component amounts of an employee's Salary Slips per month, in the shape stored in
+	the Annual Tax Ledger (see add_to_month).
+	"""
+	slip_months = {}
+	for ss in slips:
+		earnings_map = ss_earning_map.get(ss.name, {})
+		deductions_map = ss_ded_map.get(ss.name, {})
+
+		# Debug: Check if maps are empty
+		if not earnings_map and not deductions_map:
 			frappe.log_error(
-				title="Annual Statement - House Rent Debug",
+				title="Annual Statement - Empty Maps Debug",
 				message=frappe.as_json({
-					"employee": employee,
-					"employee_name": employee_name,
-					"salary_slip": ss.name,
-					"month_key": month_key,
-					"actual_components_house": {
-						"house_rent": actual_components.get("house_rent"),
-						"water": actual_components.get("water"),
-						"garbage": actual_components.get("garbage"),
-						"servant": actual_components.get("servant"),
-						"parking": actual_components.get("parking"),
-					},
-					"house_rent_breakup": house_rent_breakup,
-					"house_rent_total": house_rent_total,
-					"earnings_map_type": str(type(earnings_map)),
-					"deductions_map_type": str(type(deductions_map)),
-					"earnings_keys": list(earnings_map.keys()) if earnings_map else [],
-					"deductions_keys": list(deductions_map.keys()) if deductions_map else [],
-					"direct_access_test": {
-						"House Rent in deductions": deductions_map.get("House Rent", "NOT_FOUND") if deductions_map else "MAP_EMPTY",
-						"Water Charges in deductions": deductions_map.get("Water Charges", "NOT_FOUND") if deductions_map else "MAP_EMPTY",
-					},
+					"employee": ss.employee,
+					"salary_slip_name": ss.name,
+					"available_keys_in_ss_ded_map": list(ss_ded_map.keys())[:10],  # First 10 keys
+					"available_keys_in_ss_earning_map": list(ss_earning_map.keys())[:10],  # First 10 keys
 				})
 			)
 
-			monthly_data[month_key]["house_rent"] += house_rent_total
+		add_to_month(
+			slip_months,
+			get_month_key(ss.start_date),
+			earnings_map,
+			deductions_map,
+			ss.current_month_income_tax,
+		)
+
+	return slip_months
+
+
+def add_to_month(months, month_key, earnings_map, deductions_map, income_tax, sign=1):
+	"""
+	Add (sign=1) or subtract (sign=-1) one Salary Slip's component amounts to its month.
+
+	A month is {"earnings": {component: amount}, "deductions": {component: amount},
+	"current_month_income_tax": amount}. Components subtracted down to zero are removed,
+	so a cancelled slip's components no longer take part in get_actual_component_names.
+	"""
+	month = months.setdefault(month_key, {})
+	for part, component_map in (("earnings", earnings_map), ("deductions", deductions_map)):
+		totals = month.setdefault(part, {})
+		for component, amount in component_map.items():
+			totals[component] = flt(flt(totals.get(component)) + sign * flt(amount), 2)
+			if sign < 0 and not totals[component]:
+				del totals[component]
+
+	# Current month income tax, summed over the month's slips
+	month["current_month_income_tax"] = flt(
+		flt(month.get("current_month_income_tax")) + sign * flt(income_tax), 2
+	)
+
+
+def get_report_component_names(employee_months):
+	"""
+	Bucket -> component name (see get_actual_component_names) over every component of
+	every employee's months, so slip details and ledgers are mapped the same way.
+	"""
+	entries, earning_maps, deduction_maps = [], {}, {}
+	for employee, component_months in employee_months.items():
+		for month_key, month in component_months.items():
+			key = f"{employee}:{month_key}"
+			entries.append(frappe._dict(name=key))
+			earning_maps[key] = month.get("earnings") or {}
+			deduction_maps[key] = month.get("deductions") or {}
+
+	return get_actual_component_names(entries, earning_maps, deduction_maps)
+
+
+def get_month_buckets(employee, employee_name, component_months, months, actual_components):
+	"""Bucket totals of each month of the fiscal year, from the component amounts of each month."""
+	monthly_data = {month_key: get_empty_month() for month_key in months}
+
+	for month_key, month in component_months.items():
+		if month_key not in monthly_data:
+			continue
+
+		earnings_map = month.get("earnings") or {}
+		deductions_map = month.get("deductions") or {}
+
+		house_rent_breakup = {}
+		buckets = get_slip_buckets(earnings_map, deductions_map, actual_components, house_rent_breakup)
+
+		# Log debug info to help diagnose mismatched components/values
+		frappe.log_error(
+			title="Annual Statement - House Rent Debug",
+			message=frappe.as_json({
+				"employee": employee,
+				"employee_name": employee_name,
+				"month_key": month_key,
+				"actual_components_house": {
+					"house_rent": actual_components.get("house_rent"),
+					"water": actual_components.get("water"),
+					"garbage": actual_components.get("garbage"),
+					"servant": actual_components.get("servant"),
+					"parking": actual_components.get("parking"),
+				},
+				"house_rent_breakup": house_rent_breakup,
+				"house_rent_total": buckets["house_rent"],
+				"earnings_map_type": str(type(earnings_map)),
+				"deductions_map_type": str(type(deductions_map)),
+				"earnings_keys": list(earnings_map.keys()) if earnings_map else [],
+				"deductions_keys": list(deductions_map.keys()) if deductions_map else [],
+				"direct_access_test": {
+					"House Rent in deductions": deductions_map.get("House Rent", "NOT_FOUND") if deductions_map else "MAP_EMPTY",
+					"Water Charges in deductions": deductions_map.get("Water Charges", "NOT_FOUND") if deductions_map else "MAP_EMPTY",
+				},
+			})
+		)
 
-			# Grinsur = Group Insurance
-			grinsur = get_component_amount(deductions_map, ["Group Insurance", "Group Ins", "Grinsur", "Group Insur"])
-			monthly_data[month_key]["grinsur"] += grinsur
+		for bucket in SLIP_BUCKETS:
+			monthly_data[month_key][bucket] = buckets[bucket]
 
-			# LIC = LIC
-			lic = get_component_amount(deductions_map, ["LIC", "Life Insurance", "Life Insurance Corporation"])
-			monthly_data[month_key]["lic"] += lic
+		monthly_data[month_key]["current_month_income_tax"] = flt(month.get("current_month_income_tax"))
 
-			# MPF = Provident Fund - Employee Contribution
-			mpf = get_component_amount(deductions_map, [
-				"Provident Fund - Employee Contribution",
-				"PF - Employee Contribution",
-				"PF Employee Contribution",
-				"Provident Fund Employee",
-			])
-			monthly_data[month_key]["mpf"] += mpf
+	return monthly_data
 
-			# Current month income tax
-			monthly_data[month_key]["current_month_income_tax"] = flt(ss.current_month_income_tax or 0)
 
-		# FixAll = 40 for all months if we have at least one salary slip
-		if slips:
-			for month_key in monthly_data.keys():
-				monthly_data[month_key]["fixall"] = 40.0
+def get_slip_buckets(earnings_map, deductions_map, actual_components, house_rent_breakup=None):
+	"""
+	Amounts of one Salary Slip per statement bucket (SLIP_BUCKETS).
 
-		# Find ANY month with data and copy to all months
-		# Prefer a month that has house_rent > 0 (so we don't lose it), else basic > 0, else any data
-		source_month = None
+	Args:
+		earnings_map (dict): Earning component -> amount of the slip
+		deductions_map (dict): Deduction component -> amount of the slip
+		actual_components (dict): Bucket -> component name, see get_actual_component_names
+		house_rent_breakup (dict, optional): Filled with the amounts added to house_rent
+	"""
+	if house_rent_breakup is None:
+		house_rent_breakup = {}
 
-		# 1) Prefer month with house_rent > 0
+	# Basic - use actual component name if found
+	if actual_components.get("basic"):
+		basic = flt(earnings_map.get(actual_components["basic"], 0))
+	else:
+		basic = get_component_amount(earnings_map, ["Basic Salary", "Basic", "BASIC"])
+
+	# DA = Dearness Allowences - use actual component name if found
+	if actual_components.get("da"):
+		da = flt(earnings_map.get(actual_components["da"], 0))
+	else:
+		da = get_component_amount(earnings_map, ["Dearness Allowences", "Dearness Allowence", "DA", "D.A.", "Dearness"])
+
+	# TA = Travel Allowences - use actual component name if found
+	if actual_components.get("ta"):
+		ta = flt(earnings_map.get(actual_components["ta"], 0))
+	else:
+		ta = get_component_amount(earnings_map, ["Travel Allowences", "Travel Allowence", "TA", "T.A.", "Travel"])
+
+	# House Rent = House Rent + Water Charges + Garbage Maintainence + Servant Charge + Parking Charge
+	# Use exact component names from actual_components (found from database)
+	house_rent_total = 0.0
+
+	def add_component_total(key):
+		"""Add earnings + deductions for a component and store debug info."""
+		if not key:
+			return 0.0
+		# Access maps directly - frappe._dict supports .get()
+		earn = flt(earnings_map.get(key, 0) if earnings_map else 0)
+		ded = flt(deductions_map.get(key, 0) if deductions_map else 0)
+		house_rent_breakup[key] = {"earnings": earn, "deductions": ded}
+		total = earn + ded
+		return total
+
+	# House Rent (exact name from actual_components, avoid "House Rent Allowance")
+	if actual_components.get("house_rent"):
+		comp_name = actual_components["house_rent"]
+		if "allowance" not in comp_name.lower():
+			house_rent_total += add_component_total(comp_name) or 0
+
+	# Water Charges, Garbage Maintainence, Servant Charge, Parking Charge
+	for key in ("water", "garbage", "servant", "parking"):
+		if actual_components.get(key):
+			house_rent_total += add_component_total(actual_components[key]) or 0
+
+	return {
+		"basic": basic,
+		"da": da,
+		"ta": ta,
+		"house_rent": house_rent_total,
+		# Grinsur = Group Insurance
+		"grinsur": get_component_amount(deductions_map, ["Group Insurance", "Group Ins", "Grinsur", "Group Insur"]),
+		# LIC = LIC
+		"lic": get_component_amount(deductions_map, ["LIC", "Life Insurance", "Life Insurance Corporation"]),
+		# MPF = Provident Fund - Employee Contribution
+		"mpf": get_component_amount(deductions_map, [
+			"Provident Fund - Employee Contribution",
+			"PF - Employee Contribution",
+			"PF Employee Contribution",
+			"Provident Fund Employee",
+		]),
+	}
+
+
+def get_employee_row(employee, employee_name, monthly_data, months, from_date):
+	"""Statement row of an employee: projected totals, tax and the monthly columns."""
+	# FixAll = 40 for all months (every listed employee has at least one salary slip)
+	for month_key in monthly_data.keys():
+		monthly_data[month_key]["fixall"] = 40.0
+
+	# Find ANY month with data and copy to all months
+	# Prefer a month that has house_rent > 0 (so we don't lose it), else basic > 0, else any data
+	source_month = None
+
+	# 1) Prefer month with house_rent > 0
+	for month_key, month_data in monthly_data.items():
+		if month_data["house_rent"] > 0:
+			source_month = month_key
+			break
+
+	# 2) Else month with basic > 0
+	if not source_month:
 		for month_key, month_data in monthly_data.items():
-			if month_data["house_rent"] > 0:
+			if month_data["basic"] > 0:
 				source_month = month_key
 				break
-
-		# 2) Else month with basic > 0
-		if not source_month:
-			for month_key, month_data in monthly_data.items():
-				if month_data["basic"] > 0:
-					source_month = month_key
-					break
-		
-		# 3) Else any month with any data
-		if not source_month:
-			for month_key, month_data in monthly_data.items():
-				if (month_data["basic"] > 0 or month_data["da"] > 0 or month_data["ta"] > 0 or
-					month_data["house_rent"] > 0 or month_data["grinsur"] > 0 or 
-					month_data["lic"] > 0 or month_data["mpf"] > 0):
-					source_month = month_key
-					break
-		
-		# If we found a month with data, copy its data to ALL months
-		if source_month:
-			source_data = monthly_data[source_month]
-			# Calculate totals for source month
-			source_data["total"] = (
-				source_data["basic"] + source_data["da"] + source_data["fixall"] +
-				source_data["ta"] + source_data["house_rent"]
-			)
-			source_data["savings_total"] = (
-				source_data["grinsur"] + source_data["lic"] + source_data["mpf"]
-			)
-			
-			# Copy to ALL months (including source month to ensure consistency)
-			for month_key in monthly_data.keys():
-				monthly_data[month_key]["basic"] = source_data["basic"]
-				monthly_data[month_key]["da"] = source_data["da"]
-				monthly_data[month_key]["ta"] = source_data["ta"]
-				monthly_data[month_key]["house_rent"] = source_data["house_rent"]
-				monthly_data[month_key]["grinsur"] = source_data["grinsur"]
-				monthly_data[month_key]["lic"] = source_data["lic"]
-				monthly_data[month_key]["mpf"] = source_data["mpf"]
-				# FixAll is already set to 40 for all
-				# Copy monthly totals
-				monthly_data[month_key]["total"] = source_data["total"]
-				monthly_data[month_key]["savings_total"] = source_data["savings_total"]
-
-		# Calculate totals and summary
-		# If we copied data, multiply by 12 (number of months)
-		if source_month:
-			source_data = monthly_data[source_month]
-			total_basic = flt(source_data["basic"] * 12, 2)
-			total_da = flt(source_data["da"] * 12, 2)
-			total_fixall = flt(source_data["fixall"] * 12, 2)
-			total_ta = flt(source_data["ta"] * 12, 2)
-			total_house_rent = flt(source_data["house_rent"] * 12, 2)
-			total_grinsur = flt(source_data["grinsur"] * 12, 2)
-			total_lic = flt(source_data["lic"] * 12, 2)
-			total_mpf = flt(source_data["mpf"] * 12, 2)
-		else:
-			total_basic = sum(m["basic"] for m in monthly_data.values())
-			total_da = sum(m["da"] for m in monthly_data.values())
-			total_fixall = sum(m["fixall"] for m in monthly_data.values())
-			total_ta = sum(m["ta"] for m in monthly_data.values())
-			total_house_rent = sum(m["house_rent"] for m in monthly_data.values())
-			total_grinsur = sum(m["grinsur"] for m in monthly_data.values())
-			total_lic = sum(m["lic"] for m in monthly_data.values())
-			total_mpf = sum(m["mpf"] for m in monthly_data.values())
-
-		total_earnings = total_basic + total_da + total_fixall + total_ta + total_house_rent
-		
-		# Less Std Dedn = 50000 for all
-		less_std_dedn = 50000.0
+	
+	# 3) Else any month with any data
+	if not source_month:
+		for month_key, month_data in monthly_data.items():
+			if (month_data["basic"] > 0 or month_data["da"] > 0 or month_data["ta"] > 0 or
+				month_data["house_rent"] > 0 or month_data["grinsur"] > 0 or 
+				month_data["lic"] > 0 or month_data["mpf"] > 0):
+				source_month = month_key
+				break
+	
+	# If we found a month with data, copy its data to ALL months
+	if source_month:
+		source_data = monthly_data[source_month]
+		# Calculate totals for source month
+		source_data["total"] = (
+			source_data["basic"] + source_data["da"] + source_data["fixall"] +
+			source_data["ta"] + source_data["house_rent"]
+		)
+		source_data["savings_total"] = (
+			source_data["grinsur"] + source_data["lic"] + source_data["mpf"]
+		)
 		
-		# IncomeSal head = total - less std dedn
-		income_sal_head = total_earnings - less_std_dedn
+		# Copy to ALL months (including source month to ensure consistency)
+		for month_key in monthly_data.keys():
+			monthly_data[month_key]["basic"] = source_data["basic"]
+			monthly_data[month_key]["da"] = source_data["da"]
+			monthly_data[month_key]["ta"] = source_data["ta"]
+			monthly_data[month_key]["house_rent"] = source_data["house_rent"]
+			monthly_data[month_key]["grinsur"] = source_data["grinsur"]
+			monthly_data[month_key]["lic"] = source_data["lic"]
+			monthly_data[month_key]["mpf"] = source_data["mpf"]
+			# FixAll is already set to 40 for all
+			# Copy monthly totals
+			monthly_data[month_key]["total"] = source_data["total"]
+			monthly_data[month_key]["savings_total"] = source_data["savings_total"]
+
+	# Calculate totals and summary
+	# If we copied data, multiply by 12 (number of months)
+	if source_month:
+		source_data = monthly_data[source_month]
+		total_basic = flt(source_data["basic"] * 12, 2)
+		total_da = flt(source_data["da"] * 12, 2)
+		total_fixall = flt(source_data["fixall"] * 12, 2)
+		total_ta = flt(source_data["ta"] * 12, 2)
+		total_house_rent = flt(source_data["house_rent"] * 12, 2)
+		total_grinsur = flt(source_data["grinsur"] * 12, 2)
+		total_lic = flt(source_data["lic"] * 12, 2)
+		total_mpf = flt(source_data["mpf"] * 12, 2)
+	else:
+		total_basic = sum(m["basic"] for m in monthly_data.values())
+		total_da = sum(m["da"] for m in monthly_data.values())
+		total_fixall = sum(m["fixall"] for m in monthly_data.values())
+		total_ta = sum(m["ta"] for m in monthly_data.values())
+		total_house_rent = sum(m["house_rent"] for m in monthly_data.values())
+		total_grinsur = sum(m["grinsur"] for m in monthly_data.values())
+		total_lic = sum(m["lic"] for m in monthly_data.values())
+		total_mpf = sum(m["mpf"] for m in monthly_data.values())
+
+	total_earnings = total_basic + total_da + total_fixall + total_ta + total_house_rent
+	
+	# Less Std Dedn = 50000 for all
+	less_std_dedn = 50000.0
+	
+	# IncomeSal head = total - less std dedn
+	income_sal_head = total_earnings - less_std_dedn
 
-		# Total savings = Grinsur + LIC + MPF
-		total_savings = total_grinsur + total_lic + total_mpf
+	# Total savings = Grinsur + LIC + MPF
+	total_savings = total_grinsur + total_lic + total_mpf
 
-		# Qualifying amount = total savings with limit of 150000
-		qualifying_amt = min(total_savings, 150000.0)
+	# Qualifying amount = total savings with limit of 150000
+	qualifying_amt = min(total_savings, 150000.0)
 
-		# Taxable income = IncomeSal head - Qualifying amount
-		taxable_income = income_sal_head - qualifying_amt
+	# Taxable income = IncomeSal head - Qualifying amount
+	taxable_income = income_sal_head - qualifying_amt
 
-		# Get current month (use source month if we copied data, otherwise find last month with data)
-		current_month_key = source_month if source_month else None
-		if not current_month_key:
-			for month_key in sorted(monthly_data.keys(), reverse=True):
-				if monthly_data[month_key]["basic"] > 0:
-					current_month_key = month_key
-					break
+	# Get current month (use source month if we copied data, otherwise find last month with data)
+	current_month_key = source_month if source_month else None
+	if not current_month_key:
+		for month_key in sorted(monthly_data.keys(), reverse=True):
+			if monthly_data[month_key]["basic"] > 0:
+				current_month_key = month_key
+				break
 
-		# Calculate months passed from April to current month
-		if current_month_key:
-			months_passed = get_months_passed(from_date, current_month_key)
+	# Calculate months passed from April to current month
+	if current_month_key:
+		months_passed = get_months_passed(from_date, current_month_key)
+	else:
+		months_passed = 12
+
+	# Tax payable = 12 * current_month_income_tax (from source month or last month with data)
+	# Get the tax from the source month (the one we found with data)
+	if source_month:
+		current_month_tax = monthly_data[source_month].get("current_month_income_tax", 0.0)
+	elif current_month_key:
+		current_month_tax = monthly_data[current_month_key].get("current_month_income_tax", 0.0)
+	else:
+		current_month_tax = 0.0
+	
+	tax_payable = flt(current_month_tax * 12, 2)
+
+	# Itax paid = months_passed (from April to current month) * current_month_income_tax
+	itax_paid = flt(months_passed * current_month_tax, 2)
+
+	# Bal to pay = tax payable - itax paid
+	bal_to_pay = flt(tax_payable - itax_paid, 2)
+
+	# New Mly Dedn = bal to pay / remaining months in FY
+	remaining_months = max(1, 12 - months_passed)
+	new_mly_dedn = flt(bal_to_pay / remaining_months, 2)
+
+	# Build row data
+	row = {
+		"employee": employee,
+		"employee_name": employee_name,
+		"total_basic": total_basic,
+		"total_da": total_da,
+		"total_fixall": total_fixall,
+		"total_ta": total_ta,
+		"total_house_rent": total_house_rent,
+		"total_earnings": total_earnings,
+		"less_std_dedn": less_std_dedn,
+		"income_sal_head": income_sal_head,
+		"total_grinsur": total_grinsur,
+		"total_lic": total_lic,
+		"total_mpf": total_mpf,
+		"total_savings": total_savings,
+		"qualifying_amt": qualifying_amt,
+		"taxable_income": taxable_income,
+		"tax_payable": tax_payable,
+		"itax_paid": itax_paid,
+		"bal_to_pay": bal_to_pay,
+		"new_mly_dedn": new_mly_dedn,
+		"_months_data": monthly_data,  # Store monthly data for HTML template
+		"_months_keys": list(months.keys()),  # Store month keys in order
+	}
+
+	# Add monthly data as separate fields for easier access in HTML
+	for month_key, month_label in months.items():
+		month_data = monthly_data.get(month_key, {})
+		row[f"basic_{month_key}"] = month_data.get("basic", 0.0)
+		row[f"da_{month_key}"] = month_data.get("da", 0.0)
+		row[f"fixall_{month_key}"] = month_data.get("fixall", 0.0)
+		row[f"ta_{month_key}"] = month_data.get("ta", 0.0)
+		row[f"house_rent_{month_key}"] = month_data.get("house_rent", 0.0)
+		# Use pre-calculated total if available, otherwise calculate
+		if "total" in month_data:
+			row[f"total_{month_key}"] = month_data.get("total", 0.0)
 		else:
-			months_passed = 12
-
-		# Tax payable = 12 * current_month_income_tax (from source month or last month with data)
-		# Get the tax from the source month (the one we found with data)
-		if source_month:
-			current_month_tax = monthly_data[source_month].get("current_month_income_tax", 0.0)
-		elif current_month_key:
-			current_month_tax = monthly_data[current_month_key].get("current_month_income_tax", 0.0)
+			row[f"total_{month_key}"] = (
+				month_data.get("basic", 0.0) +
+				month_data.get("da", 0.0) +
+				month_data.get("fixall", 0.0) +
+				month_data.get("ta", 0.0) +
+				month_data.get("house_rent", 0.0)
+			)
+		row[f"grinsur_{month_key}"] = month_data.get("grinsur", 0.0)
+		row[f"lic_{month_key}"] = month_data.get("lic", 0.0)
+		row[f"mpf_{month_key}"] = month_data.get("mpf", 0.0)
+		# Use pre-calculated savings_total if available
+		if "savings_total" in month_data:
+			row[f"savings_total_{month_key}"] = month_data.get("savings_total", 0.0)
 		else:
-			current_month_tax = 0.0
-		
-		tax_payable = flt(current_month_tax * 12, 2)
-
-		# Itax paid = months_passed (from April to current month) * current_month_income_tax
-		itax_paid = flt(months_passed * current_month_tax, 2)
-
-		# Bal to pay = tax payable - itax paid
-		bal_to_pay = flt(tax_payable - itax_paid, 2)
-
-		# New Mly Dedn = bal to pay / remaining months in FY
-		remaining_months = max(1, 12 - months_passed)
-		new_mly_dedn = flt(bal_to_pay / remaining_months, 2)
-
-		# Build row data
-		row = {
-			"employee": employee,
-			"employee_name": employee_name,
-			"total_basic": total_basic,
-			"total_da": total_da,
-			"total_fixall": total_fixall,
-			"total_ta": total_ta,
-			"total_house_rent": total_house_rent,
-			"total_earnings": total_earnings,
-			"less_std_dedn": less_std_dedn,
-			"income_sal_head": income_sal_head,
-			"total_grinsur": total_grinsur,
-			"total_lic": total_lic,
-			"total_mpf": total_mpf,
-			"total_savings": total_savings,
-			"qualifying_amt": qualifying_amt,
-			"taxable_income": taxable_income,
-			"tax_payable": tax_payable,
-			"itax_paid": itax_paid,
-			"bal_to_pay": bal_to_pay,
-			"new_mly_dedn": new_mly_dedn,
-			"_months_data": monthly_data,  # Store monthly data for HTML template
-			"_months_keys": list(months.keys()),  # Store month keys in order
-		}
-
-		# Add monthly data as separate fields for easier access in HTML
-		for month_key, month_label in months.items():
-			month_data = monthly_data.get(month_key, {})
-			row[f"basic_{month_key}"] = month_data.get("basic", 0.0)
-			row[f"da_{month_key}"] = month_data.get("da", 0.0)
-			row[f"fixall_{month_key}"] = month_data.get("fixall", 0.0)
-			row[f"ta_{month_key}"] = month_data.get("ta", 0.0)
-			row[f"house_rent_{month_key}"] = month_data.get("house_rent", 0.0)
-			# Use pre-calculated total if available, otherwise calculate
-			if "total" in month_data:
-				row[f"total_{month_key}"] = month_data.get("total", 0.0)
-			else:
-				row[f"total_{month_key}"] = (
-					month_data.get("basic", 0.0) +
-					month_data.get("da", 0.0) +
-					month_data.get("fixall", 0.0) +
-					month_data.get("ta", 0.0) +
-					month_data.get("house_rent", 0.0)
-				)
-			row[f"grinsur_{month_key}"] = month_data.get("grinsur", 0.0)
-			row[f"lic_{month_key}"] = month_data.get("lic", 0.0)
-			row[f"mpf_{month_key}"] = month_data.get("mpf", 0.0)
-			# Use pre-calculated savings_total if available
-			if "savings_total" in month_data:
-				row[f"savings_total_{month_key}"] = month_data.get("savings_total", 0.0)
-			else:
-				row[f"savings_total_{month_key}"] = (
-					month_data.get("grinsur", 0.0) +
-					month_data.get("lic", 0.0) +
-					month_data.get("mpf", 0.0)
-				)
-
-		data.append(row)
+			row[f"savings_total_{month_key}"] = (
+				month_data.get("grinsur", 0.0) +
+				month_data.get("lic", 0.0) +
+				month_data.get("mpf", 0.0)
+			)
 
-	return columns, data
+	return row
 
 
 def get_actual_component_names(salary_slips, ss_earning_map, ss_ded_map):
@@ -679,11 +817,12 @@ def get_salary_slips(filters, from_date, to_date):
 
 
 def get_salary_slip_details(salary_slips, component_type):
+	detail_table = get_detail_table("Salary Detail", salary_slips)
 	salary_slips = [ss.name for ss in salary_slips]
 
 	result = (
 		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
+		.join(detail_table)
 		.on(salary_slip.name == salary_detail.parent)
 		.where(
 			(salary_detail.parent.isin(salary_slips))
@@ -2,10 +2,15 @@ import frappe
 from frappe import _
 from frappe.utils import flt
 
+from gvm_payroll.gvm_payroll.report.report_utils import get_detail_table, replica_report
+from gvm_payroll.instrumentation import instrumented_report
+
 salary_slip = frappe.qb.DocType("Salary Slip")
 salary_detail = frappe.qb.DocType("Salary Detail")
 
 
+@replica_report(use_replica=False)
+@instrumented_report
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -85,11 +90,12 @@ def get_salary_slips(filters):
 
 
 def get_salary_slip_details(salary_slips, component_type):
+	detail_table = get_detail_table("Salary Detail", salary_slips)
 	salary_slips = [ss.name for ss in salary_slips]
 
 	result = (
 		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
+		.join(detail_table)
 		.on(salary_slip.name == salary_detail.parent)
 		.where(
 			(salary_detail.parent.isin(salary_slips))
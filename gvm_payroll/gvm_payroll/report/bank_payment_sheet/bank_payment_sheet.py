@@ -2,10 +2,15 @@ import frappe
 from frappe import _
 from frappe.utils import flt, getdate, nowdate
 
+from gvm_payroll.gvm_payroll.report.report_utils import get_detail_table, replica_report
+from gvm_payroll.instrumentation import instrumented_report
+
 salary_slip = frappe.qb.DocType("Salary Slip")
 salary_detail = frappe.qb.DocType("Salary Detail")
 
 
+@replica_report(use_replica=False)
+@instrumented_report
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -107,8 +112,10 @@ def get_columns(earning_types, ded_types):
 
 
 def get_salary_components(salary_slips):
+	detail_table = get_detail_table("Salary Detail", salary_slips)
+
 	return (
-		frappe.qb.from_(salary_detail)
+		frappe.qb.from_(detail_table)
 		.where((salary_detail.amount != 0) & (salary_detail.parent.isin([d.name for d in salary_slips])))
 		.select(salary_detail.salary_component)
 		.distinct()
@@ -155,11 +162,12 @@ def get_salary_slips(filters):
 
 
 def get_salary_slip_details(salary_slips, component_type):
+	detail_table = get_detail_table("Salary Detail", salary_slips)
 	salary_slips = [ss.name for ss in salary_slips]
 
 	result = (
 		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
+		.join(detail_table)
 		.on(salary_slip.name == salary_detail.parent)
 		.where((salary_detail.parent.isin(salary_slips)) & (salary_detail.parentfield == component_type))
 		.select(
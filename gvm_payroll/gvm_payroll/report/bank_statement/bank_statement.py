@@ -1,7 +1,12 @@
 import frappe
 from frappe.utils import getdate, nowdate
 
+from gvm_payroll.gvm_payroll.report.report_utils import replica_report
+from gvm_payroll.instrumentation import instrumented_report
 
+
+@replica_report
+@instrumented_report
 def execute(filters=None):
 	filters = filters or {}
 
@@ -4,10 +4,17 @@ from frappe.utils import flt, getdate, formatdate
 from datetime import datetime
 import erpnext
 
+from gvm_payroll.gvm_payroll.report.report_utils import get_detail_table, replica_report
+from gvm_payroll.instrumentation import instrumented_report
+from gvm_payroll.profiling import mark_phase, profiled_report
+
 salary_slip = frappe.qb.DocType("Salary Slip")
 salary_detail = frappe.qb.DocType("Salary Detail")
 
 
+@replica_report
+@instrumented_report
+@profiled_report
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -23,10 +30,14 @@ def execute(filters=None):
 	if not salary_slips:
 		return [], []
 
+	mark_phase("fetch_details")
+
 	# Aggregate earnings and deductions by component
 	earnings = aggregate_components(salary_slips, "earnings", currency, company_currency)
 	deductions = aggregate_components(salary_slips, "deductions", currency, company_currency)
 
+	mark_phase("build_rows")
+
 	# Sort components alphabetically
 	earnings_sorted = dict(sorted(earnings.items()))
 	deductions_sorted = dict(sorted(deductions.items()))
@@ -170,11 +181,12 @@ def get_salary_slips(filters):
 
 def aggregate_components(salary_slips, component_type, currency, company_currency):
 	"""Aggregate salary components across all salary slips"""
+	detail_table = get_detail_table("Salary Detail", salary_slips)
 	salary_slip_names = [ss.name for ss in salary_slips]
 
 	result = (
 		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
+		.join(detail_table)
 		.on(salary_slip.name == salary_detail.parent)
 		.where(
 			(salary_detail.parent.isin(salary_slip_names))
@@ -8,8 +8,17 @@ This module contains common functions used across multiple reports to avoid code
 and ensure consistent behavior.
 """
 
+from contextlib import contextmanager
+from functools import wraps
+
 import frappe
-from frappe.utils import flt
+from frappe.utils import flt, getdate
+
+from gvm_payroll.gvm_payroll.api.salary_archive import (
+	get_archive_columns,
+	get_archive_table,
+	get_archived_until,
+)
 
 # Define DocTypes for query builder
 salary_slip = frappe.qb.DocType("Salary Slip")
@@ -17,6 +26,93 @@ salary_detail = frappe.qb.DocType("Salary Detail")
 internal_salary_detail = frappe.qb.DocType("Internal Salary Details")
 
 
+def replica_report(fn=None, *, use_replica=True):
+	"""
+	Let a script report opt out of the read replica.
+
+	Reports opened from the desk already run on the replica when the site has one
+	(`read_from_replica` and `replica_host` in site config): frappe.desk.query_report.run
+	is @frappe.read_only(). What this adds is the way back: reports that must see writes
+	made just before they run opt out with @replica_report(use_replica=False), or per site
+	by listing them in `gvm_payroll_primary_reports`, and are then switched to the primary.
+	Only a direct call to execute, outside query_report.run, is routed to the replica here.
+
+	Put it above @instrumented_report so the queries are counted on the connection they
+	run on.
+	"""
+
+	def decorator(fn):
+		report = fn.__module__.rsplit(".", 1)[-1]
+
+		@wraps(fn)
+		def execute(filters=None):
+			if not use_replica or report in (frappe.conf.get("gvm_payroll_primary_reports") or []):
+				with on_primary():
+					return fn(filters)
+
+			# Already on the replica when called from query_report.run
+			if not frappe.conf.get("read_from_replica") or is_on_replica():
+				return fn(filters)
+
+			return frappe.read_only()(fn)(filters)
+
+		return execute
+
+	return decorator(fn) if fn else decorator
+
+
+def is_on_replica():
+	primary = getattr(frappe.local, "primary_db", None)
+	return primary is not None and frappe.local.db is not primary
+
+
+@contextmanager
+def on_primary():
+	"""Run the block on the primary connection if the request is on the replica."""
+	if not is_on_replica():
+		yield
+		return
+
+	replica = frappe.local.db
+	frappe.local.db = frappe.local.primary_db
+	try:
+		yield
+	finally:
+		frappe.local.db = replica
+
+
+def get_detail_table(doctype, salary_slips):
+	"""
+	Table to read the Salary Detail or Internal Salary Details rows of `salary_slips` from.
+
+	This is the live table, unless some of the slips ended before the date the rows are
+	archived up to (see gvm_payroll.gvm_payroll.api.salary_archive). It is then the
+	UNION ALL of the slips' live and archived rows, aliased as the live table so the
+	fields of the query still apply.
+
+	Args:
+		doctype (str): "Salary Detail" or "Internal Salary Details"
+		salary_slips (list): Salary Slips with `name` and `end_date`
+	"""
+	archived_until = get_archived_until()
+	if not archived_until or all(getdate(ss.end_date) >= archived_until for ss in salary_slips):
+		return frappe.qb.DocType(doctype)
+
+	names = [ss.name for ss in salary_slips]
+	columns = get_archive_columns(doctype)
+
+	def select_rows(table):
+		return (
+			frappe.qb.from_(table)
+			.select(*columns)
+			.where((table.parenttype == "Salary Slip") & (table.parent.isin(names)))
+		)
+
+	live = select_rows(frappe.qb.DocType(doctype))
+	archive = select_rows(frappe.qb.Table(get_archive_table(doctype)))
+	return live.union_all(archive).as_(f"tab{doctype}")
+
+
 def get_internal_salary_details(
 	salary_slips,
 	exclude_components=None,
@@ -70,12 +166,13 @@ def get_internal_salary_details(
 	if not salary_slips:
 		return {}
 
+	detail_table = get_detail_table("Internal Salary Details", salary_slips)
 	salary_slips_names = [ss.name for ss in salary_slips]
 
 	# Build base query
 	query = (
 		frappe.qb.from_(salary_slip)
-		.join(internal_salary_detail)
+		.join(detail_table)
 		.on(salary_slip.name == internal_salary_detail.parent)
 		.where(
 			(internal_salary_detail.parent.isin(salary_slips_names))
@@ -127,11 +224,12 @@ def get_salary_slip_details(salary_slips, component_type):
 	if not salary_slips:
 		return {}
 
+	detail_table = get_detail_table("Salary Detail", salary_slips)
 	salary_slips_names = [ss.name for ss in salary_slips]
 
 	result = (
 		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
+		.join(detail_table)
 		.on(salary_slip.name == salary_detail.parent)
 		.where(
 			(salary_detail.parent.isin(salary_slips_names))
@@ -4,11 +4,18 @@ from frappe.utils import flt
 
 import erpnext
 
+from gvm_payroll.gvm_payroll.report.report_utils import get_detail_table, replica_report
+from gvm_payroll.instrumentation import instrumented_report
+from gvm_payroll.profiling import mark_phase, profiled_report
+
 
 salary_slip = frappe.qb.DocType("Salary Slip")
 salary_detail = frappe.qb.DocType("Salary Detail")
 
 
+@replica_report
+@instrumented_report
+@profiled_report
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -24,6 +31,8 @@ def execute(filters=None):
 	if not salary_slips:
 		return [], []
 
+	mark_phase("fetch_details")
+
 	earning_types, ded_types = get_earning_and_deduction_types(salary_slips)
 	columns = get_columns(earning_types, ded_types)
 
@@ -32,6 +41,8 @@ def execute(filters=None):
 
 	doj_map = get_employee_doj_map()
 
+	mark_phase("build_rows")
+
 	data = []
 	for ss in salary_slips:
 		row = {
@@ -243,8 +254,10 @@ def get_columns(earning_types, ded_types):
 
 
 def get_salary_components(salary_slips):
+	detail_table = get_detail_table("Salary Detail", salary_slips)
+
 	return (
-		frappe.qb.from_(salary_detail)
+		frappe.qb.from_(detail_table)
 		.where((salary_detail.amount != 0) & (salary_detail.parent.isin([d.name for d in salary_slips])))
 		.select(salary_detail.salary_component)
 		.distinct()
@@ -299,11 +312,12 @@ def get_employee_doj_map():
 
 
 def get_salary_slip_details(salary_slips, currency, company_currency, component_type):
+	detail_table = get_detail_table("Salary Detail", salary_slips)
 	salary_slips = [ss.name for ss in salary_slips]
 
 	result = (
 		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
+		.join(detail_table)
 		.on(salary_slip.name == salary_detail.parent)
 		.where((salary_detail.parent.isin(salary_slips)) & (salary_detail.parentfield == component_type))
 		.select(
@@ -6,12 +6,16 @@ from frappe import _
 from frappe.utils import flt, getdate, formatdate
 from gvm_payroll.gvm_payroll.report.report_utils import (
 	get_internal_salary_details,
-	get_salary_slip_details
+	get_salary_slip_details,
+	replica_report,
 )
+from gvm_payroll.instrumentation import instrumented_report
 
 salary_slip = frappe.qb.DocType("Salary Slip")
 
 
+@replica_report
+@instrumented_report
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -5,11 +5,16 @@ import frappe
 from frappe import _
 from frappe.utils import flt
 
+from gvm_payroll.gvm_payroll.report.report_utils import get_detail_table, replica_report
+from gvm_payroll.instrumentation import instrumented_report
+
 salary_slip = frappe.qb.DocType("Salary Slip")
 salary_detail = frappe.qb.DocType("Salary Detail")
 salary_component = frappe.qb.DocType("Salary Component")
 
 
+@replica_report
+@instrumented_report
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -284,6 +289,7 @@ def get_salary_slips(filters):
 
 def get_component_by_report_type(salary_slips):
 	"""Get salary components grouped by custom_report_type for each salary slip"""
+	detail_table = get_detail_table("Salary Detail", salary_slips)
 	salary_slip_names = [ss.name for ss in salary_slips]
 
 	if not salary_slip_names:
@@ -292,7 +298,7 @@ def get_component_by_report_type(salary_slips):
 	# Query to get salary detail with component report type
 	result = (
 		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
+		.join(detail_table)
 		.on(salary_slip.name == salary_detail.parent)
 		.join(salary_component)
 		.on(salary_detail.salary_component == salary_component.name)
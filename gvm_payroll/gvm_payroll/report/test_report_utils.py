@@ -0,0 +1,62 @@
+# Copyright (c) 2026, Samuael Ketema and Contributors
+# See license.txt
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from gvm_payroll.gvm_payroll.report.report_utils import is_on_replica, replica_report
+
+
+def get_connection():
+	return frappe.db.sql("select @@hostname, @@port")[0]
+
+
+@replica_report
+def execute(filters=None):
+	return [], [get_connection()]
+
+
+@replica_report(use_replica=False)
+def execute_on_primary(filters=None):
+	return [], [get_connection()]
+
+
+class TestReplicaReport(FrappeTestCase):
+	def test_runs_in_place_without_replica(self):
+		with patch.dict(frappe.conf, {"read_from_replica": 0}):
+			self.assertEqual(execute({})[1], [get_connection()])
+			self.assertEqual(execute_on_primary({})[1], [get_connection()])
+
+		self.assertFalse(is_on_replica())
+
+
+# Needs a second MariaDB instance replicating the test site's database, configured with
+# `read_from_replica` and `replica_host` (and `replica_db_port`) in the site config
+@unittest.skipUnless(frappe.conf.get("read_from_replica"), "No read replica configured")
+class TestReplicaReportRouting(FrappeTestCase):
+	def test_routes_to_replica(self):
+		primary = get_connection()
+
+		self.assertNotEqual(execute({})[1], [primary])
+		self.assertEqual(get_connection(), primary)
+
+	def test_opt_out_runs_on_primary(self):
+		primary = get_connection()
+
+		self.assertEqual(execute_on_primary({})[1], [primary])
+		with patch.dict(frappe.conf, {"gvm_payroll_primary_reports": ["test_report_utils"]}):
+			self.assertEqual(execute({})[1], [primary])
+
+	def test_opt_out_inside_replica_request(self):
+		primary = get_connection()
+
+		@frappe.read_only()
+		def run_report():
+			return execute({})[1], execute_on_primary({})[1]
+
+		on_replica, on_primary = run_report()
+		self.assertNotEqual(on_replica, [primary])
+		self.assertEqual(on_primary, [primary])
@@ -133,20 +133,53 @@ app_license = "mit"
 # 	"ToDo": "custom_app.overrides.CustomToDo"
 # }
 
+override_doctype_class = {
+	"Payroll Entry": "gvm_payroll.gvm_payroll.overrides.payroll_entry.CustomPayrollEntry",
+}
+
 # Document Events
 # ---------------
 # Hook on document methods and events
 
 doc_events = {
+	"Additional Salary": {
+		"before_insert": "gvm_payroll.gvm_payroll.overrides.additional_salary.set_idempotency_key",
+		"on_cancel": "gvm_payroll.gvm_payroll.overrides.additional_salary.clear_idempotency_key",
+	},
+	"Employee": {
+		"validate": "gvm_payroll.gvm_payroll.overrides.employee.validate_increment_date",
+		"before_save": [
+			"gvm_payroll.gvm_payroll.overrides.employee.set_increment_date",
+			"gvm_payroll.gvm_payroll.overrides.employee.set_next_increment_date",
+		],
+	},
+	"Designation": {
+		"on_update": "gvm_payroll.gvm_payroll.api.pay_matrix.clear_designation_levels",
+		"on_trash": "gvm_payroll.gvm_payroll.api.pay_matrix.clear_designation_levels",
+		"after_rename": "gvm_payroll.gvm_payroll.api.pay_matrix.clear_designation_levels",
+	},
 	"Salary Slip": {
 		"before_save": [
 			"gvm_payroll.gvm_payroll.overrides.salary_slip.split_internal_components",
+			"gvm_payroll.gvm_payroll.overrides.salary_slip.set_internal_year_to_date",
 			"gvm_payroll.gvm_payroll.overrides.salary_slip.calculate_unpaid_days"
 		],
 		"before_submit": [
 			"gvm_payroll.gvm_payroll.overrides.salary_slip.split_internal_components",
+			"gvm_payroll.gvm_payroll.overrides.salary_slip.set_internal_year_to_date",
 			"gvm_payroll.gvm_payroll.overrides.salary_slip.calculate_unpaid_days"
-		]
+		],
+		"on_submit": [
+			"gvm_payroll.gvm_payroll.overrides.salary_slip.update_internal_year_to_date",
+			"gvm_payroll.gvm_payroll.overrides.salary_slip.update_annual_tax_ledger"
+		],
+		"on_cancel": [
+			"gvm_payroll.gvm_payroll.overrides.salary_slip.update_internal_year_to_date",
+			"gvm_payroll.gvm_payroll.overrides.salary_slip.update_annual_tax_ledger"
+		],
+		"onload": "gvm_payroll.gvm_payroll.overrides.salary_slip.load_archived_details",
+		"before_cancel": "gvm_payroll.gvm_payroll.overrides.salary_slip.validate_archived_details",
+		"before_update_after_submit": "gvm_payroll.gvm_payroll.overrides.salary_slip.validate_archived_details",
 	}
 }
 
@@ -171,6 +204,18 @@ doc_events = {
 # 	],
 # }
 
+scheduler_events = {
+	"hourly": [
+		"gvm_payroll.gvm_payroll.api.payroll_entry.fail_stalled_salary_slip_shards",
+	],
+	"daily": [
+		"gvm_payroll.tasks.update_employee_experience_years",
+	],
+	"monthly_long": [
+		"gvm_payroll.gvm_payroll.api.salary_archive.archive_salary_slips",
+	],
+}
+
 # Testing
 # -------
 
@@ -201,8 +246,8 @@ doc_events = {
 
 # Request Events
 # ----------------
-# before_request = ["gvm_payroll.utils.before_request"]
-# after_request = ["gvm_payroll.utils.after_request"]
+before_request = ["gvm_payroll.instrumentation.before_request"]
+after_request = ["gvm_payroll.instrumentation.after_request"]
 
 # Job Events
 # ----------
@@ -0,0 +1,261 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+"""
+Query count and SQL time instrumentation.
+
+Wraps frappe.db.sql while a report, hook or API call runs and records the number of
+queries, total and p95 SQL time and rows returned. Off unless enabled in site config:
+
+	bench --site <site> set-config gvm_payroll_instrumentation 1
+
+With `gvm_payroll_instrumentation_surface` also set, the figures are shown in the
+report message and, for this app's API methods, sent in the X-Gvm-Payroll-Queries
+response header. Every measurement is kept in a capped Redis list per name (see
+get_query_stats).
+"""
+
+import json
+import math
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import frappe
+from frappe.utils import now_datetime
+
+from gvm_payroll.metrics import measure
+
+STORE_KEY = "gvm_payroll:instrumentation"
+
+# Measurements kept per instrumented name
+STORE_SIZE = 200
+
+RESPONSE_HEADER = "X-Gvm-Payroll-Queries"
+
+
+class QueryStats:
+	def __init__(self, name):
+		self.name = name
+		self.durations = []
+		self.rows = 0
+		self.started = time.perf_counter()
+		self.elapsed = 0.0
+		# frappe.db.sql set on the instance before this one was installed (when nested)
+		self.previous = None
+
+	def add(self, duration, result):
+		self.durations.append(duration)
+		if isinstance(result, list | tuple):
+			self.rows += len(result)
+
+	def as_dict(self):
+		return {
+			"name": self.name,
+			"queries": len(self.durations),
+			"sql_ms": round(sum(self.durations) * 1000, 2),
+			"p95_ms": round(percentile(self.durations, 95) * 1000, 2),
+			"rows": self.rows,
+			"elapsed_ms": round(self.elapsed * 1000, 2),
+			"at": str(now_datetime()),
+		}
+
+	def summary(self):
+		stats = self.as_dict()
+		return (
+			f"{stats['queries']} queries, {stats['sql_ms']} ms SQL (p95 {stats['p95_ms']} ms), "
+			f"{stats['rows']} rows in {stats['elapsed_ms']} ms"
+		)
+
+
+def is_enabled():
+	return bool(frappe.conf.get("gvm_payroll_instrumentation"))
+
+
+def is_surfaced():
+	return bool(frappe.conf.get("gvm_payroll_instrumentation_surface"))
+
+
+@contextmanager
+def instrument(name):
+	"""
+	Count the queries run inside the block.
+
+	Yields the QueryStats (None when instrumentation is disabled). Blocks can be
+	nested; a query is then counted by every enclosing block.
+	"""
+	if not is_enabled():
+		yield None
+		return
+
+	stats = start(name)
+	try:
+		yield stats
+	finally:
+		stop(stats)
+
+
+def instrumented(name=None):
+	"""
+	Decorator form of `instrument`, named after the function by default. Calls are also
+	counted and timed in gvm_payroll.metrics.
+
+	Put it below @frappe.whitelist() so the whitelisted object is the wrapper.
+	"""
+
+	def decorator(fn):
+		label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+		@wraps(fn)
+		def wrapper(*args, **kwargs):
+			with measure(label):
+				if not is_enabled():
+					return fn(*args, **kwargs)
+
+				with instrument(label):
+					return fn(*args, **kwargs)
+
+		return wrapper
+
+	return decorator
+
+
+def instrumented_report(fn):
+	"""
+	Instrument a script report's execute and, when surfaced, show the figures as the
+	report message (unless the report already returns one).
+	"""
+	label = f"report:{fn.__module__.rsplit('.', 1)[-1]}"
+
+	@wraps(fn)
+	def execute(filters=None):
+		with measure(label):
+			if not is_enabled():
+				return fn(filters)
+
+			with instrument(label) as stats:
+				result = fn(filters)
+
+		if not is_surfaced() or not isinstance(result, list | tuple):
+			return result
+
+		result = list(result) + [None] * (3 - len(result))
+		if not result[2]:
+			result[2] = stats.summary()
+		return result
+
+	return execute
+
+
+def start(name):
+	"""Install the frappe.db.sql wrapper and return the QueryStats it records into."""
+	stats = QueryStats(name)
+	sql = frappe.db.sql
+	stats.previous = frappe.db.__dict__.get("sql")
+
+	def instrumented_sql(*args, **kwargs):
+		query_start = time.perf_counter()
+		result = sql(*args, **kwargs)
+		stats.add(time.perf_counter() - query_start, result)
+		return result
+
+	frappe.db.sql = instrumented_sql
+	return stats
+
+
+def stop(stats):
+	"""Restore frappe.db.sql and record the measurement."""
+	stats.elapsed = time.perf_counter() - stats.started
+	if stats.previous is None:
+		frappe.db.__dict__.pop("sql", None)
+	else:
+		frappe.db.sql = stats.previous
+
+	record(stats)
+
+
+def record(stats):
+	"""Push a measurement onto the capped list of its name."""
+	try:
+		cache = frappe.cache()
+		key = f"{STORE_KEY}:{stats.name}"
+		cache.lpush(key, json.dumps(stats.as_dict()))
+		cache.ltrim(key, 0, STORE_SIZE - 1)
+		cache.sadd(f"{STORE_KEY}:names", stats.name)
+	except Exception:
+		frappe.logger("gvm_payroll").warning(f"Could not record query stats of {stats.name}", exc_info=True)
+
+
+@frappe.whitelist()
+def get_query_stats(name=None):
+	"""
+	Aggregate the recorded measurements.
+
+	Args:
+		name (str, optional): Instrumented name; all names when not given
+
+	Returns:
+		dict: name -> {"calls", "avg_queries", "max_queries", "avg_sql_ms", "p95_sql_ms", "avg_rows", "last"}
+	"""
+	frappe.only_for("System Manager")
+
+	cache = frappe.cache()
+	names = [name] if name else sorted(decode(n) for n in cache.smembers(f"{STORE_KEY}:names"))
+
+	result = {}
+	for label in names:
+		entries = [json.loads(decode(e)) for e in cache.lrange(f"{STORE_KEY}:{label}", 0, STORE_SIZE - 1)]
+		if not entries:
+			continue
+
+		calls = len(entries)
+		result[label] = {
+			"calls": calls,
+			"avg_queries": round(sum(e["queries"] for e in entries) / calls, 1),
+			"max_queries": max(e["queries"] for e in entries),
+			"avg_sql_ms": round(sum(e["sql_ms"] for e in entries) / calls, 2),
+			"p95_sql_ms": round(percentile([e["sql_ms"] for e in entries], 95), 2),
+			"avg_rows": round(sum(e["rows"] for e in entries) / calls, 1),
+			"last": entries[0],
+		}
+
+	return result
+
+
+def clear_query_stats():
+	cache = frappe.cache()
+	for name in cache.smembers(f"{STORE_KEY}:names"):
+		cache.delete_value(f"{STORE_KEY}:{decode(name)}")
+	cache.delete_value(f"{STORE_KEY}:names")
+
+
+def before_request():
+	"""Start instrumenting calls of this app's whitelisted methods."""
+	if not is_enabled() or not frappe.request:
+		return
+
+	method = frappe.request.path.rsplit("/method/", 1)
+	if len(method) == 2 and method[1].startswith("gvm_payroll."):
+		frappe.local.gvm_payroll_query_stats = start(f"api:{method[1]}")
+
+
+def after_request(response=None, request=None):
+	stats = getattr(frappe.local, "gvm_payroll_query_stats", None)
+	if not stats:
+		return
+
+	frappe.local.gvm_payroll_query_stats = None
+	stop(stats)
+	if is_surfaced() and response is not None:
+		response.headers[RESPONSE_HEADER] = f"{stats.name}; {stats.summary()}"
+
+
+def percentile(values, percent):
+	if not values:
+		return 0.0
+	values = sorted(values)
+	return values[max(math.ceil(len(values) * percent / 100) - 1, 0)]
+
+
+def decode(value):
+	return value.decode() if isinstance(value, bytes) else value
@@ -0,0 +1,228 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+"""
+Call counters and latency histograms of the payroll hot paths.
+
+Kept in Redis so they aggregate across web and background workers, and exposed in
+Prometheus text format by `metrics`. Every function wrapped by
+gvm_payroll.instrumentation (reports, Salary Slip hooks, bulk jobs) is measured,
+with one Redis round trip per call (two for background jobs). Off by default; set
+`gvm_payroll_metrics` in site config to turn it on.
+"""
+
+import hmac
+import time
+from contextlib import contextmanager
+
+import frappe
+from werkzeug.wrappers import Response
+
+METRICS_KEY = "gvm_payroll:metrics"
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implied
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Names of background jobs, which are also tracked while they run
+JOB_PREFIX = "job:"
+
+# Seconds after which a running job is no longer counted (the app's job timeout), so a
+# worker killed before its call ended does not leave it in progress
+IN_PROGRESS_EXPIRY = 3600
+
+
+def is_enabled():
+	return bool(frappe.conf.get("gvm_payroll_metrics"))
+
+
+@contextmanager
+def measure(name):
+	"""
+	Count a call of `name`, its outcome and duration, with one Redis round trip when it ends.
+
+	Background jobs (names starting with "job:") are also tracked as in progress while
+	they run, which costs one more round trip when they start.
+	"""
+	if not is_enabled():
+		yield
+		return
+
+	running = start_running(name) if name.startswith(JOB_PREFIX) else None
+	start = time.perf_counter()
+	failed = False
+	try:
+		yield
+	except BaseException:
+		failed = True
+		raise
+	finally:
+		observe(name, time.perf_counter() - start, failed, running)
+
+
+def observe(name, seconds, failed=False, running=None):
+	"""
+	Record one call of `name` that took `seconds`, in a single Redis round trip.
+
+	`running` is the in-progress field set by start_running, removed in the same round trip.
+	"""
+	try:
+		cache = frappe.cache()
+		bucket = next((str(le) for le in BUCKETS if seconds <= le), "+Inf")
+
+		pipe = cache.pipeline()
+		pipe.hincrby(get_key("calls"), f"{name}|{'error' if failed else 'ok'}", 1)
+		pipe.hincrby(get_key("buckets"), f"{name}|{bucket}", 1)
+		pipe.hincrbyfloat(get_key("seconds"), name, seconds)
+		if running:
+			pipe.hdel(get_key("in_progress"), running)
+		if not failed:
+			pipe.hset(get_key("last_success"), name, time.time())
+		pipe.execute()
+	except Exception:
+		frappe.logger("gvm_payroll").warning(f"Could not record metrics of {name}", exc_info=True)
+
+
+def start_running(name):
+	"""
+	Mark a call of `name` as in progress until it ends or IN_PROGRESS_EXPIRY passes.
+
+	Returns:
+		str: the in_progress field of this call, or None if it could not be stored
+	"""
+	field = f"{name}|{frappe.generate_hash(length=10)}"
+	try:
+		pipe = frappe.cache().pipeline()
+		pipe.hset(get_key("in_progress"), field, time.time() + IN_PROGRESS_EXPIRY)
+		pipe.execute()
+	except Exception:
+		frappe.logger("gvm_payroll").warning(f"Could not record metrics of {name}", exc_info=True)
+		return None
+	return field
+
+
+@frappe.whitelist(allow_guest=True)
+def metrics():
+	"""
+	All metrics in Prometheus text format.
+
+	Scrapers authenticate with `Authorization: Bearer <gvm_payroll_metrics_token>` from
+	site config; otherwise the user must be a System Manager.
+	"""
+	if not has_metrics_token():
+		frappe.only_for("System Manager")
+
+	return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+
+def has_metrics_token():
+	token = frappe.conf.get("gvm_payroll_metrics_token")
+	if not token or not frappe.request:
+		return False
+
+	header = frappe.request.headers.get("Authorization", "")
+	return hmac.compare_digest(header, f"Bearer {token}")
+
+
+def render_metrics():
+	"""Build the Prometheus exposition text from the Redis hashes."""
+	calls, buckets, seconds, in_progress, last_success = read_hashes(
+		"calls", "buckets", "seconds", "in_progress", "last_success"
+	)
+
+	lines = [
+		"# HELP gvm_payroll_calls_total Calls of instrumented payroll functions by outcome.",
+		"# TYPE gvm_payroll_calls_total counter",
+	]
+	for field, value in sorted(calls.items()):
+		name, status = field.rsplit("|", 1)
+		lines.append(
+			f'gvm_payroll_calls_total{{name="{escape(name)}",status="{status}"}} {int(float(value))}'
+		)
+
+	lines += [
+		"# HELP gvm_payroll_duration_seconds Duration of instrumented payroll functions.",
+		"# TYPE gvm_payroll_duration_seconds histogram",
+	]
+	counts = {}
+	for field, value in buckets.items():
+		name, bucket = field.rsplit("|", 1)
+		counts.setdefault(name, {})[bucket] = int(float(value))
+
+	for name in sorted(counts):
+		label = escape(name)
+		cumulative = 0
+		for le in (*(str(b) for b in BUCKETS), "+Inf"):
+			cumulative += counts[name].get(le, 0)
+			lines.append(f'gvm_payroll_duration_seconds_bucket{{name="{label}",le="{le}"}} {cumulative}')
+		lines.append(f'gvm_payroll_duration_seconds_sum{{name="{label}"}} {float(seconds.get(name, 0))}')
+		lines.append(f'gvm_payroll_duration_seconds_count{{name="{label}"}} {cumulative}')
+
+	lines += [
+		"# HELP gvm_payroll_in_progress Background jobs of this app running now.",
+		"# TYPE gvm_payroll_in_progress gauge",
+	]
+	jobs = {name for name in counts if name.startswith(JOB_PREFIX)}
+	for name, value in sorted(count_running(in_progress, jobs).items()):
+		lines.append(f'gvm_payroll_in_progress{{name="{escape(name)}"}} {value}')
+
+	lines += [
+		"# HELP gvm_payroll_last_success_timestamp_seconds Time of the last successful call.",
+		"# TYPE gvm_payroll_last_success_timestamp_seconds gauge",
+	]
+	for name, value in sorted(last_success.items()):
+		lines.append(f'gvm_payroll_last_success_timestamp_seconds{{name="{escape(name)}"}} {float(value)}')
+
+	return "\n".join(lines) + "\n"
+
+
+def count_running(in_progress, names):
+	"""
+	Running calls per name from the in_progress fields, with 0 for the other `names`.
+
+	Fields past their expiry (left by killed workers) are not counted and are removed.
+	"""
+	running = dict.fromkeys(names, 0)
+	stale = []
+	for field, expires in in_progress.items():
+		if float(expires) < time.time():
+			stale.append(field)
+			continue
+		name = field.rsplit("|", 1)[0]
+		running[name] = running.get(name, 0) + 1
+
+	if stale:
+		pipe = frappe.cache().pipeline()
+		pipe.hdel(get_key("in_progress"), *stale)
+		pipe.execute()
+
+	return running
+
+
+def read_hashes(*names):
+	pipe = frappe.cache().pipeline()
+	for metric in names:
+		pipe.hgetall(get_key(metric))
+	return [{decode(k): decode(v) for k, v in values.items()} for values in pipe.execute()]
+
+
+def reset_metrics():
+	pipe = frappe.cache().pipeline()
+	for metric in ("calls", "buckets", "seconds", "in_progress", "last_success"):
+		pipe.delete(get_key(metric))
+	pipe.execute()
+
+
+def get_key(metric):
+	# Values are plain numbers, not pickled: the hashes are only used through raw
+	# pipeline commands, so the site prefix is added here
+	return frappe.cache().make_key(f"{METRICS_KEY}:{metric}")
+
+
+def escape(value):
+	return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def decode(value):
+	return value.decode() if isinstance(value, bytes) else value
@@ -0,0 +1,13 @@
+import frappe
+
+from gvm_payroll.gvm_payroll.doctype.annual_tax_ledger.annual_tax_ledger import build_tax_ledgers
+
+
+def execute():
+	"""Build the Annual Tax Ledgers of every fiscal year with submitted Salary Slips"""
+	frappe.reload_doc("gvm_payroll", "doctype", "annual_tax_ledger")
+
+	for fiscal_year in frappe.get_all("Fiscal Year", fields=["name", "year_start_date", "year_end_date"]):
+		period = [fiscal_year.year_start_date, fiscal_year.year_end_date]
+		if frappe.db.exists("Salary Slip", {"docstatus": 1, "end_date": ["between", period]}):
+			build_tax_ledgers(fiscal_year.name)
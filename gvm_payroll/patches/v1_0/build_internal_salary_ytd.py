@@ -0,0 +1,13 @@
+import frappe
+
+from gvm_payroll.gvm_payroll.doctype.internal_salary_ytd.internal_salary_ytd import build_year_to_date
+
+
+def execute():
+	"""Build the Internal Salary YTD totals of every fiscal year with submitted Salary Slips"""
+	frappe.reload_doc("gvm_payroll", "doctype", "internal_salary_ytd")
+
+	for fiscal_year in frappe.get_all("Fiscal Year", fields=["name", "year_start_date", "year_end_date"]):
+		period = [fiscal_year.year_start_date, fiscal_year.year_end_date]
+		if frappe.db.exists("Salary Slip", {"docstatus": 1, "end_date": ["between", period]}):
+			build_year_to_date(fiscal_year.name)
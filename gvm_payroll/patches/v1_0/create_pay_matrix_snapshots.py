@@ -0,0 +1,13 @@
+import frappe
+from frappe.utils import getdate
+
+from gvm_payroll.gvm_payroll.doctype.pay_matrix_snapshot.pay_matrix_snapshot import take_snapshot
+
+
+def execute():
+	"""Seed a snapshot of every Pay Matrix, effective from the date it was created"""
+	for pay_matrix in frappe.get_all("Pay Matrix", fields=["name", "creation"]):
+		if frappe.db.exists("Pay Matrix Snapshot", {"pay_matrix": pay_matrix.name}):
+			continue
+
+		take_snapshot(pay_matrix.name, getdate(pay_matrix.creation))
@@ -0,0 +1,48 @@
+import frappe
+from frappe.modules.utils import sync_customizations
+
+from gvm_payroll.gvm_payroll.overrides.additional_salary import (
+	GENERATED_REF_DOCTYPES,
+	get_idempotency_key,
+)
+
+
+def execute():
+	"""Backfill custom_idempotency_key on existing generated Additional Salary records"""
+	# Customizations are synced after post_model_sync patches, make sure the field exists
+	sync_customizations("gvm_payroll")
+
+	records = frappe.get_all(
+		"Additional Salary",
+		filters={
+			"ref_doctype": ["in", GENERATED_REF_DOCTYPES],
+			"docstatus": ["!=", 2],
+			"custom_idempotency_key": ["is", "not set"],
+		},
+		fields=["name", "ref_doctype", "ref_docname", "employee", "salary_component"],
+		order_by="creation asc",
+	)
+
+	taken = set(
+		frappe.get_all(
+			"Additional Salary",
+			filters={"custom_idempotency_key": ["is", "set"]},
+			pluck="custom_idempotency_key",
+		)
+	)
+
+	updates = {}
+	for d in records:
+		if not d.ref_docname:
+			continue
+
+		key = get_idempotency_key(d.ref_doctype, d.ref_docname, d.employee, d.salary_component)
+		# Keep the oldest record of an existing duplicate set, leave the others without a key
+		if key in taken:
+			continue
+
+		taken.add(key)
+		updates[d.name] = {"custom_idempotency_key": key}
+
+	if updates:
+		frappe.db.bulk_update("Additional Salary", updates, update_modified=False)
@@ -0,0 +1,30 @@
+import frappe
+from frappe.modules.utils import sync_customizations
+
+from gvm_payroll.gvm_payroll.doctype.ind_payroll_setting.ind_payroll_setting import get_next_increment_date
+
+
+def execute():
+	"""Backfill custom_next_increment_date on existing employees"""
+	# Customizations are synced after post_model_sync patches, make sure the field exists
+	sync_customizations("gvm_payroll")
+
+	employees = frappe.get_all(
+		"Employee",
+		filters={"date_of_joining": ["is", "set"]},
+		fields=["name", "company", "date_of_joining", "custom_date_of_increment"],
+	)
+
+	frappe.db.bulk_update(
+		"Employee",
+		{
+			emp.name: {
+				"custom_next_increment_date": get_next_increment_date(
+					emp.date_of_joining, emp.company, emp.custom_date_of_increment
+				)
+			}
+			for emp in employees
+		},
+		chunk_size=500,
+		update_modified=False,
+	)
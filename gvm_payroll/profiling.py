@@ -0,0 +1,190 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+"""
+Memory profiling of report runs.
+
+When `gvm_payroll_memory_profiling` is set in site config (or profile_report is used),
+a report decorated with @profiled_report runs under tracemalloc. The run is split
+into phases by mark_phase calls in the report (fetch slips, fetch details, build rows)
+plus a final serialize phase, and the peak memory and top allocation sites of each
+phase are stored as a compact summary in a capped Redis list per report (see
+get_memory_profiles).
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from functools import wraps
+
+import frappe
+from frappe.utils import now_datetime
+
+STORE_KEY = "gvm_payroll:memory_profile"
+
+# Profiles kept per report
+STORE_SIZE = 50
+
+# Allocation sites reported per phase
+TOP_ALLOCATIONS = 10
+
+# Frames kept per allocation; one is enough for line attribution
+TRACE_FRAMES = 1
+
+TRACE_FILTERS = (
+	tracemalloc.Filter(False, tracemalloc.__file__),
+	tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+	tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+	tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class MemoryProfile:
+	def __init__(self, report):
+		self.report = report
+		self.phases = []
+		self.current = None
+
+	def begin(self, phase):
+		"""Close the running phase and start measuring `phase`."""
+		self.end()
+		tracemalloc.reset_peak()
+		self.current = {
+			"phase": phase,
+			"snapshot": tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS),
+			"memory": tracemalloc.get_traced_memory()[0],
+			"started": time.perf_counter(),
+		}
+
+	def end(self):
+		if not self.current:
+			return
+
+		current, peak = tracemalloc.get_traced_memory()
+		snapshot = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+		top = [
+			{"site": format_site(stat.traceback[0]), "kb": kb(stat.size_diff), "count": stat.count_diff}
+			for stat in snapshot.compare_to(self.current["snapshot"], "lineno")[:TOP_ALLOCATIONS]
+			if stat.size_diff > 0
+		]
+
+		self.phases.append(
+			{
+				"phase": self.current["phase"],
+				"seconds": round(time.perf_counter() - self.current["started"], 4),
+				"peak_kb": kb(peak),
+				"peak_increase_kb": kb(peak - self.current["memory"]),
+				"retained_kb": kb(current - self.current["memory"]),
+				"top": top,
+			}
+		)
+		self.current = None
+
+	def summary(self, filters=None, rows=None):
+		return {
+			"report": self.report,
+			"at": str(now_datetime()),
+			"filters": {k: v for k, v in (filters or {}).items() if not str(k).startswith("_")},
+			"rows": rows,
+			"peak_kb": max((phase["peak_kb"] for phase in self.phases), default=0),
+			"phases": self.phases,
+		}
+
+
+def is_enabled():
+	return bool(frappe.flags.gvm_payroll_memory_profiling or frappe.conf.get("gvm_payroll_memory_profiling"))
+
+
+def profiled_report(fn):
+	"""Run a script report's execute under tracemalloc when memory profiling is on."""
+	report = fn.__module__.rsplit(".", 1)[-1]
+
+	@wraps(fn)
+	def execute(filters=None):
+		if not is_enabled() or getattr(frappe.local, "gvm_payroll_memory_profile", None):
+			return fn(filters)
+
+		started_tracing = not tracemalloc.is_tracing()
+		if started_tracing:
+			tracemalloc.start(TRACE_FRAMES)
+
+		profile = MemoryProfile(report)
+		frappe.local.gvm_payroll_memory_profile = profile
+		try:
+			profile.begin("fetch_slips")
+			result = fn(filters)
+
+			profile.begin("serialize")
+			frappe.as_json(result)
+			profile.end()
+		finally:
+			frappe.local.gvm_payroll_memory_profile = None
+			if started_tracing:
+				tracemalloc.stop()
+
+		rows = len(result[1]) if isinstance(result, list | tuple) and len(result) > 1 else None
+		frappe.local.gvm_payroll_last_memory_profile = record(profile.summary(filters, rows))
+		return result
+
+	return execute
+
+
+def mark_phase(phase):
+	"""Start the next phase of the report being profiled; does nothing otherwise."""
+	profile = getattr(frappe.local, "gvm_payroll_memory_profile", None)
+	if profile:
+		profile.begin(phase)
+
+
+def profile_report(report, filters):
+	"""
+	Run a report with memory profiling on, whatever the site config says.
+
+	Returns:
+		dict: the stored profile summary
+	"""
+	module = frappe.get_module(f"gvm_payroll.gvm_payroll.report.{report}.{report}")
+
+	frappe.local.gvm_payroll_last_memory_profile = None
+	frappe.flags.gvm_payroll_memory_profiling = True
+	try:
+		module.execute(frappe._dict(filters))
+	finally:
+		frappe.flags.gvm_payroll_memory_profiling = False
+
+	return frappe.local.gvm_payroll_last_memory_profile
+
+
+def record(summary):
+	"""Push a profile summary onto the capped list of its report."""
+	try:
+		cache = frappe.cache()
+		key = f"{STORE_KEY}:{summary['report']}"
+		cache.lpush(key, json.dumps(summary, default=str))
+		cache.ltrim(key, 0, STORE_SIZE - 1)
+	except Exception:
+		frappe.logger("gvm_payroll").warning(
+			f"Could not record memory profile of {summary['report']}", exc_info=True
+		)
+
+	return summary
+
+
+@frappe.whitelist()
+def get_memory_profiles(report: str, limit: int = 10):
+	"""Latest memory profiles of a report, newest first."""
+	frappe.only_for("System Manager")
+
+	entries = frappe.cache().lrange(f"{STORE_KEY}:{report}", 0, min(int(limit), STORE_SIZE) - 1)
+	return [json.loads(e.decode() if isinstance(e, bytes) else e) for e in entries]
+
+
+def format_site(frame):
+	# Keep the path from the app or package name on, e.g. gvm_payroll/report/...:12
+	parts = frame.filename.split(os.sep)
+	return f"{os.sep.join(parts[-3:])}:{frame.lineno}"
+
+
+def kb(size):
+	return round(size / 1024, 1)
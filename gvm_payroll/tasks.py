@@ -0,0 +1,69 @@
+import frappe
+from frappe.query_builder.functions import Coalesce
+from frappe.utils import add_days, date_diff, getdate, now_datetime, nowdate
+
+from gvm_payroll.gvm_payroll.doctype.ind_payroll_setting.ind_payroll_setting import get_next_increment_date
+
+
+def update_employee_experience_years():
+	"""
+	Add one year of experience to employees whose increment date is today, or passed
+	on a day the scheduler did not run.
+
+	Replaces the "Update Employee Experience Year" server script. Due employees are
+	found with an indexed lookup on custom_next_increment_date (maintained on Employee
+	save), so only they are read. Each company's increments are applied with one
+	UPDATE, then the next increment date of every due employee is moved a year ahead.
+	"""
+	today = getdate(nowdate())
+
+	due = frappe.get_all(
+		"Employee",
+		filters={"custom_next_increment_date": ["<=", today]},
+		fields=[
+			"name",
+			"company",
+			"date_of_joining",
+			"custom_years_experienced",
+			"custom_date_of_increment",
+			"custom_next_increment_date",
+		],
+	)
+	if not due:
+		return
+
+	# Experience already recorded beyond the completed years is left as is
+	to_increment = {}
+	for emp in due:
+		years_completed = date_diff(today, emp.date_of_joining) // 365
+		if not emp.custom_years_experienced or years_completed > emp.custom_years_experienced:
+			to_increment.setdefault(emp.company, []).append(emp.name)
+
+	employee = frappe.qb.DocType("Employee")
+	for company, employees in to_increment.items():
+		(
+			frappe.qb.update(employee)
+			.set(employee.custom_years_experienced, Coalesce(employee.custom_years_experienced, 0) + 1)
+			.set(employee.modified, now_datetime())
+			.where(employee.name.isin(employees))
+		).run()
+
+		frappe.logger("gvm_payroll").info(
+			f"Employee experience year incremented for {len(employees)} employees of {company or 'no company'}"
+		)
+
+	frappe.db.bulk_update(
+		"Employee",
+		{
+			emp.name: {
+				"custom_next_increment_date": get_next_increment_date(
+					emp.date_of_joining,
+					emp.company,
+					increment_date=emp.custom_date_of_increment or emp.custom_next_increment_date,
+					start=add_days(today, 1),
+				)
+			}
+			for emp in due
+		},
+		update_modified=False,
+	)
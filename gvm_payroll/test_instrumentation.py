@@ -0,0 +1,70 @@
+# Copyright (c) 2026, Samuael Ketema and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from gvm_payroll.instrumentation import (
+	STORE_SIZE,
+	clear_query_stats,
+	get_query_stats,
+	instrument,
+	instrumented_report,
+)
+
+ENABLED = {"gvm_payroll_instrumentation": 1, "gvm_payroll_instrumentation_surface": 1}
+
+
+class TestInstrumentation(FrappeTestCase):
+	def setUp(self):
+		clear_query_stats()
+
+	def test_disabled_by_default(self):
+		with patch.dict(frappe.conf, {"gvm_payroll_instrumentation": 0}):
+			with instrument("_test") as stats:
+				frappe.db.sql("select 1")
+
+		self.assertIsNone(stats)
+		self.assertNotIn("sql", frappe.db.__dict__)
+
+	def test_counts_queries_and_rows(self):
+		with patch.dict(frappe.conf, ENABLED):
+			with instrument("_test") as stats:
+				frappe.db.sql("select 1")
+				frappe.get_all("DocType", limit=3)
+
+		self.assertEqual(stats.as_dict()["queries"], 2)
+		self.assertEqual(stats.rows, 4)
+		self.assertNotIn("sql", frappe.db.__dict__)
+
+	def test_nested_blocks_restore_sql(self):
+		with patch.dict(frappe.conf, ENABLED):
+			with instrument("_outer") as outer:
+				with instrument("_inner") as inner:
+					frappe.db.sql("select 1")
+				frappe.db.sql("select 1")
+
+		self.assertEqual(len(inner.durations), 1)
+		self.assertEqual(len(outer.durations), 2)
+		self.assertNotIn("sql", frappe.db.__dict__)
+
+	def test_store_is_capped(self):
+		with patch.dict(frappe.conf, ENABLED):
+			for _ in range(STORE_SIZE + 5):
+				with instrument("_test"):
+					pass
+
+		self.assertEqual(get_query_stats("_test")["_test"]["calls"], STORE_SIZE)
+
+	def test_report_message(self):
+		@instrumented_report
+		def execute(filters=None):
+			frappe.db.sql("select 1")
+			return [], []
+
+		with patch.dict(frappe.conf, ENABLED):
+			_columns, _data, message = execute({})
+
+		self.assertIn("1 queries", message)
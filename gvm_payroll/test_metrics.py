@@ -0,0 +1,82 @@
+# Copyright (c) 2026, Samuael Ketema and Contributors
+# See license.txt
+
+import time
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from gvm_payroll.instrumentation import instrumented
+from gvm_payroll.metrics import (
+	IN_PROGRESS_EXPIRY,
+	measure,
+	observe,
+	read_hashes,
+	render_metrics,
+	reset_metrics,
+	start_running,
+)
+
+
+class TestMetrics(FrappeTestCase):
+	def setUp(self):
+		conf = patch.dict(frappe.conf, {"gvm_payroll_metrics": 1})
+		conf.start()
+		self.addCleanup(conf.stop)
+		reset_metrics()
+		self.addCleanup(reset_metrics)
+
+	def test_off_without_site_config(self):
+		with patch.dict(frappe.conf, {"gvm_payroll_metrics": 0}), measure("_test"):
+			pass
+
+		self.assertNotIn('name="_test"', render_metrics())
+
+	def test_histogram_buckets_are_cumulative(self):
+		observe("_test", 0.003)
+		observe("_test", 0.2)
+		observe("_test", 1000)
+
+		text = render_metrics()
+		self.assertIn('gvm_payroll_duration_seconds_bucket{name="_test",le="0.005"} 1', text)
+		self.assertIn('gvm_payroll_duration_seconds_bucket{name="_test",le="0.25"} 2', text)
+		self.assertIn('gvm_payroll_duration_seconds_bucket{name="_test",le="+Inf"} 3', text)
+		self.assertIn('gvm_payroll_duration_seconds_count{name="_test"} 3', text)
+
+	def test_failed_calls_are_counted_separately(self):
+		with measure("_test"):
+			pass
+
+		with self.assertRaises(ZeroDivisionError), measure("_test"):
+			1 / 0
+
+		text = render_metrics()
+		self.assertIn('gvm_payroll_calls_total{name="_test",status="ok"} 1', text)
+		self.assertIn('gvm_payroll_calls_total{name="_test",status="error"} 1', text)
+		# Only background jobs are tracked while running
+		self.assertNotIn('gvm_payroll_in_progress{name="_test"}', text)
+
+	def test_running_job_is_in_progress_until_it_ends(self):
+		with measure("job:_test"):
+			self.assertIn('gvm_payroll_in_progress{name="job:_test"} 1', render_metrics())
+
+		self.assertIn('gvm_payroll_in_progress{name="job:_test"} 0', render_metrics())
+
+	def test_job_of_killed_worker_expires(self):
+		running = start_running("job:_test")
+		observe("job:_test", 1)
+
+		with patch("gvm_payroll.metrics.time.time", return_value=time.time() + IN_PROGRESS_EXPIRY + 1):
+			self.assertIn('gvm_payroll_in_progress{name="job:_test"} 0', render_metrics())
+		self.assertNotIn(running, read_hashes("in_progress")[0])
+
+	def test_instrumented_functions_are_measured(self):
+		@instrumented("_test.decorated")
+		def work():
+			return 1
+
+		work()
+		work()
+
+		self.assertIn('gvm_payroll_calls_total{name="_test.decorated",status="ok"} 2', render_metrics())
@@ -0,0 +1,44 @@
+# Copyright (c) 2026, Samuael Ketema and Contributors
+# See license.txt
+
+import tracemalloc
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from gvm_payroll.profiling import get_memory_profiles, mark_phase, profiled_report
+
+
+@profiled_report
+def execute(filters=None):
+	slips = [{"name": i} for i in range(1000)]
+	mark_phase("fetch_details")
+	details = {i: "x" * 100 for i in range(1000)}
+	mark_phase("build_rows")
+	return [], [dict(slip, detail=details[slip["name"]]) for slip in slips]
+
+
+class TestMemoryProfiling(FrappeTestCase):
+	def test_off_by_default(self):
+		with patch.dict(frappe.conf, {"gvm_payroll_memory_profiling": 0}):
+			frappe.local.gvm_payroll_last_memory_profile = None
+			execute({})
+
+		self.assertIsNone(frappe.local.gvm_payroll_last_memory_profile)
+
+	def test_records_each_phase(self):
+		with patch.dict(frappe.conf, {"gvm_payroll_memory_profiling": 1}):
+			_columns, data = execute({"company": "_Test Company"})
+
+		self.assertEqual(len(data), 1000)
+		self.assertFalse(tracemalloc.is_tracing())
+
+		profile = frappe.local.gvm_payroll_last_memory_profile
+		self.assertEqual(
+			[p["phase"] for p in profile["phases"]],
+			["fetch_slips", "fetch_details", "build_rows", "serialize"],
+		)
+		self.assertEqual(profile["rows"], 1000)
+		self.assertGreater(profile["peak_kb"], 0)
+		self.assertEqual(get_memory_profiles("test_profiling", limit=1)[0]["at"], profile["at"])
@@ -0,0 +1,29 @@
+# Copyright (c) 2026, Samuael Ketema and Contributors
+# See license.txt
+
+import frappe
+from erpnext.setup.doctype.employee.test_employee import make_employee
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, getdate, nowdate
+
+from gvm_payroll.tasks import update_employee_experience_years
+
+
+class TestUpdateEmployeeExperienceYears(FrappeTestCase):
+	def test_increment_missed_by_the_scheduler_is_applied(self):
+		employee = make_employee("experience_missed_day@example.com", date_of_joining="2020-01-01")
+		yesterday = add_days(nowdate(), -1)
+		frappe.db.set_value(
+			"Employee",
+			employee,
+			{"custom_years_experienced": 1, "custom_next_increment_date": yesterday},
+			update_modified=False,
+		)
+
+		update_employee_experience_years()
+
+		years, next_date = frappe.db.get_value(
+			"Employee", employee, ["custom_years_experienced", "custom_next_increment_date"]
+		)
+		self.assertEqual(years, 2)
+		self.assertGreater(getdate(next_date), getdate(nowdate()))